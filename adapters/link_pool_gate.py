@@ -1,22 +1,140 @@
 # adapters/link_pool_gate.py
-from typing import Protocol, Optional, Dict, Any
+from __future__ import annotations
+import hashlib
+from typing import Any, Dict, Iterable, Optional, Protocol
+
+import numpy as np
 
 
 class LinkPoolRepo(Protocol):
     def find_one_by_url(self, url: str, *, projection: dict | None = None) -> Optional[Dict[str, Any]]: ...
     def ensure_tracked(self, url: str): ...
     def mark_processed(self, url: str, sample_id: str) -> int: ...
+    # Optional (see LinkPoolRepository): enable the prefilter and batched writes.
+    def iter_processed_urls(self, batch_size: int = 10_000) -> Iterable[str]: ...
+    def bulk_writer(self, max_ops: int = ..., max_delay: float | None = ...) -> Any: ...
+
+
+def url_hash(url: str) -> int:
+    """Stable 64-bit fingerprint of a URL (first 8 bytes of blake2b)."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
 
 class LinkPoolGate:
-    def __init__(self, repo: LinkPoolRepo) -> None:
+    """
+    Centralizes link_pool decisions for the gather use case.
+    - Prefilter: on first use, hashes of every processed URL are loaded into a sorted uint64
+      array (8 bytes/URL). A URL whose hash is absent is certainly unprocessed, so no query
+      is made; a probable hit is confirmed with find_one when `verify_hits` is on.
+    - ensure_tracked / mark_processed are buffered and written as one bulk upsert per
+      `write_batch` URLs (or on flush()); mark supersedes track for the same URL.
+    Repos without iter_processed_urls()/bulk_writer() get the original per-URL calls.
+    """
+
+    def __init__(
+            self,
+            repo: LinkPoolRepo,
+            prefilter: bool = True,
+            verify_hits: bool = True,
+            write_batch: int = 500,
+            load_batch_size: int = 10_000,
+    ) -> None:
         self.repo = repo
+        self.prefilter = prefilter and hasattr(repo, "iter_processed_urls")
+        self.verify_hits = verify_hits
+        self.batched = hasattr(repo, "bulk_writer")
+        self.write_batch = max(1, write_batch)
+        self.load_batch_size = load_batch_size
+        self._hashes: Optional[np.ndarray] = None
+        self._marked_now: set[int] = set()
+        self._tracked: Dict[str, None] = {}
+        self._marked: Dict[str, str] = {}
+        self.counters: Dict[str, int] = {
+            "lookups": 0, "prefilter_skips": 0, "verify_queries": 0, "load_round_trips": 0,
+            "track_calls": 0, "mark_calls": 0, "write_round_trips": 0,
+        }
 
-    def is_processed(self, url: str) -> bool:
+    # --- prefilter ---
+    def load(self) -> int:
+        """(Re)load processed URL hashes; returns how many were loaded."""
+        hashes = np.fromiter(
+            (url_hash(u) for u in self.repo.iter_processed_urls(batch_size=self.load_batch_size)),
+            dtype=np.uint64,
+        )
+        self._hashes = np.unique(hashes)  # sorted
+        self.counters["load_round_trips"] += 1 + len(hashes) // self.load_batch_size
+        return int(hashes.size)
+
+    def _maybe_processed(self, url: str) -> bool:
+        if self._hashes is None:
+            self.load()
+        h = url_hash(url)
+        if h in self._marked_now:
+            return True
+        i = int(np.searchsorted(self._hashes, np.uint64(h)))
+        return i < self._hashes.size and int(self._hashes[i]) == h
+
+    def _lookup(self, url: str) -> bool:
         doc = self.repo.find_one_by_url(url, projection={"is_articles_processed": 1, "in_sample": 1})
         return bool(doc and (doc.get("is_articles_processed") or doc.get("in_sample")))
 
+    def is_processed(self, url: str) -> bool:
+        self.counters["lookups"] += 1
+        if not self.prefilter:
+            return self._lookup(url)
+        if not self._maybe_processed(url):
+            self.counters["prefilter_skips"] += 1
+            return False
+        if not self.verify_hits:
+            return True
+        self.counters["verify_queries"] += 1
+        return self._lookup(url)
+
+    # --- batched writes ---
     def ensure_tracked(self, url: str) -> None:
-        self.repo.ensure_tracked(url)
+        self.counters["track_calls"] += 1
+        if not self.batched:
+            self.repo.ensure_tracked(url)
+            return
+        self._tracked[url] = None
+        self._maybe_flush()
 
     def mark_processed(self, url: str, sample_id: str) -> None:
-        self.repo.mark_processed(url, sample_id)
+        self.counters["mark_calls"] += 1
+        self._marked_now.add(url_hash(url))
+        if not self.batched:
+            self.repo.mark_processed(url, sample_id)
+            return
+        self._marked[url] = sample_id
+        self._tracked.pop(url, None)
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._tracked) + len(self._marked) >= self.write_batch:
+            self.flush()
+
+    def flush(self) -> None:
+        if not (self._tracked or self._marked):
+            return
+        writer = self.repo.bulk_writer(max_ops=10 ** 9, max_delay=None)
+        for url in self._tracked:
+            if url not in self._marked:
+                writer.update_one({"url": url}, {"$setOnInsert": {"url": url}}, upsert=True)
+        for url, sample_id in self._marked.items():
+            writer.update_one(
+                {"url": url},
+                {"$set": {"is_articles_processed": True, "in_sample": sample_id}},
+                upsert=True,
+            )
+        self.counters["write_round_trips"] += 1 if writer.flush() else 0
+        self._tracked, self._marked = {}, {}
+
+    # --- reporting ---
+    def stats(self) -> Dict[str, int]:
+        """Counters plus round trips saved versus one query/upsert per call."""
+        c = dict(self.counters)
+        writes = c["track_calls"] + c["mark_calls"]
+        reads_spent = c["verify_queries"] + c["load_round_trips"] if self.prefilter else c["lookups"]
+        writes_spent = c["write_round_trips"] if self.batched else writes
+        c["round_trips_avoided"] = max(0, c["lookups"] + writes - reads_spent - writes_spent)
+        return c
@@ -1,6 +1,6 @@
 # adapters/pipelines.py
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Sequence
 
 
 class HFPipelines:
@@ -14,3 +14,17 @@ class HFPipelines:
 
     def topic(self, text: str) -> Dict[str, Any]:
         return self._zs(text, candidate_labels=self._labels)
+
+    def sentiment_many(self, texts: Sequence[str], batch_size: int = 8) -> List[Dict[str, Any]]:
+        """One padded forward pass per `batch_size` texts; output order matches input."""
+        if not texts:
+            return []
+        return list(self._sent(list(texts), batch_size=batch_size))
+
+    def topic_many(self, texts: Sequence[str], batch_size: int = 8) -> List[Dict[str, Any]]:
+        """Zero-shot over many texts; HF batches the (text, hypothesis) pairs internally."""
+        if not texts:
+            return []
+        out = self._zs(list(texts), candidate_labels=self._labels, batch_size=batch_size)
+        # some transformers versions unwrap single-item lists
+        return [out] if isinstance(out, dict) else list(out)
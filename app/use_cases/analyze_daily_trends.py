@@ -1,16 +1,28 @@
 # app/use_cases/analyze_daily_trends.py
 from __future__ import annotations
 from datetime import datetime, UTC
-from typing import Dict, Any, Optional, Iterable, Protocol, List
+from typing import Dict, Any, Optional, Iterable, Iterator, Protocol, List
 
-from services.daily_trends import DailyTrendsService
+from services.daily_trends import DAILY_TRENDS_BACKENDS, DailyTrendsAggregation, DailyTrendsService
+
+# Only what the service counts (no text or embeddings)
+_TRENDS_PROJECTION = {"_id": 1, "nouns": 1, "topic": 1, "sentiment.label": 1}
 
 
 class CleanArticlesRepo(Protocol):
-    def get_articles(self, params: Dict[str, Any]) -> Iterable[Dict[str, Any]]: ...
+    def get_articles(self, params: Dict[str, Any], projection: Optional[Dict[str, int]] = None) -> Iterable[
+        Dict[str, Any]]: ...
 
     def update_articles(self, selector: Dict[str, Any], update: Dict[str, Any]) -> int: ...
 
+    # Optional: one update_many instead of one update_articles per article
+    def update_many_articles(self, selector: Dict[str, Any], update: Dict[str, Any]) -> int: ...
+
+    # backend="mongo" only
+    def aggregate_articles(self, pipeline: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]: ...
+
+    def count_articles(self, params: Dict[str, Any]) -> int: ...
+
 
 class MetadataRepo(Protocol):
     def update_metadata(self, selector: Dict[str, Any], update: Dict[str, Any]) -> int: ...
@@ -24,7 +36,8 @@ class AnalyzeDailyTrendsUseCase:
     """
     Application layer (imperative orchestration, I/O):
     - Reads from repos, writes metrics & results, updates processed flags.
-    - Delegates pure computation to DailyTrendsService.
+    - Delegates pure computation to DailyTrendsService, or with backend="mongo" runs it as an
+      aggregation (DailyTrendsAggregation) so only the top words leave the server.
     """
 
     def __init__(
@@ -33,11 +46,15 @@ class AnalyzeDailyTrendsUseCase:
             meta_repo: MetadataRepo,
             trends_repo: DailyTrendsRepo,
             service: Optional[DailyTrendsService] = None,
+            backend: str = "python",
     ) -> None:
+        if backend not in DAILY_TRENDS_BACKENDS:
+            raise ValueError(f"Unknown daily trends backend {backend!r}; expected one of {DAILY_TRENDS_BACKENDS}")
         self.clean_repo = clean_repo
         self.meta_repo = meta_repo
         self.trends_repo = trends_repo
         self.service = service or DailyTrendsService()
+        self.backend = backend
 
     def run(
             self,
@@ -50,15 +67,26 @@ class AnalyzeDailyTrendsUseCase:
             {"_id": sample_id}, {"$set": {"analyze_sample_startedAt": datetime.now(UTC)}}
         )
 
-        articles = list(self.clean_repo.get_articles({"sample": sample_id}))
-        if not articles:
+        ids: Optional[List[Any]] = None
+        if self.backend == "mongo":
+            found = self.clean_repo.count_articles({"sample": sample_id}) > 0
+            if found:
+                pipeline = DailyTrendsAggregation.pipeline({"sample": sample_id}, limit)
+                result = DailyTrendsAggregation.result(self.clean_repo.aggregate_articles(pipeline))
+        else:
+            # stream the cursor into the service (compute reads it to the end); only the ids
+            # are kept, for mark_processed
+            ids = []
+            cursor = self.clean_repo.get_articles({"sample": sample_id}, projection=_TRENDS_PROJECTION)
+            result = self.service.compute(self._recording_ids(cursor, ids), limit=limit)
+            found = bool(ids)
+        if not found:
             # still mark finished to avoid dangling "startedAt"
             self.meta_repo.update_metadata(
                 {"_id": sample_id}, {"$set": {"analyze_sample_finishedAt": datetime.now(UTC)}}
             )
             return {"sample": sample_id, "ranked_words": [], "metrics": {"total_words": 0, "distinct_words": 0}}
 
-        result = self.service.compute(articles, limit=limit)
         metrics = result["metrics"]
         ranked = result["ranked_words"]
 
@@ -70,8 +98,10 @@ class AnalyzeDailyTrendsUseCase:
 
         # mark processed if asked
         if mark_processed:
-            for a in articles:
-                self.clean_repo.update_articles({"_id": a["_id"]}, {"$set": {"isProcessed": True}})
+            if ids is None:
+                self.clean_repo.update_many_articles({"sample": sample_id}, {"$set": {"isProcessed": True}})
+            else:
+                self._mark_processed(ids)
 
         # persist trends if asked
         if persist:
@@ -87,3 +117,19 @@ class AnalyzeDailyTrendsUseCase:
         )
 
         return {"sample": sample_id, **result}
+
+    @staticmethod
+    def _recording_ids(articles: Iterable[Dict[str, Any]], ids: List[Any]) -> Iterator[Dict[str, Any]]:
+        """Yield `articles` unchanged, appending each _id to `ids` as it passes."""
+        for a in articles:
+            ids.append(a["_id"])
+            yield a
+
+    def _mark_processed(self, ids: List[Any], chunk: int = 5000) -> None:
+        update_many = getattr(self.clean_repo, "update_many_articles", None)
+        if update_many is None:
+            for _id in ids:
+                self.clean_repo.update_articles({"_id": _id}, {"$set": {"isProcessed": True}})
+            return
+        for start in range(0, len(ids), chunk):
+            update_many({"_id": {"$in": ids[start:start + chunk]}}, {"$set": {"isProcessed": True}})
@@ -1,97 +1,390 @@
 # app/use_cases/build_daily_clusters.py
 from __future__ import annotations
 from dataclasses import dataclass
-from datetime import datetime, UTC
-from typing import Any, Dict, Iterable, List, Optional, Protocol
+from datetime import date, datetime, UTC, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple
 
 import numpy as np
 
-from services.embeddings import embed_texts
-from services.clusterer import cluster_embeddings
-from services.labeling import label_from_terms_entities_topics
+from services.embeddings import embed_texts_cached
+from services.clusterer import cluster_summary
+from services.labeling import TfidfLabeler, label_from_terms_entities_topics
+from app.use_cases.cluster_batch import SCORING_FIELDS, ClusterBatch
 
 
 # ---- Ports ----
 class CleanArticlesRepo(Protocol):
-    def get_articles_broad(self, filter_param: Dict[str, Any], projection_param: Optional[Dict[str, int]] = None): ...
+    def get_articles_broad(
+            self,
+            filter_param: Dict[str, Any],
+            projection_param: Optional[Dict[str, int]] = None,
+            batch_size: Optional[int] = None,
+    ): ...
     def update_articles(self, selector: Dict[str, Any], update: Dict[str, Any]) -> int: ...
 
 
+class ClusterStateRepo(Protocol):
+    """Persisted clusters of a sample (see lib.repositories.cluster_state_repository)."""
+
+    def get_state(self, sample_id: str) -> Optional[Dict[str, Any]]: ...
+
+    def save_state(self, sample_id: str, state: Dict[str, Any]) -> None: ...
+
+
+class DocFreqStore(Protocol):
+    """Per-sample term document frequencies (see lib.cache.doc_freq_store)."""
+
+    def window(self, since_iso: str, until_iso: str, exclude: Optional[str] = None) -> Tuple[int, Dict[str, int]]: ...
+
+    def save(self, sample_id: str, date_iso: str, n_docs: int, df: Dict[str, int]) -> None: ...
+
+
+class EmbeddingStore(Protocol):
+    """Per-sample vectors written by the clean stage (see lib.cache.embedding_store)."""
+
+    def vectors_for(self, sample_id: str, ids: List[Any]) -> Optional[np.ndarray]: ...
+
+
 @dataclass
 class BuildDailyClustersConfig:
     cosine_threshold: float = 0.30
     min_cluster_size: int = 3
+    # services.clusterer.CLUSTER_BACKENDS: "agglomerative" (exact, O(n²)), "threshold", "knn_graph"
+    backend: str = "agglomerative"
+    knn_k: int = 10
+    block_size: int = 2048
+    # Incremental mode (needs a ClusterStateRepo): assign only unseen articles to stored centroids,
+    # cluster the leftovers, and fall back to a full recluster every N incremental runs or when
+    # new + unclustered articles exceed `full_recluster_ratio` of the already clustered ones.
+    incremental: bool = False
+    full_recluster_every: int = 6
+    full_recluster_ratio: float = 0.5
+    # Documents per cursor batch when streaming ids/vectors and fetching member fields
+    cursor_batch_size: int = 2000
+    # Labels: top terms per cluster from one TF-IDF fit over the sample; with a DocFreqStore and
+    # label_idf_days > 0, IDF also counts the samples of the previous N days
+    top_terms_k: int = 8
+    label_idf_days: int = 0
+
+
+# Phase 1 (cluster): ids + vectors only; with an embedding store, ids only
+_VECTOR_PROJECTION = {"_id": 1, "embedding": 1}
+# Phase 2 (label): display + scoring fields of kept cluster members; `text` only where `summary` is empty
+_VIEW_PROJECTION = {"_id": 1, "title": 1, "summary": 1, "nouns": 1, "topic": 1,
+                    **{f: 1 for f in SCORING_FIELDS}}
+_IN_CHUNK = 10_000  # ids per $in query
 
 
 class BuildDailyClustersUseCase:
-    def __init__(self, clean_repo: CleanArticlesRepo, config: Optional[BuildDailyClustersConfig] = None) -> None:
+    def __init__(
+            self,
+            clean_repo: CleanArticlesRepo,
+            config: Optional[BuildDailyClustersConfig] = None,
+            state_repo: Optional[ClusterStateRepo] = None,
+            embedding_store: Optional[EmbeddingStore] = None,
+            doc_freq_store: Optional[DocFreqStore] = None,
+    ) -> None:
         self.clean_repo = clean_repo
         self.cfg = config or BuildDailyClustersConfig()
+        self.state_repo = state_repo
+        self.embedding_store = embedding_store
+        self.doc_freq_store = doc_freq_store
 
-    def run(self, sample_id: str) -> Dict[str, Any]:
-        # Pull needed fields only
-        proj = {
-            "_id": 1, "title": 1, "url": 1, "summary": 1, "text": 1, "nouns": 1,
-            "embedding": 1, "topic": 1, "sentiment": 1, "source": 1, "source_domain": 1, "published_at": 1
-        }
-        docs = list(self.clean_repo.get_articles_broad({"sample": sample_id}, proj))
-        if not docs:
-            return {"sample": sample_id, "clusters": [], "meta": {"count": 0}}
+    # ---- shared steps ----
+    def _find(self, selector: Dict[str, Any], projection: Dict[str, int]) -> Iterable[Dict[str, Any]]:
+        return self.clean_repo.get_articles_broad(selector, projection, batch_size=self.cfg.cursor_batch_size)
+
+    def _find_ids(self, ids: List[Any], projection: Dict[str, int]) -> Iterable[Dict[str, Any]]:
+        for start in range(0, len(ids), _IN_CHUNK):
+            yield from self._find({"_id": {"$in": ids[start:start + _IN_CHUNK]}}, projection)
+
+    def _collect(self, docs: Iterable[Dict[str, Any]]) -> Tuple[List[Any], Optional[np.ndarray]]:
+        """
+        Ids of `docs` and their stored embeddings as one float32 matrix, copied into fixed-size
+        chunks as the cursor streams (no per-document dicts are kept). The matrix is None when
+        any embedding is missing, too short or of another length than the first.
+        """
+        ids: List[Any] = []
+        chunks: List[np.ndarray] = []
+        buf: Optional[np.ndarray] = None
+        fill = 0
+        valid = True
+        for d in docs:
+            ids.append(d["_id"])
+            v = d.get("embedding")
+            if not valid:
+                continue
+            if v is None or len(v) < 10 or (buf is not None and len(v) != buf.shape[1]):
+                valid = False
+                continue
+            if buf is None or fill == len(buf):
+                if buf is not None:
+                    chunks.append(buf)
+                buf = np.empty((max(1, self.cfg.cursor_batch_size), len(v)), dtype="float32")
+                fill = 0
+            buf[fill] = v
+            fill += 1
+        if not valid or buf is None:
+            return ids, None
+        chunks.append(buf[:fill])
+        return ids, chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+    def _stream(self, selector: Dict[str, Any]) -> Tuple[List[Any], Optional[np.ndarray]]:
+        """Phase 1: ids (+ stored embeddings unless an embedding store supplies the vectors)."""
+        if self.embedding_store is not None:
+            return [d["_id"] for d in self._find(selector, {"_id": 1})], None
+        return self._collect(self._find(selector, _VECTOR_PROJECTION))
+
+    def _vectors(self, sample_id: str, ids: List[Any], X: Optional[np.ndarray]) -> np.ndarray:
+        # 1) the sample's memory-mapped matrix from the clean stage (already normalized)
+        if self.embedding_store is not None:
+            stored = self.embedding_store.vectors_for(sample_id, ids)
+            if stored is not None:
+                return stored
+            # missing or stale: fetch the stored embeddings phase 1 left out
+            got, X = self._collect(self._find_ids(ids, _VECTOR_PROJECTION))
+            if X is not None and got != ids:
+                pos = {i: r for r, i in enumerate(got)}
+                X = X[[pos[i] for i in ids]] if all(i in pos for i in ids) else None
 
-        # 1) choose text for vectorization (prefer summary)
-        texts = [(d.get("summary") or d.get("text") or "").strip() for d in docs]
         # 2) use stored embeddings if present and valid; otherwise compute
-        stored = [d.get("embedding") for d in docs]
-        if any(v is None or not isinstance(v, list) or len(v) < 10 for v in stored):
-            X = embed_texts(texts)
-        else:
-            X = np.array(stored, dtype="float32")
-            # normalize to unit length if not already
-            norms = np.linalg.norm(X, axis=1, keepdims=True) + 1e-9
-            X = (X / norms).astype("float32")
-
-        # 3) cluster
-        labels, _ = cluster_embeddings(
+        if X is None:
+            texts = {d["_id"]: (d.get("summary") or d.get("text") or "").strip()
+                     for d in self._find_ids(ids, {"_id": 1, "summary": 1, "text": 1})}
+            # choose text for vectorization (prefer summary)
+            return embed_texts_cached([texts.get(i, "") for i in ids])
+        # normalize to unit length if not already (X is our own buffer: in place)
+        X /= np.linalg.norm(X, axis=1, keepdims=True) + 1e-9
+        return X
+
+    def _member_docs(self, ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """Phase 2: display fields of the given (cluster member) ids; `text` only for empty summaries."""
+        by_id = {d["_id"]: d for d in self._find_ids(ids, _VIEW_PROJECTION)}
+        no_summary = [i for i, d in by_id.items() if not (d.get("summary") or "").strip()]
+        for d in self._find_ids(no_summary, {"_id": 1, "text": 1}):
+            by_id[d["_id"]]["text"] = d.get("text")
+        return by_id
+
+    def _scoring_docs(self, entries: List[Dict[str, Any]], by_id: Dict[Any, Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Member docs per entry for the ClusterBatch; members phase 2 did not fetch get SCORING_FIELDS only."""
+        missing = [i for e in entries for i in e["members"] if i not in by_id]
+        if missing:
+            by_id = {**by_id, **{d["_id"]: d for d in self._find_ids(missing, {"_id": 1, **{f: 1 for f in SCORING_FIELDS}})}}
+        return [[by_id[i] for i in e["members"] if i in by_id] for e in entries]
+
+    def _summarize(self, X: np.ndarray):
+        return cluster_summary(
             X,
             cosine_threshold=self.cfg.cosine_threshold,
             min_cluster_size=self.cfg.min_cluster_size,
+            backend=self.cfg.backend,
+            knn_k=self.cfg.knn_k,
+            block_size=self.cfg.block_size,
         )
 
-        # group by cluster id
-        by_c: Dict[int, List[int]] = {}
-        for idx, c in enumerate(labels):
-            by_c.setdefault(int(c), []).append(idx)
+    @staticmethod
+    def _text(doc: Dict[str, Any]) -> str:
+        return (doc.get("summary") or doc.get("text") or "").strip()
 
-        clusters: List[Dict[str, Any]] = []
-        now = datetime.now(UTC)
-        order = 0
-        for cid, idxs in by_c.items():
-            if cid == -1:
-                continue  # treat as noise
-            items = [docs[i] for i in idxs]
-            titles = [it.get("title") for it in items if it.get("title")]
-            sources = [it.get("source_domain") or it.get("source") for it in items]
-            topics = [it.get("topic") for it in items]
-            entities = [it.get("nouns") or [] for it in items]
-            sums = [texts[i] for i in idxs]
-
-            label, top_terms, top_entities, topic_dist = label_from_terms_entities_topics(
-                sums, entities, topics
-            )
-
-            clusters.append({
-                "cluster_id": f"{sample_id}-{order}",
-                "size": len(items),
-                "topic_label": label,
-                "top_terms": top_terms,
-                "top_entities": top_entities,
-                "topic_distribution": topic_dist,
-                "representative_titles": titles[:6],
-                "sources": [{"domain": s, "count": sources.count(s)} for s in sorted(set(sources or []))],
-                "created_at": now,
-            })
-            order += 1
+    def _top_terms(
+            self,
+            sample_id: str,
+            clusters: List[List[Dict[str, Any]]],
+            today: date,
+            record: bool = True,
+    ) -> List[List[str]]:
+        """
+        Top terms of every cluster from one TF-IDF fit over all their members (see TfidfLabeler).
+        The rolling IDF window ends on the run date `today`; `record` stores the sample's
+        document frequencies under that date for later runs (full runs only).
+        """
+        texts = [self._text(it) for items in clusters for it in items]
+        history = None
+        use_store = self.doc_freq_store is not None and self.cfg.label_idf_days > 0
+        if use_store:
+            since = (today - timedelta(days=self.cfg.label_idf_days)).isoformat()
+            history = self.doc_freq_store.window(since, (today + timedelta(days=1)).isoformat(), exclude=sample_id)
+        labeler = TfidfLabeler(texts, history=history)
+        if use_store and record:
+            self.doc_freq_store.save(sample_id, today.isoformat(), *labeler.doc_freqs())
 
+        groups, start = [], 0
+        for items in clusters:
+            groups.append(range(start, start + len(items)))
+            start += len(items)
+        return labeler.top_terms_many(groups, k=self.cfg.top_terms_k)
+
+    def _cluster_view(self, items: List[Dict[str, Any]], terms: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Labels and display fields of one cluster, from its member docs (in member order)."""
+        titles = [it.get("title") for it in items if it.get("title")]
+        sources = [it.get("source_domain") or it.get("source") for it in items]
+        topics = [it.get("topic") for it in items]
+        entities = [it.get("nouns") or [] for it in items]
+        sums = [self._text(it) for it in items]
+
+        label, top_terms, top_entities, topic_dist = label_from_terms_entities_topics(
+            sums, entities, topics, top_terms_k=self.cfg.top_terms_k, terms=terms
+        )
+        return {
+            "size": len(items),
+            "topic_label": label,
+            "top_terms": top_terms,
+            "top_entities": top_entities,
+            "topic_distribution": topic_dist,
+            "representative_titles": titles[:6],
+            "sources": [{"domain": s, "count": sources.count(s)} for s in sorted(set(sources or []))],
+        }
+
+    @staticmethod
+    def _output(
+            sample_id: str,
+            entries: List[Dict[str, Any]],
+            meta: Dict[str, Any],
+            member_docs: List[List[Dict[str, Any]]],
+            dim: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        now = datetime.now(UTC)
+        cluster_ids = [f"{sample_id}-{e['label']}" for e in entries]
+        clusters = [{"cluster_id": cid, **e["view"], "created_at": now} for cid, e in zip(cluster_ids, entries)]
         # sort by size desc as a first proxy (Phase 3 will compute proper scores)
         clusters.sort(key=lambda c: c["size"], reverse=True)
-        return {"sample": sample_id, "clusters": clusters, "meta": {"count": len(docs)}}
+        # members, centroids and scoring fields for rank + link (no second read of the sample)
+        batch = ClusterBatch.from_clusters(sample_id, cluster_ids, [e["centroid"] for e in entries], member_docs,
+                                           dim=dim)
+        return {"sample": sample_id, "clusters": clusters, "meta": meta, "batch": batch}
+
+    # ---- entry point ----
+    def run(self, sample_id: str, date_iso: Optional[str] = None) -> Dict[str, Any]:
+        """`date_iso` is the run date (YYYY-MM-DD) label IDF is windowed on; defaults to today UTC."""
+        today = date.fromisoformat(date_iso[:10]) if date_iso else datetime.now(UTC).date()
+        if self.cfg.incremental and self.state_repo is not None:
+            state = self.state_repo.get_state(sample_id)
+            if state and state.get("config") == self._state_config() \
+                    and state.get("runs_since_full", 0) < self.cfg.full_recluster_every:
+                out = self._run_incremental(sample_id, state, today)
+                if out is not None:
+                    return out
+        return self._run_full(sample_id, today)
+
+    def _run_full(self, sample_id: str, today: date) -> Dict[str, Any]:
+        # Phase 1: ids + vectors only
+        ids, X = self._stream({"sample": sample_id})
+        if not ids:
+            return {"sample": sample_id, "clusters": [], "meta": {"count": 0}}
+        X = self._vectors(sample_id, ids, X)
+
+        # cluster: labels, sizes, member indices and centroids in one pass
+        summary = self._summarize(X)
+        # visit clusters in first-appearance order (noise is already excluded)
+        order = summary.first_appearance_order()
+        members = [[ids[i] for i in summary.members[pos].tolist()] for pos in order]
+
+        # Phase 2: text fields for members of kept clusters only
+        by_id = self._member_docs([i for m in members for i in m])
+        items = [[by_id[i] for i in member_ids if i in by_id] for member_ids in members]
+        terms = self._top_terms(sample_id, items, today)
+        entries: List[Dict[str, Any]] = []
+        for label, (pos, member_ids) in enumerate(zip(order, members)):
+            entries.append({
+                "label": label,
+                "count": len(member_ids),
+                "centroid": summary.centroids[pos].tolist(),
+                "members": member_ids,
+                "view": self._cluster_view(items[label], terms[label]),
+            })
+
+        if self.cfg.incremental and self.state_repo is not None:
+            clustered = np.zeros(len(ids), dtype=bool)
+            for m in summary.members:
+                clustered[m] = True
+            self._save(sample_id, entries, [i for i, c in zip(ids, clustered) if not c], runs_since_full=0)
+
+        return self._output(sample_id, entries, {"count": len(ids), "mode": "full"}, items, dim=X.shape[1])
+
+    def _run_incremental(self, sample_id: str, state: Dict[str, Any], today: date) -> Optional[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = list(state.get("clusters") or [])
+        noise = set(state.get("noise") or [])
+        clustered_ids = [i for e in entries for i in e["members"]]
+
+        # only articles not yet in a cluster: new ones plus earlier leftovers
+        pool, X = self._stream({"sample": sample_id, "_id": {"$nin": clustered_ids}})
+        new = sum(1 for i in pool if i not in noise)
+        total = len(clustered_ids) + len(pool)
+        meta = {"count": total, "mode": "incremental", "new": new}
+        if not new:
+            return self._output(sample_id, entries, meta, self._scoring_docs(entries, {}))
+        if len(pool) > self.cfg.full_recluster_ratio * max(1, len(clustered_ids)):
+            return None
+
+        X = self._vectors(sample_id, pool, X)
+        touched: set[int] = set()
+
+        # 1) nearest stored centroid above the cosine threshold
+        left = np.arange(len(pool))
+        if entries:
+            C = np.array([e["centroid"] for e in entries], dtype="float32")
+            C /= np.linalg.norm(C, axis=1, keepdims=True) + 1e-9
+            S = X @ C.T
+            best = S.argmax(axis=1)
+            ok = S[np.arange(len(pool)), best] >= 1.0 - self.cfg.cosine_threshold
+            for pos in np.unique(best[ok]):
+                rows = np.flatnonzero(ok & (best == pos))
+                e = entries[pos]
+                count = e["count"] + len(rows)
+                centroid = (np.asarray(e["centroid"], dtype="float64") * e["count"] + X[rows].sum(axis=0)) / count
+                entries[pos] = {**e, "count": count, "centroid": centroid.tolist(),
+                                "members": e["members"] + [pool[i] for i in rows]}
+                touched.add(int(pos))
+            left = np.flatnonzero(~ok)
+
+        # 2) leftovers form new clusters under the usual noise rule
+        next_label = int(state.get("next_label", len(entries)))
+        leftover_noise = [pool[i] for i in left]
+        if len(left):
+            summary = self._summarize(X[left])
+            grouped = np.zeros(len(left), dtype=bool)
+            for pos in summary.first_appearance_order():
+                rows = left[summary.members[pos]]
+                grouped[summary.members[pos]] = True
+                entries.append({
+                    "label": next_label,
+                    "count": len(rows),
+                    "centroid": summary.centroids[pos].tolist(),
+                    "members": [pool[i] for i in rows],
+                })
+                touched.add(len(entries) - 1)
+                next_label += 1
+            leftover_noise = [pool[i] for i, g in zip(left, grouped) if not g]
+
+        # 3) relabel only clusters that changed (phase 2 for their members)
+        touched_pos = sorted(touched)
+        by_id = self._member_docs([i for pos in touched_pos for i in entries[pos]["members"]])
+        items = [[by_id[i] for i in entries[pos]["members"] if i in by_id] for pos in touched_pos]
+        for pos, its, terms in zip(touched_pos, items, self._top_terms(sample_id, items, today, record=False)):
+            entries[pos]["view"] = self._cluster_view(its, terms)
+
+        self._save(sample_id, entries, leftover_noise,
+                   runs_since_full=int(state.get("runs_since_full", 0)) + 1, next_label=next_label)
+        return self._output(sample_id, entries, meta, self._scoring_docs(entries, by_id), dim=X.shape[1])
+
+    def _state_config(self) -> Dict[str, Any]:
+        """Settings a stored state was built with; any change forces a full recluster."""
+        return {"cosine_threshold": self.cfg.cosine_threshold,
+                "min_cluster_size": self.cfg.min_cluster_size, "backend": self.cfg.backend}
+
+    def _save(
+            self,
+            sample_id: str,
+            entries: List[Dict[str, Any]],
+            noise: Iterable[Any],
+            runs_since_full: int,
+            next_label: Optional[int] = None,
+    ) -> None:
+        self.state_repo.save_state(sample_id, {
+            "clusters": entries,
+            "noise": list(noise),
+            "next_label": len(entries) if next_label is None else next_label,
+            "runs_since_full": runs_since_full,
+            "config": self._state_config(),
+            "updated_at": datetime.now(UTC),
+        })
@@ -0,0 +1,72 @@
+# app/use_cases/cluster_batch.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Per-doc fields RankClustersUseCase scores on (see services.scoring)
+SCORING_FIELDS = ("source", "source_domain", "published_at", "category")
+
+
+@dataclass
+class ClusterBatch:
+    """
+    In-memory handoff of one trends run: build → rank → link without re-reading the sample.
+    - cluster_ids[r] owns row r of `centroids` (unit-normalized float32) and `members`;
+    - members[r] indexes `doc_ids` / `doc_fields` (slim SCORING_FIELDS dicts of every member).
+    Rows follow the builder's cluster order, not the size or score order of the cluster dicts,
+    so lookups go by cluster_id.
+    """
+    sample: str
+    cluster_ids: List[str]
+    members: List[np.ndarray]
+    centroids: np.ndarray
+    doc_ids: List[Any]
+    doc_fields: List[Dict[str, Any]]
+    _rows: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rows = {cid: r for r, cid in enumerate(self.cluster_ids)}
+
+    @classmethod
+    def from_clusters(
+            cls,
+            sample: str,
+            cluster_ids: Sequence[str],
+            centroids: Sequence[Any],
+            member_docs: Sequence[Sequence[Dict[str, Any]]],
+            dim: Optional[int] = None,
+    ) -> "ClusterBatch":
+        """
+        Batch from per-cluster centroids and member docs (any projection; slimmed here).
+        `dim` (the embedding width) shapes the centroid matrix when no cluster survived.
+        """
+        doc_ids: List[Any] = []
+        doc_fields: List[Dict[str, Any]] = []
+        members: List[np.ndarray] = []
+        for docs in member_docs:
+            start = len(doc_ids)
+            for d in docs:
+                doc_ids.append(d.get("_id"))
+                doc_fields.append({k: d.get(k) for k in SCORING_FIELDS})
+            members.append(np.arange(start, len(doc_ids), dtype=np.int64))
+        if not len(cluster_ids):
+            return cls(sample, [], [], np.empty((0, dim or 0), dtype="float32"), doc_ids, doc_fields)
+        C = np.asarray(centroids, dtype="float32").reshape(len(cluster_ids), -1)
+        C /= np.linalg.norm(C, axis=1, keepdims=True) + 1e-9
+        return cls(sample, list(cluster_ids), members, C, doc_ids, doc_fields)
+
+    def __len__(self) -> int:
+        return len(self.cluster_ids)
+
+    def row(self, cluster_id: str) -> Optional[int]:
+        return self._rows.get(cluster_id)
+
+    def member_docs(self, cluster_id: str) -> List[Dict[str, Any]]:
+        r = self._rows.get(cluster_id)
+        return [] if r is None else [self.doc_fields[i] for i in self.members[r].tolist()]
+
+    def centroid(self, cluster_id: str) -> Optional[np.ndarray]:
+        r = self._rows.get(cluster_id)
+        return None if r is None else self.centroids[r]
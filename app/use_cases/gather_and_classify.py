@@ -1,16 +1,31 @@
 # app/use_cases/gather_and_classify.py
 from __future__ import annotations
 from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
-from typing import Any, Dict, Iterable, Protocol
+from typing import Any, Dict, Iterable, Iterator, Protocol
 
-from services.classifier_service import ClassifierService, ArticleIn
+from services.classifier_service import ClassifierService, ArticleIn, ArticleOut
 
 
 # ---- Ports / Protocols ----
+class Writer(Protocol):
+    """Buffered inserts (see lib.db.bulk_writer.BulkWriter)."""
+
+    # Optional: positions (within the last flush) of inserts that were not written.
+    failed: list[int]
+
+    def insert_one(self, doc: Dict[str, Any]) -> None: ...
+
+    def flush(self) -> int: ...
+
+
 class ArticlesRepo(Protocol):
     def create_articles(self, data: Dict[str, Any]) -> str: ...
 
+    # Optional: repos exposing bulk_writer() get buffered inserts; others are written one by one.
+    def bulk_writer(self, max_ops: int = ..., max_delay: float | None = ...) -> Writer: ...
+
 
 class LinkPoolGatePort(Protocol):
     """Small gate to centralize link_pool decisions."""
@@ -21,6 +36,9 @@ class LinkPoolGatePort(Protocol):
 
     def mark_processed(self, url: str, sample_id: str) -> None: ...
 
+    # Optional: write buffered ensure_tracked/mark_processed calls (see adapters.link_pool_gate).
+    def flush(self) -> None: ...
+
 
 class MetadataRepo(Protocol):
     def insert_metadata(self, doc: Dict[str, Any]) -> str: ...
@@ -43,6 +61,8 @@ class Samples(Protocol):
 class SummariesRepo(Protocol):
     def create_articles(self, data: Dict[str, Any]) -> str: ...
 
+    def bulk_writer(self, max_ops: int = ..., max_delay: float | None = ...) -> Writer: ...
+
 
 class Scraper(Protocol):
     """Yields dicts with keys: title, url, text, source, scraped_at."""
@@ -50,6 +70,38 @@ class Scraper(Protocol):
     def stream(self) -> Iterable[Dict[str, Any]]: ...
 
 
+@dataclass
+class _Tally:
+    ok: int = 0
+    fail: int = 0
+    skipped: int = 0
+    topics: Counter[str] = field(default_factory=Counter)
+    sentiments: Counter[str] = field(default_factory=Counter)
+
+
+@dataclass(frozen=True)
+class _Buffered:
+    """A classified article whose inserts wait in the write buffers."""
+    url: str
+    title: str | None
+    topic: str
+    sentiment: str
+
+
+class _DirectWriter:
+    """Fallback Writer for repos without bulk_writer(): each insert is its own round trip."""
+
+    def __init__(self, repo: Any) -> None:
+        self.repo = repo
+        self.failed: list[int] = []  # a failing insert raises right away
+
+    def insert_one(self, doc: Dict[str, Any]) -> None:
+        self.repo.create_articles(doc)
+
+    def flush(self) -> int:
+        return 0
+
+
 # ---- Use Case ----
 class GatherAndClassifyUseCase:
     def __init__(
@@ -62,6 +114,9 @@ class GatherAndClassifyUseCase:
             classifier: ClassifierService,
             scrapers: list[Scraper],
             link_pool_gate: LinkPoolGatePort,  # <-- inject the gate instead of touching repo directly
+            streaming: bool = True,
+            micro_batch: int = 8,
+            write_batch: int = 500,
     ) -> None:
         self.articles_repo = articles_repo
         self.metadata_repo = metadata_repo
@@ -71,6 +126,110 @@ class GatherAndClassifyUseCase:
         self.classifier = classifier
         self.scrapers = scrapers
         self.link_pool_gate = link_pool_gate
+        # streaming=True: articles flow through dedup/gate/classify/persist as scrapers yield them.
+        # streaming=False: drain every scraper first (legacy behavior, prints a precomputed total).
+        self.streaming = streaming
+        # Articles per classify_many call; 1 reproduces the old per-article path.
+        self.micro_batch = max(1, micro_batch)
+        # Articles/summaries buffered before one bulk write; their links are marked
+        # processed (and counted) only once that write succeeds, so a crash or a rejected
+        # insert never skips unsaved articles.
+        self.write_batch = max(1, write_batch)
+        self._article_writer: Writer = _DirectWriter(articles_repo)
+        self._summary_writer: Writer = _DirectWriter(summaries_repo)
+        self._buffered: list[_Buffered] = []
+        self._sample: str = ""
+
+    @staticmethod
+    def _writer_for(repo: Any) -> Writer:
+        make = getattr(repo, "bulk_writer", None)
+        # the use case decides when to flush (see _flush_writes)
+        return make(max_ops=10 ** 9, max_delay=None) if make else _DirectWriter(repo)
+
+    def _flush_writes(self, tally: _Tally) -> None:
+        buffered, self._buffered = self._buffered, []
+        self._article_writer.flush()
+        failed = set(getattr(self._article_writer, "failed", ()))
+        self._summary_writer.flush()
+        failed.update(getattr(self._summary_writer, "failed", ()))
+        for i, item in enumerate(buffered):
+            if i in failed:
+                # left unmarked: the next run picks the article up again
+                tally.fail += 1
+                print(f"❌ Failed to save: {item.title}")
+                continue
+            # mark processed for this sample
+            self.link_pool_gate.mark_processed(item.url, self._sample)
+            tally.ok += 1
+            tally.topics[item.topic] += 1
+            tally.sentiments[item.sentiment] += 1
+        # gates that buffer track/mark upserts write them now
+        flush_gate = getattr(self.link_pool_gate, "flush", None)
+        if flush_gate:
+            flush_gate()
+
+    def _candidates(self) -> Iterator[Dict[str, Any]]:
+        """Yield raw scraped dicts that have both a url and a non-empty text."""
+        for scraper in self.scrapers:
+            for raw in scraper.stream():
+                url = raw.get("url")
+                text = (raw.get("text") or "").strip()
+                if not url or not text:
+                    continue
+                yield raw
+
+    def _classify(self, arts: list[ArticleIn], batch: int, sample: str) -> list[ArticleOut | Exception]:
+        """Batched classification; if the batch fails, retry per article so one bad text can't sink the rest."""
+        if len(arts) > 1:
+            try:
+                return list(self.classifier.classify_many(arts, batch=batch, sample=sample))
+            except Exception as e:
+                print(f"⚠️ Batch classification failed ({e}); retrying {len(arts)} articles one by one")
+        results: list[ArticleOut | Exception] = []
+        for art in arts:
+            try:
+                results.append(self.classifier.classify(art, batch=batch, sample=sample))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _process_batch(self, arts: list[ArticleIn], batch: int, sample: str, tally: _Tally) -> None:
+        for art, classified in zip(arts, self._classify(arts, batch, sample)):
+            title = art.title
+            try:
+                if isinstance(classified, Exception):
+                    raise classified
+                summary_data = {
+                    "title": classified.title,
+                    "url": classified.url,
+                    "summary": classified.summary,
+                    "source": classified.source,
+                    "scraped_at": classified.scraped_at,
+                    "batch": batch,
+                    "topic": classified.topic,
+                    "sentiment": classified.sentiment,
+                    "sample": sample,
+                }
+                # persist the article and its summary (buffered; counted in _flush_writes)
+                self._article_writer.insert_one(dict(classified.__dict__))
+                self._summary_writer.insert_one(summary_data)
+                self._buffered.append(_Buffered(
+                    url=art.url,
+                    title=title,
+                    topic=classified.topic,
+                    sentiment=classified.sentiment.get("label", "unknown"),
+                ))
+
+                print(f"✅ Processed successfully: {title}")
+
+            except Exception as e:
+                tally.fail += 1
+                # Avoid reprocessing loops on failures; still mark as processed in this sample
+                self.link_pool_gate.mark_processed(art.url, sample)
+                print(f"❌ Failed to process: {title} — Error: {e}")
+
+        if len(self._buffered) >= self.write_batch:
+            self._flush_writes(tally)
 
     def run(self) -> str:
         batch = self.batches.next_batch_number()
@@ -86,86 +245,71 @@ class GatherAndClassifyUseCase:
             "next": None,
         })
         self.samples.link_previous(prev, sample)
+        self._sample = sample
+        self._buffered = []
+        self._article_writer = self._writer_for(self.articles_repo)
+        self._summary_writer = self._writer_for(self.summaries_repo)
+
+        # Step 1: Candidate source. Streaming keeps only the article in hand in memory.
+        total_articles: int | None = None
+        candidates: Iterable[Dict[str, Any]] = self._candidates()
+        if not self.streaming:
+            candidates = list(candidates)
+            total_articles = len(candidates)
+            print(f"📄 Total articles found to process: {total_articles}")
 
-        # Step 1: Gather all candidate articles first (so we can print a total)
-        all_articles: list[Dict[str, Any]] = []
-        for scraper in self.scrapers:
-            for raw in scraper.stream():
+        # Counters
+        seen: set[str] = set()
+        tally = _Tally()
+        pending: list[ArticleIn] = []
+
+        # Step 2: Process each article as it arrives; classify in micro-batches
+        # classified articles sit in the write buffers until a flush: write them even when a
+        # scraper raises or the run is interrupted
+        try:
+            for raw in candidates:
+                count += 1
+                if total_articles is None:
+                    print(f"\n[{count}] Processing article... "
+                          f"(ok={tally.ok}, failed={tally.fail}, skipped={tally.skipped})")
+                else:
+                    print(f"\n[{count}/{total_articles}] Processing article...")
                 url = raw.get("url")
                 text = (raw.get("text") or "").strip()
-                if not url or not text:
-                    continue
-                all_articles.append(raw)
-
-        total_articles = len(all_articles)
-        print(f"📄 Total articles found to process: {total_articles}")
+                title = (raw.get("title") or "").strip() or "(untitled)"
 
-        # Counters
-        seen: set[str] = set()
-        topic_counter: Counter[str] = Counter()
-        sentiment_counter: Counter[str] = Counter()
-        ok = fail = skipped = 0
-
-        # Step 2: Process each article
-        for raw in all_articles:
-            count += 1
-            print(f"\n[{count}/{total_articles}] Processing article...")
-            url = raw.get("url")
-            text = (raw.get("text") or "").strip()
-            title = (raw.get("title") or "").strip() or "(untitled)"
-
-            # Dedup within this run
-            if url in seen:
-                skipped += 1
-                print(f"⏩ Skipping duplicate in batch: {title}")
-                continue
-            seen.add(url)
+                # Dedup within this run
+                if url in seen:
+                    tally.skipped += 1
+                    print(f"⏩ Skipping duplicate in batch: {title}")
+                    continue
+                seen.add(url)
 
-            # Centralized link-pool logic (skip if previously processed)
-            if self.link_pool_gate.is_processed(url):
-                skipped += 1
-                print(f"⏩ Already processed earlier: {title}")
-                continue
-            self.link_pool_gate.ensure_tracked(url)
+                # Centralized link-pool logic (skip if previously processed)
+                if self.link_pool_gate.is_processed(url):
+                    tally.skipped += 1
+                    print(f"⏩ Already processed earlier: {title}")
+                    continue
+                self.link_pool_gate.ensure_tracked(url)
 
-            try:
-                art_in = ArticleIn(
+                pending.append(ArticleIn(
                     title=title,
                     url=url,
                     text=text,
                     source=raw.get("source"),
                     scraped_at=raw.get("scraped_at"),
-                )
-                classified = self.classifier.classify(art_in, batch=batch, sample=sample)
-                summary_data = {
-                    "title": classified.title,
-                    "url": classified.url,
-                    "summary": classified.summary,
-                    "source": classified.source,
-                    "scraped_at": classified.scraped_at,
-                    "batch": batch,
-                    "topic": classified.topic,
-                    "sentiment": classified.sentiment,
-                    "sample": sample,
-                }
-                # persist the article
-                self.articles_repo.create_articles(classified.__dict__)
-                # persist the summary
-                self.summaries_repo.create_articles(summary_data)
-                # mark processed for this sample
-                self.link_pool_gate.mark_processed(url, sample)
+                ))
+                if len(pending) >= self.micro_batch:
+                    self._process_batch(pending, batch, sample, tally)
+                    pending = []
 
-                ok += 1
-                topic_counter[classified.topic] += 1
-                sentiment_counter[classified.sentiment.get("label", "unknown")] += 1
+            if pending:
+                self._process_batch(pending, batch, sample, tally)
+        finally:
+            self._flush_writes(tally)
 
-                print(f"✅ Processed successfully: {title}")
-
-            except Exception as e:
-                fail += 1
-                # Avoid reprocessing loops on failures; still mark as processed in this sample
-                self.link_pool_gate.mark_processed(url, sample)
-                print(f"❌ Failed to process: {title} — Error: {e}")
+        ok, fail, skipped = tally.ok, tally.fail, tally.skipped
+        topic_counter, sentiment_counter = tally.topics, tally.sentiments
 
         # Distributions
         total_processed = sum(topic_counter.values()) or 1
@@ -189,7 +333,7 @@ class GatherAndClassifyUseCase:
 
         # Final summary
         print("\n🏁 Summary")
-        print(f"   ├─ Total candidates: {total_articles}")
+        print(f"   ├─ Total candidates: {count}")
         print(f"   ├─ Success:         {ok}")
         print(f"   ├─ Failed:          {fail}")
         print(f"   └─ Skipped:         {skipped}")
@@ -5,8 +5,9 @@ from datetime import datetime, UTC, timedelta
 from typing import Any, Dict, Iterable, List, Optional, Protocol
 import numpy as np
 
+from app.use_cases.cluster_batch import ClusterBatch
 from services.trends_config import TrendsConfig, default_trends_config
-from utils.trend_utils import cosine_sim, centroid, jaccard
+from utils.trend_utils import jaccard
 
 
 # ---------- Ports ----------
@@ -20,6 +21,9 @@ class TrendThreadsRepo(Protocol):
 
     def get_recent_for_thread(self, thread_id: str, since_iso: str) -> Iterable[Dict[str, Any]]: ...
 
+    # Optional: history of many threads in one query (see TrendThreadsRepository)
+    def get_recent_for_threads(self, thread_ids: List[str], since_iso: str) -> Iterable[Dict[str, Any]]: ...
+
     def upsert_today(self, selector: Dict[str, Any], doc: Dict[str, Any]) -> None: ...
 
 
@@ -27,6 +31,37 @@ class DailyTrendsRepo(Protocol):
     def upsert_daily(self, selector: Dict[str, Any], doc: Dict[str, Any]) -> None: ...
 
 
+class ThreadIndex(Protocol):
+    """Persisted thread centroids (see lib.cache.thread_index.ThreadCentroidIndex)."""
+
+    def window(self, since_iso: str, until_iso: str) -> tuple[np.ndarray, List[Dict[str, Any]]]: ...
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> int: ...
+
+    def flush(self) -> None: ...
+
+
+class Writer(Protocol):
+    """Buffered upserts (see lib.db.bulk_writer.BulkWriter); repos may expose one via bulk_writer()."""
+
+    def update_one(self, selector: Dict[str, Any], update: Dict[str, Any], *, upsert: bool = False) -> None: ...
+
+    def flush(self) -> int: ...
+
+
+class _DirectUpserts:
+    """Fallback Writer for repos without bulk_writer(): forwards each upsert immediately."""
+
+    def __init__(self, upsert: Any) -> None:
+        self.upsert = upsert
+
+    def update_one(self, selector: Dict[str, Any], update: Dict[str, Any], *, upsert: bool = False) -> None:
+        self.upsert(selector, update["$set"])
+
+    def flush(self) -> int:
+        return 0
+
+
 # ---------- Types ----------
 @dataclass
 class LinkThreadsResult:
@@ -48,25 +83,92 @@ class LinkThreadsUseCase:
             threads_repo: TrendThreadsRepo,
             daily_repo: DailyTrendsRepo,
             cfg: Optional[TrendsConfig] = None,
+            index: Optional[ThreadIndex] = None,
+            persist_index: bool = True,
     ) -> None:
         self.clean_repo = clean_repo
         self.threads_repo = threads_repo
         self.daily_repo = daily_repo
         self.cfg = cfg or default_trends_config()
+        # with an index, candidates are the latest centroid of every thread seen in the last
+        # cfg.link_lookback_days days; without one, yesterday's threads from the repo
+        self.index = index
+        # persist_index=False (dry runs) reads the index but never appends today's threads
+        self.persist_index = persist_index
 
-    def _link_target(self, today_centroid: np.ndarray, prev_threads: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        best: Optional[Dict[str, Any]] = None
-        best_sim: float = -1.0
-        for t in prev_threads:
-            c_prev = np.array(t.get("centroid") or [], dtype="float32")
-            if c_prev.size == 0:
+    @staticmethod
+    def _writer_for(repo: Any, upsert: Any) -> Writer:
+        make = getattr(repo, "bulk_writer", None)
+        return make(max_ops=1000, max_delay=None) if make else _DirectUpserts(upsert)
+
+    @staticmethod
+    def _stack_centroids(vectors: List[Any]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Unit-normalized float32 matrix of the non-empty vectors sharing the most common dimension,
+        plus the positions (into `vectors`) of its rows.
+        """
+        arrs = [np.asarray([] if v is None else v, dtype="float32").ravel() for v in vectors]
+        sizes = [a.size for a in arrs if a.size]
+        if not sizes:
+            return np.zeros((0, 0), dtype="float32"), np.zeros(0, dtype=np.int64)
+        dim = max(set(sizes), key=sizes.count)
+        rows = np.array([i for i, a in enumerate(arrs) if a.size == dim], dtype=np.int64)
+        M = np.stack([arrs[i] for i in rows])
+        M /= np.linalg.norm(M, axis=1, keepdims=True) + 1e-9
+        return M, rows
+
+    def _link_targets(
+            self,
+            today_centroids: List[Any],
+            prev_threads: List[Dict[str, Any]],
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Best previous thread for every today centroid; see _link_matrix."""
+        P, prev_rows = self._stack_centroids([t.get("centroid") for t in prev_threads])
+        return self._link_matrix(today_centroids, P, [prev_threads[i] for i in prev_rows])
+
+    def _link_matrix(
+            self,
+            today_centroids: List[Any],
+            P: np.ndarray,
+            candidates: List[Dict[str, Any]],
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Best candidate (cosine ≥ link_threshold_cosine) for every today centroid, from one
+        (clusters × candidates) matmul against the unit rows of P. With cfg.link_one_to_one,
+        pairs are taken greedily by descending similarity so each thread is claimed once.
+        """
+        out: List[Optional[Dict[str, Any]]] = [None] * len(today_centroids)
+        T, today_rows = self._stack_centroids(today_centroids)
+        if not len(P) or not len(T) or P.shape[1] != T.shape[1]:
+            return out
+
+        S = T @ P.T
+        thr = self.cfg.link_threshold_cosine
+        if not self.cfg.link_one_to_one:
+            best = S.argmax(axis=1)
+            ok = S[np.arange(len(T)), best] >= thr
+            for i in np.flatnonzero(ok):
+                out[today_rows[i]] = candidates[best[i]]
+            return out
+
+        ci, ti = np.nonzero(S >= thr)
+        order = np.argsort(-S[ci, ti], kind="stable")
+        taken_c, taken_t = set(), set()
+        for i, j in zip(ci[order].tolist(), ti[order].tolist()):
+            if i in taken_c or j in taken_t:
                 continue
-            sim = cosine_sim(today_centroid, c_prev)
-            if sim > best_sim:
-                best_sim, best = sim, t
-        if best and best_sim >= self.cfg.link_threshold_cosine:
-            return best
-        return None
+            taken_c.add(i)
+            taken_t.add(j)
+            out[today_rows[i]] = candidates[j]
+        return out
+
+    def _link_target(self, today_centroid: np.ndarray, prev_threads: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return self._link_targets([today_centroid], prev_threads)[0]
+
+    @staticmethod
+    def _centroid(cluster: Dict[str, Any], batch: Optional[ClusterBatch]) -> Any:
+        found = batch.centroid(cluster["cluster_id"]) if batch is not None else None
+        return found if found is not None else cluster.get("centroid")
 
     def _compute_ema(self, today_score: float, prev_ema: Optional[float]) -> float:
         lam = self.cfg.ema_lambda
@@ -74,17 +176,32 @@ class LinkThreadsUseCase:
             return today_score
         return lam * today_score + (1.0 - lam) * prev_ema
 
-    def _compute_novelty(self, today_entities: List[str], thread_id: Optional[str], today_iso: str) -> float:
-        if not thread_id:
-            # brand new thread is maximally novel
-            return 1.0
+    def _history_entities(self, thread_ids: List[str], today_iso: str) -> Dict[str, List[str]]:
+        """
+        Entities seen per thread within the novelty window, for all linked threads at once:
+        one `$in` query when the repo has get_recent_for_threads(), else one query per thread.
+        """
+        if not thread_ids:
+            return {}
         # Lookback window
         since = (datetime.fromisoformat(today_iso).date() - timedelta(days=self.cfg.novelty_window_days)).isoformat()
-        hist = list(self.threads_repo.get_recent_for_thread(thread_id, since))
-        hist_ents: List[str] = []
+        ents: Dict[str, List[str]] = {tid: [] for tid in thread_ids}
+        fetch_many = getattr(self.threads_repo, "get_recent_for_threads", None)
+        if fetch_many is not None:
+            hist = fetch_many(thread_ids, since)
+        else:
+            hist = (h for tid in thread_ids for h in self.threads_repo.get_recent_for_thread(tid, since))
         for h in hist:
-            hist_ents.extend(h.get("top_entities") or [])
-        overlap = jaccard(today_entities, hist_ents)
+            if h.get("thread_id") in ents:
+                ents[h["thread_id"]].extend(h.get("top_entities") or [])
+        return ents
+
+    @staticmethod
+    def _compute_novelty(today_entities: List[str], hist_entities: Optional[List[str]]) -> float:
+        if hist_entities is None:
+            # brand new thread is maximally novel
+            return 1.0
+        overlap = jaccard(today_entities, hist_entities)
         return max(0.0, 1.0 - overlap)
 
     def run(
@@ -92,20 +209,33 @@ class LinkThreadsUseCase:
             sample_id: str,
             date_iso: Optional[str],
             ranked_clusters: List[Dict[str, Any]],
+            batch: Optional[ClusterBatch] = None,
     ) -> LinkThreadsResult:
         today = date_iso or datetime.now(UTC).date().isoformat()
 
-        # Gather yesterday threads to link against
-        prev_threads = list(self.threads_repo.get_threads_on(
-            (datetime.fromisoformat(today) - timedelta(days=1)).date().isoformat()
-        ))
+        threads_writer = self._writer_for(self.threads_repo, self.threads_repo.upsert_today)
+        daily_writer = self._writer_for(self.daily_repo, self.daily_repo.upsert_daily)
+
+        # link every cluster at once against the previous threads' centroid matrix
+        # (the builder's batch holds them; cluster dicts may carry their own)
+        centroids = [self._centroid(c, batch) for c in ranked_clusters]
+        if self.index is not None:
+            since = (datetime.fromisoformat(today) - timedelta(days=max(1, self.cfg.link_lookback_days)))
+            P, candidates = self.index.window(since.date().isoformat(), today)
+            targets = self._link_matrix(centroids, P, candidates)
+        else:
+            # Gather yesterday threads to link against
+            prev_threads = list(self.threads_repo.get_threads_on(
+                (datetime.fromisoformat(today) - timedelta(days=1)).date().isoformat()
+            ))
+            targets = self._link_targets(centroids, prev_threads)
+        # novelty history of every linked thread, preloaded
+        history = self._history_entities(list(dict.fromkeys(t["thread_id"] for t in targets if t)), today)
 
         out: List[Dict[str, Any]] = []
-        for c in ranked_clusters:
+        for c, c_vec, linked in zip(ranked_clusters, centroids, targets):
             # centroid
-            c_vec = np.array(c.get("centroid") or [], dtype="float32")
-            # link candidate
-            linked = self._link_target(c_vec, prev_threads)
+            c_vec = np.asarray([] if c_vec is None else c_vec, dtype="float32").ravel()
             if linked:
                 thread_id = linked["thread_id"]
                 prev_ema = linked.get("ema")
@@ -116,7 +246,7 @@ class LinkThreadsUseCase:
             # score today (already in c)
             score_today = float(c.get("cluster_score_today", 0.0))
             ema = self._compute_ema(score_today, prev_ema)
-            novelty = self._compute_novelty(c.get("top_entities") or [], thread_id if linked else None, today)
+            novelty = self._compute_novelty(c.get("top_entities") or [], history.get(thread_id) if linked else None)
 
             thread_doc = {
                 "date": today,
@@ -136,15 +266,16 @@ class LinkThreadsUseCase:
                 "trend_score": ema + novelty + float(c.get("score_components", {}).get("diversity_bonus", 0.0)),
                 "created_at": datetime.now(UTC),
             }
-            # Persist/Upsert per (date, thread_id)
-            self.threads_repo.upsert_today(
+            # Persist/Upsert per (date, thread_id); buffered, flushed once after the loop
+            threads_writer.update_one(
                 {"date": today, "thread_id": thread_id},
-                thread_doc,
+                {"$set": thread_doc},
+                upsert=True,
             )
             # Also upsert a daily_trends view if you prefer one doc per (date, thread_id)
-            self.daily_repo.upsert_daily(
+            daily_writer.update_one(
                 {"date": today, "thread_id": thread_id},
-                {
+                {"$set": {
                     "date": today,
                     "thread_id": thread_id,
                     "sample": sample_id,
@@ -160,10 +291,17 @@ class LinkThreadsUseCase:
                     "cluster_id": c["cluster_id"],
                     "centroid": thread_doc["centroid"],
                     "created_at": thread_doc["created_at"],
-                },
+                }},
+                upsert=True,
             )
             out.append(thread_doc)
 
+        threads_writer.flush()
+        daily_writer.flush()
+        if self.index is not None and self.persist_index:
+            self.index.add_many(out)
+            self.index.flush()
+
         # Sort by final trend score (EMA + novelty + diversity bonus)
         out.sort(key=lambda d: d["trend_score"], reverse=True)
         return LinkThreadsResult(sample=sample_id, date=today, threads=out)
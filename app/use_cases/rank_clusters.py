@@ -1,9 +1,14 @@
 # app/use_cases/rank_clusters.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Protocol
+from datetime import datetime, UTC
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from app.use_cases.cluster_batch import SCORING_FIELDS, ClusterBatch
 from services.scoring_config import ScoringConfig, default_scoring_config
-from services.scoring import score_cluster
+from services.scoring import published_times, score_clusters
 
 
 class CleanArticlesRepo(Protocol):
@@ -15,25 +20,61 @@ class CleanArticlesRepo(Protocol):
 class RankClustersResult:
     sample: str
     clusters: List[Dict[str, Any]]
+    # handed on to LinkThreadsUseCase (centroids)
+    batch: Optional[ClusterBatch] = None
+    # clock recency was scored against
+    as_of: Optional[datetime] = None
 
 
 class RankClustersUseCase:
     def __init__(self, clean_repo: CleanArticlesRepo, cfg: Optional[ScoringConfig] = None) -> None:
         self.clean_repo = clean_repo
         self.cfg = cfg or default_scoring_config()
+        # parsed publish times by article id, kept across runs (re-ranking parses nothing again)
+        self._published: Dict[Any, float] = {}
 
-    def run(self, sample_id: str, clusters: List[Dict[str, Any]]) -> RankClustersResult:
+    def _members(
+            self,
+            sample_id: str,
+            clusters: List[Dict[str, Any]],
+            batch: Optional[ClusterBatch],
+    ) -> Tuple[List[Any], Sequence[Dict[str, Any]], List[np.ndarray]]:
+        """
+        Article ids, scoring docs + member indices (into them) per cluster: from the builder's
+        batch, else one query for the sample and each cluster's `member_ids`.
+        """
+        if batch is not None:
+            empty = np.zeros(0, dtype=np.int64)
+            rows = [batch.row(c["cluster_id"]) for c in clusters]
+            return batch.doc_ids, batch.doc_fields, [empty if r is None else batch.members[r] for r in rows]
         # Pull only what scoring needs
-        proj = {"_id": 1, "source": 1, "source_domain": 1, "published_at": 1, "category": 1}
-        docs_by_id = {d["_id"]: d for d in self.clean_repo.get_articles({"sample": sample_id}, projection=proj)}
+        proj = {"_id": 1, **{f: 1 for f in SCORING_FIELDS}}
+        docs = list(self.clean_repo.get_articles({"sample": sample_id}, projection=proj))
+        pos = {d["_id"]: i for i, d in enumerate(docs)}
+        # drop missing
+        return [d["_id"] for d in docs], docs, [np.array([pos[_id] for _id in c.get("member_ids") or [] if _id in pos], dtype=np.int64)
+                      for c in clusters]
 
-        ranked: List[Dict[str, Any]] = []
-        for c in clusters:
-            ids = c.get("member_ids") or []
-            members = [docs_by_id.get(_id) for _id in ids]
-            members = [m for m in members if m]  # drop missing
-            sc = score_cluster(members, self.cfg)
+    def run(
+            self,
+            sample_id: str,
+            clusters: List[Dict[str, Any]],
+            batch: Optional[ClusterBatch] = None,
+            as_of: Optional[datetime] = None,
+            cfg: Optional[ScoringConfig] = None,
+    ) -> RankClustersResult:
+        """
+        Score and sort `clusters`. Recency is measured against `as_of` (default: now, read once),
+        so a fixed as_of reproduces a run; `cfg` overrides the weights for this run only.
+        """
+        as_of = as_of or datetime.now(UTC)
+        ids, docs, members = self._members(sample_id, clusters, batch)
+        published = published_times(docs, ids, self._published)
 
+        ranked: List[Dict[str, Any]] = []
+        # per-article weights once for the sample, then all clusters in one segmented sum
+        scores = score_clusters(docs, members, cfg or self.cfg, as_of=as_of, published=published)
+        for c, sc in zip(clusters, scores):
             ranked.append({
                 **c,
                 "score_components": sc,
@@ -41,4 +82,4 @@ class RankClustersUseCase:
             })
 
         ranked.sort(key=lambda r: r["cluster_score_today"], reverse=True)
-        return RankClustersResult(sample=sample_id, clusters=ranked)
+        return RankClustersResult(sample=sample_id, clusters=ranked, batch=batch, as_of=as_of)
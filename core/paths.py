@@ -16,3 +16,13 @@ def models_dir(cli_override: str | None = None) -> Path:
 
 def hf_cache_dir(models_root: Path) -> Path:
     return models_root / "transformers"
+
+
+def cache_dir(cli_override: str | None = None) -> Path:
+    # Priority: CLI flag > ENV > repo default (local caches: summaries, embeddings, indexes)
+    if cli_override:
+        return Path(cli_override).resolve()
+    if (env := os.getenv("CACHE_DIR")):
+        return Path(env).resolve()
+    here = Path(__file__).resolve().parent
+    return (here / ".." / "cache").resolve()
@@ -0,0 +1,40 @@
+# lib/cache/doc_freq_store.py
+from __future__ import annotations
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class DocFreqStore:
+    """
+    Document frequencies of label terms, one JSON file per sample ({date, n_docs, df}).
+    window() sums the samples dated within a range into one (n_docs, df) pair: the rolling
+    corpus behind TfidfLabeler's IDF. Re-saving a sample replaces its counts.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, sample_id: str) -> Path:
+        return self.root / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', sample_id)}.json"
+
+    def save(self, sample_id: str, date_iso: str, n_docs: int, df: Dict[str, int]) -> None:
+        path = self._path(sample_id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"sample": sample_id, "date": date_iso[:10], "n_docs": n_docs, "df": df}))
+        os.replace(tmp, path)
+
+    def window(self, since_iso: str, until_iso: str, exclude: Optional[str] = None) -> Tuple[int, Dict[str, int]]:
+        """Summed (n_docs, df) of samples with since <= date < until, minus `exclude`."""
+        n, df = 0, Counter()
+        for path in self.root.glob("*.json"):
+            entry = json.loads(path.read_text())
+            if entry.get("sample") == exclude or not (since_iso[:10] <= entry.get("date", "") < until_iso[:10]):
+                continue
+            n += int(entry.get("n_docs", 0))
+            df.update(entry.get("df") or {})
+        return n, dict(df)
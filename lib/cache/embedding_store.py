@@ -0,0 +1,89 @@
+# lib/cache/embedding_store.py
+from __future__ import annotations
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SampleEmbeddingStore:
+    """
+    Per-sample embedding matrices on local disk, written by the clean stage.
+    - <sample>.npy: unit-normalized float32 (n, dim), opened with np.load(mmap_mode="r").
+    - <sample>.ids.json: clean_articles ids (as strings) in row order; written last, so a file
+      whose id count does not match its rows is treated as missing.
+    Readers ask for the rows of the ids they hold (vectors_for); any unknown id means the
+    store is stale for that sample and None is returned, so callers fall back to Mongo.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, sample_id: str) -> Tuple[Path, Path]:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", sample_id)
+        return self.root / f"{safe}.npy", self.root / f"{safe}.ids.json"
+
+    # --- writes ---
+    def write(self, sample_id: str, ids: Sequence[Any], X: np.ndarray) -> int:
+        """Replace the sample's matrix; returns the row count."""
+        X = np.asarray(X, dtype=np.float32)
+        if len(ids) != len(X):
+            raise ValueError(f"{len(ids)} ids for {len(X)} vectors")
+        X = X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-9)
+        vec_path, ids_path = self._paths(sample_id)
+        tmp_vec, tmp_ids = vec_path.with_suffix(".tmp.npy"), ids_path.with_suffix(".tmp")
+        np.save(tmp_vec, X)
+        tmp_ids.write_text(json.dumps([str(i) for i in ids]))
+        os.replace(tmp_vec, vec_path)
+        os.replace(tmp_ids, ids_path)
+        return len(X)
+
+    def append(self, sample_id: str, ids: Sequence[Any], X: np.ndarray) -> int:
+        """Add rows after the existing ones (the file is rewritten); returns the new row count."""
+        current = self.load(sample_id)
+        if current is None or not len(current[0]):
+            return self.write(sample_id, ids, X)
+        old_ids, old_X = current
+        return self.write(sample_id, old_ids + [str(i) for i in ids], np.vstack([old_X, np.asarray(X, dtype=np.float32)]))
+
+    def delete(self, sample_id: str) -> None:
+        for p in self._paths(sample_id):
+            p.unlink(missing_ok=True)
+
+    # --- reads ---
+    def load(self, sample_id: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        """(ids, read-only memory-mapped matrix), or None when missing or half written."""
+        vec_path, ids_path = self._paths(sample_id)
+        if not (vec_path.exists() and ids_path.exists()):
+            return None
+        ids = json.loads(ids_path.read_text())
+        X = np.load(vec_path, mmap_mode="r")
+        if X.ndim != 2 or len(ids) != len(X):
+            return None
+        return ids, X
+
+    def vectors_for(self, sample_id: str, ids: Sequence[Any]) -> Optional[np.ndarray]:
+        """
+        Rows for `ids` in the given order: the memory map itself when the order matches the
+        file (no copy), else a gathered copy; None when any id is missing from the store.
+        """
+        current = self.load(sample_id)
+        if current is None:
+            return None
+        stored_ids, X = current
+        wanted = [str(i) for i in ids]
+        if wanted == stored_ids:
+            return X
+        pos = {i: r for r, i in enumerate(stored_ids)}
+        rows = [pos.get(i) for i in wanted]
+        if any(r is None for r in rows):
+            return None
+        return np.asarray(X[np.array(rows, dtype=np.int64)])
+
+    def samples(self) -> List[str]:
+        """Sample ids (file stems) with a stored matrix, e.g. for cross-sample analysis."""
+        return sorted(p.name[:-len(".ids.json")] for p in self.root.glob("*.ids.json"))
@@ -0,0 +1,183 @@
+# lib/cache/sqlite_cache.py
+from __future__ import annotations
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form used for content keys."""
+    return _WS.sub(" ", text or "").strip()
+
+
+def content_key(text: str, *parts: Any) -> str:
+    """sha256 of normalized text plus any model id / parameters that change the output."""
+    h = hashlib.sha256()
+    h.update(normalize_text(text).encode("utf-8"))
+    for p in parts:
+        h.update(b"\x1f")
+        h.update(str(p).encode("utf-8"))
+    return h.hexdigest()
+
+
+class SQLiteCache:
+    """
+    Small persistent key -> value (str or bytes) cache on local disk.
+    - LRU eviction once more than `max_entries` rows are stored (None = unbounded); the row
+      count is kept incrementally, so writes only recount the table when it looks full.
+    - Entries older than `ttl_seconds` are treated as misses and purged (None = no TTL).
+    - Thread-safe; counts hits/misses/writes/evictions for reporting.
+    """
+
+    def __init__(
+            self,
+            path: str | Path,
+            table: str = "cache",
+            max_entries: Optional[int] = 100_000,
+            ttl_seconds: Optional[float] = None,
+            clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f" key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed_at)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table}(created_at)")
+        self._conn.commit()
+        self.hits = self.misses = self.writes = self.evictions = 0
+        self._size = self._count()
+
+    # --- reads ---
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        if not keys:
+            return found
+        now = self._clock()
+        with self._lock:
+            expired: List[str] = []
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, value, created_at FROM {self.table} WHERE key IN ({marks})", part
+                ).fetchall()
+                for k, v, created in rows:
+                    if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                        expired.append(k)
+                        continue
+                    found[k] = v
+            if found:
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", [(now, k) for k in found]
+                )
+            if expired:
+                self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(k,) for k in expired])
+                self.evictions += len(expired)
+                self._size -= len(expired)
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    # --- writes ---
+    def put(self, key: str, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        rows = dict(items)
+        if not rows:
+            return
+        now = self._clock()
+        with self._lock:
+            existing = self._existing(list(rows))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(k, v, now, now) for k, v in rows.items()],
+            )
+            self.writes += len(rows)
+            self._size += len(rows) - existing
+            self._evict(now)
+            self._conn.commit()
+
+    def _existing(self, keys: List[str]) -> int:
+        n = 0
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            marks = ",".join("?" * len(part))
+            (found,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE key IN ({marks})", part
+            ).fetchone()
+            n += found
+        return n
+
+    def _count(self) -> int:
+        (size,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return int(size)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            cur = self._conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+            self.evictions += max(cur.rowcount, 0)
+            self._size -= max(cur.rowcount, 0)
+        if self.max_entries is not None and self._size > self.max_entries:
+            # other processes may share the file: recount before deleting anything
+            self._size = self._count()
+            extra = self._size - self.max_entries
+            if extra > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (extra,),
+                )
+                self.evictions += extra
+                self._size -= extra
+
+    # --- admin ---
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "size": len(self),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["SQLiteCache", "content_key", "normalize_text"]
@@ -0,0 +1,185 @@
+# lib/cache/thread_index.py
+from __future__ import annotations
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def _day(date_iso: str) -> int:
+    return date.fromisoformat(date_iso[:10]).toordinal()
+
+
+class ThreadCentroidIndex:
+    """
+    Persistent on-disk index of thread centroids, one row per (thread_id, date).
+    - vectors.f32: memory-mapped float32 matrix (rows × dim), unit-normalized on insert;
+      grown by doubling, so appends never rewrite existing rows.
+    - entries.jsonl: append-only id table ({"row", "thread_id", "date", "ema"} per line); a later
+      line for the same row wins, so re-upserting a thread on the same day updates in place.
+    - meta.json: dim and committed row count, written last on flush() (rows past it are ignored).
+    Queries only read the rows of the requested date window: the latest row of every thread seen
+    in [since, until), so a 30-day lookback scores one row per live thread, not one per day.
+    """
+
+    def __init__(self, path: str | Path, initial_capacity: int = 4096) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.initial_capacity = max(1, initial_capacity)
+        self.dim: Optional[int] = None
+        self.count = 0
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Dict[Tuple[str, int], int] = {}
+        self._codes: Dict[str, int] = {}
+        self._thread_ids: List[str] = []
+        self._thread = np.zeros(0, dtype=np.int64)  # thread code per row
+        self._days = np.zeros(0, dtype=np.int64)    # date ordinal per row
+        self._ema: List[Optional[float]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._load()
+
+    # --- files ---
+    @property
+    def _meta_path(self) -> Path:
+        return self.path / "meta.json"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def _entries_path(self) -> Path:
+        return self.path / "entries.jsonl"
+
+    def _load(self) -> None:
+        if not self._meta_path.exists():
+            return
+        meta = json.loads(self._meta_path.read_text())
+        self.dim, count = int(meta["dim"]), int(meta["count"])
+        self._open_vectors()
+        rows: Dict[int, Dict[str, Any]] = {}
+        if self._entries_path.exists():
+            with self._entries_path.open() as f:
+                for line in f:
+                    if line.strip():
+                        e = json.loads(line)
+                        if e["row"] < count:
+                            rows[e["row"]] = e
+        self._grow_tables(count)
+        for r in range(count):
+            e = rows[r]
+            self._set_entry(r, e["thread_id"], _day(e["date"]), e.get("ema"))
+        self.count = count
+
+    def _open_vectors(self, capacity: Optional[int] = None) -> None:
+        row_bytes = self.dim * 4
+        size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        if capacity is not None and capacity * row_bytes > size:
+            with self._vectors_path.open("ab") as f:
+                f.truncate(capacity * row_bytes)
+            size = capacity * row_bytes
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(size // row_bytes, self.dim))
+
+    def _grow_tables(self, n: int) -> None:
+        extra = n - len(self._thread)
+        if extra > 0:
+            self._thread = np.concatenate([self._thread, np.zeros(extra, dtype=np.int64)])
+            self._days = np.concatenate([self._days, np.zeros(extra, dtype=np.int64)])
+            self._ema.extend([None] * extra)
+
+    def _set_entry(self, row: int, thread_id: str, day: int, ema: Optional[float]) -> None:
+        code = self._codes.setdefault(thread_id, len(self._thread_ids))
+        if code == len(self._thread_ids):
+            self._thread_ids.append(thread_id)
+        self._thread[row] = code
+        self._days[row] = day
+        self._ema[row] = ema
+        self._keys[(thread_id, day)] = row
+
+    # --- writes ---
+    def add(self, thread_id: str, date_iso: str, centroid: Any, ema: Optional[float] = None) -> None:
+        """Insert or replace the centroid of `thread_id` on `date_iso` (visible at once, durable on flush)."""
+        v = np.asarray(centroid, dtype=np.float32).ravel()
+        if v.size == 0:
+            return
+        if self.dim is None:
+            self.dim = int(v.size)
+            self._open_vectors(self.initial_capacity)
+        if v.size != self.dim:
+            raise ValueError(f"Centroid dim {v.size} != index dim {self.dim}")
+
+        day = _day(date_iso)
+        row = self._keys.get((thread_id, day))
+        if row is None:
+            row = self.count
+            if row >= len(self._vectors):
+                self._vectors.flush()
+                self._open_vectors(max(self.initial_capacity, 2 * len(self._vectors)))
+            self._grow_tables(row + 1)
+            self.count += 1
+        self._vectors[row] = v / (np.linalg.norm(v) + 1e-9)
+        self._set_entry(row, thread_id, day, ema)
+        self._pending.append({"row": row, "thread_id": thread_id, "date": date_iso[:10], "ema": ema})
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Add thread docs ({thread_id, date, centroid, ema}); returns how many were indexed."""
+        n = 0
+        for d in docs:
+            if d.get("centroid"):
+                self.add(d["thread_id"], d["date"], d["centroid"], d.get("ema"))
+                n += 1
+        return n
+
+    def flush(self) -> None:
+        """Persist vectors, then id table, then the committed row count."""
+        if not self._pending or self._vectors is None:
+            return
+        self._vectors.flush()
+        with self._entries_path.open("a") as f:
+            for e in self._pending:
+                f.write(json.dumps(e) + "\n")
+        tmp = self._meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"dim": self.dim, "count": self.count}))
+        os.replace(tmp, self._meta_path)
+        self._pending = []
+
+    # --- queries ---
+    def window(self, since_iso: str, until_iso: str) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Latest row of every thread with since <= date < until: (unit vectors, entries), row-aligned.
+        Entries are {"thread_id", "date", "ema"} dicts.
+        """
+        lo, hi = _day(since_iso), _day(until_iso)
+        n = self.count
+        rows = np.flatnonzero((self._days[:n] >= lo) & (self._days[:n] < hi))
+        if not rows.size:
+            return np.zeros((0, self.dim or 0), dtype=np.float32), []
+        # last row per thread after sorting by (thread, day)
+        rows = rows[np.lexsort((self._days[rows], self._thread[rows]))]
+        last = np.r_[self._thread[rows][1:] != self._thread[rows][:-1], True]
+        rows = np.sort(rows[last])
+        entries = [
+            {"thread_id": self._thread_ids[self._thread[r]],
+             "date": date.fromordinal(int(self._days[r])).isoformat(), "ema": self._ema[r]}
+            for r in rows.tolist()
+        ]
+        return np.asarray(self._vectors[rows]), entries
+
+    def search(self, queries: Any, k: int, since_iso: str, until_iso: str) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """Top-k threads (entry, cosine) per query vector, best first, among window(since, until)."""
+        Q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        V, entries = self.window(since_iso, until_iso)
+        if not entries or Q.shape[1] != V.shape[1]:
+            return [[] for _ in range(len(Q))]
+        Q = Q / (np.linalg.norm(Q, axis=1, keepdims=True) + 1e-9)
+        S = Q @ V.T
+        k = min(k, len(entries))
+        top = np.argpartition(-S, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(S, top, axis=1), axis=1, kind="stable"), axis=1)
+        return [[(entries[j], float(S[i, j])) for j in row] for i, row in enumerate(top.tolist())]
+
+    def __len__(self) -> int:
+        return self.count
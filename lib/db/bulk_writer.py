@@ -0,0 +1,121 @@
+# lib/db/bulk_writer.py
+from __future__ import annotations
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import InsertOne, UpdateMany, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+
+@dataclass
+class BulkWriteStats:
+    ops: int = 0            # operations handed to the writer
+    round_trips: int = 0    # bulk_write calls actually issued
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+    upserted: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class BulkWriter:
+    """
+    Buffered write path for one collection.
+    - Operations are queued and sent as a single unordered `bulk_write`.
+    - Flushes when `max_ops` are queued, or on the next write once the oldest queued op
+      is older than `max_delay` seconds (None = size/explicit flush only).
+    - Use as a context manager (or call `flush()`) so the tail is written.
+    With ordered=False a failing op (e.g. duplicate key) does not stop the rest; failures
+    are counted in `stats.errors` and reported, not raised. `failed` holds the queue
+    positions (0-based, within the last flush) of the ops that were not written.
+    """
+
+    def __init__(
+            self,
+            collection: Collection,
+            max_ops: int = 1000,
+            max_delay: Optional[float] = 2.0,
+            ordered: bool = False,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.collection = collection
+        self.max_ops = max(1, max_ops)
+        self.max_delay = max_delay
+        self.ordered = ordered
+        self._clock = clock
+        self._ops: List[Any] = []
+        self._oldest: Optional[float] = None
+        self.stats = BulkWriteStats()
+        self.failed: List[int] = []
+
+    # --- queueing ---
+    def insert_one(self, doc: Dict[str, Any]) -> None:
+        self._add(InsertOne(doc))
+
+    def update_one(self, selector: Dict[str, Any], update: Dict[str, Any], *, upsert: bool = False) -> None:
+        self._add(UpdateOne(selector, update, upsert=upsert))
+
+    def update_many(self, selector: Dict[str, Any], update: Dict[str, Any], *, upsert: bool = False) -> None:
+        self._add(UpdateMany(selector, update, upsert=upsert))
+
+    def _add(self, op: Any) -> None:
+        if not self._ops:
+            self._oldest = self._clock()
+        self._ops.append(op)
+        self.stats.ops += 1
+        if len(self._ops) >= self.max_ops or self._expired():
+            self.flush()
+
+    def _expired(self) -> bool:
+        return self.max_delay is not None and self._oldest is not None \
+            and self._clock() - self._oldest >= self.max_delay
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    # --- writing ---
+    def flush(self) -> int:
+        """
+        Send queued operations in one round trip; returns how many were sent.
+        Positions of the ops that failed are left in `failed` until the next flush.
+        """
+        self.failed = []
+        if not self._ops:
+            return 0
+        ops, self._ops, self._oldest = self._ops, [], None
+        self.stats.round_trips += 1
+        try:
+            result = self.collection.bulk_write(ops, ordered=self.ordered)
+            self._count(result.bulk_api_result)
+        except BulkWriteError as e:
+            details = e.details or {}
+            self._count(details)
+            errors = details.get("writeErrors") or []
+            self.stats.errors += len(errors)
+            self.failed = sorted(int(err["index"]) for err in errors)
+            if self.ordered and self.failed:
+                # an ordered bulk write stops at the first error: the rest were never attempted
+                self.failed += list(range(self.failed[-1] + 1, len(ops)))
+            first = errors[0].get("errmsg") if errors else e
+            print(f"⚠️ Bulk write to '{self.collection.name}': {len(errors)} of {len(ops)} ops failed ({first})")
+        return len(ops)
+
+    def _count(self, res: Dict[str, Any]) -> None:
+        self.stats.inserted += int(res.get("nInserted", 0))
+        self.stats.matched += int(res.get("nMatched", 0))
+        self.stats.modified += int(res.get("nModified", 0))
+        self.stats.upserted += int(res.get("nUpserted", 0))
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "BulkWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.flush()
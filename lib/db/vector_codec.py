@@ -0,0 +1,52 @@
+# lib/db/vector_codec.py
+from __future__ import annotations
+from typing import Any, Optional
+
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype, USER_DEFINED_SUBTYPE, VECTOR_SUBTYPE
+
+# "float32": BSON vector (binary subtype 9, dtype FLOAT32): 2-byte header + little-endian float32;
+#            readable by other drivers via Binary.as_vector() and by Atlas Vector Search.
+# "float16": user-defined subtype 128 with the same header layout + little-endian float16. Stored
+#            embeddings are unit-normalized (|x| <= 1), so no scale is needed; relative error <= ~5e-4.
+# "list":    legacy array of doubles (what older documents hold).
+VECTOR_ENCODINGS = ("float32", "float16", "list")
+
+_F32_HEADER = BinaryVectorDtype.FLOAT32.value + b"\x00"
+_F16_HEADER = b"\x10\x00"
+
+
+def encode_vector(vector: Any, encoding: str = "float32") -> Any:
+    """Encode one embedding for storage (see VECTOR_ENCODINGS)."""
+    arr = np.asarray(vector, dtype=np.float32).ravel()
+    if encoding == "float32":
+        return Binary(_F32_HEADER + arr.astype("<f4").tobytes(), VECTOR_SUBTYPE)
+    if encoding == "float16":
+        return Binary(_F16_HEADER + arr.astype("<f2").tobytes(), USER_DEFINED_SUBTYPE)
+    if encoding == "list":
+        return arr.tolist()
+    raise ValueError(f"Unknown vector encoding {encoding!r}; expected one of {VECTOR_ENCODINGS}")
+
+
+def decode_vector(value: Any) -> Optional[np.ndarray]:
+    """Stored embedding (any VECTOR_ENCODINGS form) -> float32 array; None/empty stays as is."""
+    if value is None:
+        return None
+    if isinstance(value, Binary) and value.subtype == VECTOR_SUBTYPE and value[:2] == _F32_HEADER:
+        return np.frombuffer(value, dtype="<f4", offset=2).astype(np.float32, copy=False)
+    if isinstance(value, Binary) and value.subtype == USER_DEFINED_SUBTYPE and value[:2] == _F16_HEADER:
+        return np.frombuffer(value, dtype="<f2", offset=2).astype(np.float32)
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float32, copy=False)
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=np.float32)
+    raise ValueError(f"Unsupported stored vector of type {type(value).__name__}")
+
+
+def is_encoded(value: Any, encoding: str) -> bool:
+    """True when `value` is already stored in `encoding` (used by the migration script)."""
+    if encoding == "list":
+        return isinstance(value, list)
+    header, subtype = (_F32_HEADER, VECTOR_SUBTYPE) if encoding == "float32" else (_F16_HEADER, USER_DEFINED_SUBTYPE)
+    return isinstance(value, Binary) and value.subtype == subtype and value[:2] == header
+
@@ -1,30 +1,112 @@
 # lib/repositories/clean_articles_repository.py
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from lib.db.mongo_client import get_db
+from lib.db.bulk_writer import BulkWriter
+from lib.db.vector_codec import decode_vector, encode_vector
 from pymongo.collection import Collection
 
+EMBEDDING_FIELD = "embedding"
+
+
+class _DecodedCursor:
+    """Cursor proxy that decodes stored embeddings on iteration; chained calls (sort, limit, ...) keep the proxy."""
+
+    def __init__(self, cursor: Any) -> None:
+        self._cursor = cursor
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (_decode_doc(d) for d in self._cursor)
+
+    def __next__(self) -> Dict[str, Any]:
+        return _decode_doc(next(self._cursor))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            res = attr(*args, **kwargs)
+            return self if res is self._cursor else res
+        return call
+
+
+def _decode_doc(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if doc and doc.get(EMBEDDING_FIELD) is not None:
+        doc[EMBEDDING_FIELD] = decode_vector(doc[EMBEDDING_FIELD])
+    return doc
+
 
 class CleanArticlesRepository:
-    def __init__(self) -> None:
+    """
+    clean_articles access. Embeddings are stored compactly (lib.db.vector_codec) and handed back
+    as float32 numpy arrays, whatever form a document holds them in (legacy float lists included).
+    `vector_encoding` (default: env EMBEDDING_ENCODING or "float32") applies to writes only.
+    """
+
+    def __init__(self, vector_encoding: Optional[str] = None) -> None:
         self.collection: Collection = get_db()["clean_articles"]
+        self.vector_encoding = vector_encoding or os.getenv("EMBEDDING_ENCODING", "float32")
+        encode_vector([], self.vector_encoding)  # validate early
+
+    # --- embedding encode/decode ---
+    def _encode_doc(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        if doc.get(EMBEDDING_FIELD) is None:
+            return doc
+        return {**doc, EMBEDDING_FIELD: encode_vector(doc[EMBEDDING_FIELD], self.vector_encoding)}
+
+    def _encode_update(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        if EMBEDDING_FIELD not in (update.get("$set") or {}):
+            return update
+        return {**update, "$set": self._encode_doc(update["$set"])}
 
     def create_articles(self, article_data: Dict[str, Any]) -> str:
-        result = self.collection.insert_one(article_data)
+        result = self.collection.insert_one(self._encode_doc(article_data))
         return str(result.inserted_id)
 
-    def get_articles(self, params: Dict[str, Any]):
-        return self.collection.find(params)
+    def get_articles(self, params: Dict[str, Any], projection: Optional[Dict[str, int]] = None):
+        return _DecodedCursor(self.collection.find(params, projection=projection))
 
-    def get_articles_broad(self, filter_param: Dict[str, Any], projection_param: Optional[Dict[str, int]] = None):
-        return self.collection.find(filter_param, projection=projection_param)
+    def get_articles_broad(
+            self,
+            filter_param: Dict[str, Any],
+            projection_param: Optional[Dict[str, int]] = None,
+            batch_size: Optional[int] = None,
+    ):
+        cursor = self.collection.find(filter_param, projection=projection_param)
+        return _DecodedCursor(cursor.batch_size(batch_size) if batch_size else cursor)
+
+    def aggregate_articles(self, pipeline: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        """Run an aggregation on clean_articles (large $group stages may spill to disk)."""
+        return self.collection.aggregate(pipeline, allowDiskUse=True)
 
     def get_one_article(self, params: Dict[str, Any], sorting: Optional[List[Tuple[str, int]]] = None):
-        return self.collection.find_one(params, sort=sorting) if sorting else self.collection.find_one(params)
+        doc = self.collection.find_one(params, sort=sorting) if sorting else self.collection.find_one(params)
+        return _decode_doc(doc)
 
     def update_articles(self, selector: Dict[str, Any], update_data: Dict[str, Any]) -> int:
-        result = self.collection.update_one(selector, update_data)
+        result = self.collection.update_one(selector, self._encode_update(update_data))
+        return result.modified_count
+
+    def create_articles_many(self, docs: List[Dict[str, Any]]) -> List[str]:
+        """Unordered insert_many: one round trip for the whole list."""
+        if not docs:
+            return []
+        result = self.collection.insert_many([self._encode_doc(d) for d in docs], ordered=False)
+        return [str(i) for i in result.inserted_ids]
+
+    def update_many_articles(self, selector: Dict[str, Any], update_data: Dict[str, Any]) -> int:
+        result = self.collection.update_many(selector, self._encode_update(update_data))
         return result.modified_count
 
+    def bulk_writer(self, max_ops: int = 1000, max_delay: Optional[float] = 2.0) -> BulkWriter:
+        """
+        Buffered, unordered writes to the clean_articles collection (flushes by size or age).
+        Ops are sent as given: encode embeddings with lib.db.vector_codec.encode_vector first.
+        """
+        return BulkWriter(self.collection, max_ops=max_ops, max_delay=max_delay)
+
     def delete_articles(self, selector: Dict[str, Any]) -> int:
         result = self.collection.delete_many(selector)
         return result.deleted_count
@@ -0,0 +1,21 @@
+# lib/repositories/cluster_state_repository.py
+from typing import Any, Dict, Optional
+from lib.db.mongo_client import get_db
+from pymongo.collection import Collection
+
+
+class ClusterStateRepository:
+    """One document per sample: stored clusters (centroid, count, member ids, view) + noise ids."""
+
+    def __init__(self) -> None:
+        self.collection: Collection = get_db()["cluster_state"]
+
+    def get_state(self, sample_id: str) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"_id": sample_id})
+
+    def save_state(self, sample_id: str, state: Dict[str, Any]) -> None:
+        self.collection.replace_one({"_id": sample_id}, {**state, "_id": sample_id}, upsert=True)
+
+    def delete_state(self, selector: Dict[str, Any]) -> int:
+        result = self.collection.delete_many(selector)
+        return result.deleted_count
@@ -1,6 +1,7 @@
 # lib/repositories/daily_trends_repository.py
 from typing import Any, Dict, Iterable, Optional
 from lib.db.mongo_client import get_db
+from lib.db.bulk_writer import BulkWriter
 from pymongo.collection import Collection
 
 
@@ -33,6 +34,10 @@ class DailyTrendsRepository:
     def upsert_daily(self, selector: Dict[str, Any], doc: Dict[str, Any]) -> None:
         self.collection.update_one(selector, {"$set": doc}, upsert=True)
 
+    def bulk_writer(self, max_ops: int = 1000, max_delay: Optional[float] = 2.0) -> BulkWriter:
+        """Buffered, unordered writes to the daily_trends collection (flushes by size or age)."""
+        return BulkWriter(self.collection, max_ops=max_ops, max_delay=max_delay)
+
     def create_index(self, keys: Iterable[tuple], **kwargs) -> str:
         """
         Create an index on the daily_trends collection.
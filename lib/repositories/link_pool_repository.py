@@ -1,6 +1,7 @@
 # lib/repositories/link_pool_repository.py
-from typing import Any, Dict, Optional, List, Tuple
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 from lib.db.mongo_client import get_db
+from lib.db.bulk_writer import BulkWriter
 from pymongo.collection import Collection
 from pymongo import ReturnDocument
 
@@ -48,6 +49,16 @@ class LinkPoolRepository:
     def find_one_by_url(self, url: str, *, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
         return self.collection.find_one({"url": url}, projection=projection)
 
+    def iter_processed_urls(self, batch_size: int = 10_000) -> Iterator[str]:
+        """Stream URLs of processed links (same rule as is_processed); url-only projection."""
+        cursor = self.collection.find(
+            {"$or": [{"is_articles_processed": True}, {"in_sample": {"$nin": [None, ""]}}]},
+            projection={"url": 1, "_id": 0},
+        ).batch_size(batch_size)
+        for doc in cursor:
+            if doc.get("url"):
+                yield doc["url"]
+
     # --- Convenience gates for the use-case ---
     def ensure_tracked(self, url: str) -> Dict[str, Any]:
         """Idempotent: creates {url} if not present; returns the doc."""
@@ -71,6 +82,10 @@ class LinkPoolRepository:
         )
         return res.modified_count
 
+    def bulk_writer(self, max_ops: int = 1000, max_delay: Optional[float] = 2.0) -> BulkWriter:
+        """Buffered, unordered writes to the link_pool collection (flushes by size or age)."""
+        return BulkWriter(self.collection, max_ops=max_ops, max_delay=max_delay)
+
     # --- Admin / maintenance ---
     def setup_indexes(self) -> None:
         # Unique URL to avoid duplicates
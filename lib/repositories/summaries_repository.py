@@ -1,6 +1,7 @@
 # lib/repositories/summaries_repository.py
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from lib.db.mongo_client import get_db
+from lib.db.bulk_writer import BulkWriter
 from pymongo.collection import Collection
 
 
@@ -27,6 +28,21 @@ class SummariesRepository:
         result = self.collection.update_one(selector, update_data)
         return result.modified_count
 
+    def create_articles_many(self, docs: List[Dict[str, Any]]) -> List[str]:
+        """Unordered insert_many: one round trip for the whole list."""
+        if not docs:
+            return []
+        result = self.collection.insert_many(docs, ordered=False)
+        return [str(i) for i in result.inserted_ids]
+
+    def update_many_articles(self, selector: Dict[str, Any], update_data: Dict[str, Any]) -> int:
+        result = self.collection.update_many(selector, update_data)
+        return result.modified_count
+
+    def bulk_writer(self, max_ops: int = 1000, max_delay: Optional[float] = 2.0) -> BulkWriter:
+        """Buffered, unordered writes to the summaries collection (flushes by size or age)."""
+        return BulkWriter(self.collection, max_ops=max_ops, max_delay=max_delay)
+
     def delete_articles(self, selector: Dict[str, Any]) -> int:
         result = self.collection.delete_many(selector)
         return result.deleted_count
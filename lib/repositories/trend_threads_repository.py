@@ -1,6 +1,7 @@
 # lib/repositories/trend_threads_repository.py
-from typing import Dict, Any, Iterable, List, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from lib.db.mongo_client import get_db
+from lib.db.bulk_writer import BulkWriter
 from pymongo.collection import Collection
 
 
@@ -15,9 +16,28 @@ class TrendThreadsRepository:
     def get_recent_for_thread(self, thread_id: str, since_iso: str) -> Iterable[Dict[str, Any]]:
         return self.collection.find({"thread_id": thread_id, "date": {"$gte": since_iso}}).sort("date", 1)
 
+    def get_recent_for_threads(self, thread_ids: List[str], since_iso: str) -> Iterable[Dict[str, Any]]:
+        """History of many threads since `since_iso` in one query (only the fields novelty needs)."""
+        return self.collection.find(
+            {"thread_id": {"$in": list(thread_ids)}, "date": {"$gte": since_iso}},
+            {"_id": 0, "thread_id": 1, "date": 1, "top_entities": 1},
+        )
+
+    def iter_threads_since(self, since_iso: str, batch_size: int = 1000) -> Iterable[Dict[str, Any]]:
+        """Thread docs dated on/after `since_iso` (oldest first), with just the fields the centroid index keeps."""
+        return self.collection.find(
+            {"date": {"$gte": since_iso}},
+            {"_id": 0, "thread_id": 1, "date": 1, "centroid": 1, "ema": 1},
+            batch_size=batch_size,
+        ).sort("date", 1)
+
     def upsert_today(self, selector: Dict[str, Any], doc: Dict[str, Any]) -> None:
         self.collection.update_one(selector, {"$set": doc}, upsert=True)
 
+    def bulk_writer(self, max_ops: int = 1000, max_delay: Optional[float] = 2.0) -> BulkWriter:
+        """Buffered, unordered writes of trend_threads documents (flushes by size or age)."""
+        return BulkWriter(self.collection, max_ops=max_ops, max_delay=max_delay)
+
     def create_index(self, keys: List[Tuple[str, int]], **kwargs) -> str:
         """
         Create an index on the summaries collection.
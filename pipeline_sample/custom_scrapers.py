@@ -3,19 +3,10 @@ from __future__ import annotations
 from datetime import datetime, UTC
 from typing import Dict, Iterable
 import requests
-import trafilatura
 from bs4 import BeautifulSoup
 import feedparser
 
-
-def _fetch_and_extract(url: str) -> str | None:
-    try:
-        downloaded = trafilatura.fetch_url(url)
-        if downloaded:
-            return trafilatura.extract(downloaded)
-    except Exception as e:
-        print(f"Failed to fetch article: {url}, error: {e}")
-    return None
+from pipeline_sample.fetch_engine import get_fetch_engine
 
 
 def scrape_bbc_stream() -> Iterable[Dict]:
@@ -28,6 +19,7 @@ def scrape_bbc_stream() -> Iterable[Dict]:
         print(f"Error scraping BBC homepage: {e}")
         return
 
+    jobs = []
     for link in soup.select("a[href^='/news'] h2"):
         title = link.get_text(strip=True)
         parent = link.find_parent("a")
@@ -35,8 +27,9 @@ def scrape_bbc_stream() -> Iterable[Dict]:
         full_url = "https://www.bbc.com" + href if href.startswith("/") else href
         if not full_url:
             continue
+        jobs.append((full_url, (title, full_url)))
 
-        full_text = _fetch_and_extract(full_url)
+    for (title, full_url), full_text in get_fetch_engine().stream(jobs):
         if not full_text:
             continue
 
@@ -58,6 +51,7 @@ def scrape_cnn_stream() -> Iterable[Dict]:
         print(f"Error scraping CNN homepage: {e}")
         return
 
+    jobs = []
     for link in soup.select("a[data-link-type='article']"):
         href = link.get("href", "")
         if not href:
@@ -68,8 +62,9 @@ def scrape_cnn_stream() -> Iterable[Dict]:
         if not title_tag:
             continue
         title = title_tag.get_text(strip=True)
+        jobs.append((full_url, (title, full_url)))
 
-        full_text = _fetch_and_extract(full_url)
+    for (title, full_url), full_text in get_fetch_engine().stream(jobs):
         if not full_text:
             continue
 
@@ -110,12 +105,15 @@ def scrape_aljazeera() -> Iterable[Dict]:
     import feedparser
     from datetime import datetime, UTC
     feed = feedparser.parse("https://www.aljazeera.com/xml/rss/all.xml")
+    jobs = []
     for e in feed.entries:
         url = e.get("link")
         title = (e.get("title") or "").strip()
         if not url or not title:
             continue
-        text = _fetch_and_extract(url)
+        jobs.append((url, (title, url)))
+
+    for (title, url), text in get_fetch_engine().stream(jobs):
         if not text:
             continue
         yield {
@@ -46,6 +46,8 @@ def ensure_indexes() -> None:
 
     # --- trends (Phase 4) ---
     repo_trend_threads.create_index([("date", ASCENDING), ("thread_id", ASCENDING)], unique=True)
+    # novelty history: thread_id $in [...] and date >= window start
+    repo_trend_threads.create_index([("thread_id", ASCENDING), ("date", ASCENDING)])
     repo_daily_trends.create_index([("date", DESCENDING), ("trend_score", DESCENDING)])
     repo_daily_trends.create_index([("thread_id", ASCENDING), ("date", DESCENDING)])
 
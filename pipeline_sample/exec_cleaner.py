@@ -3,13 +3,16 @@
 """CLI entry point for cleaning articles (called by Typer)."""
 from __future__ import annotations
 
+import os
 from typing import Optional
 
 from lib.repositories.articles_repository import ArticlesRepository
 from lib.repositories.clean_articles_repository import CleanArticlesRepository
 from lib.repositories.metadata_repository import MetadataRepository
 from lib.repositories.summaries_repository import SummariesRepository
+from pipeline_sample.summarizer import summary_cache_stats
 from services.articles import ArticlesService
+from services.embeddings import embedding_cache_stats, get_embedding_store
 from utils.validation import is_valid_sample
 
 
@@ -26,10 +29,18 @@ def clean_articles(sample_temp: Optional[str] = None) -> str:
     repo_clean_articles = CleanArticlesRepository()
     repo_metadata = MetadataRepository()
     repo_summaries = SummariesRepository()
-    service = ArticlesService(repo_summaries, repo_articles, repo_clean_articles, repo_metadata)
+    service = ArticlesService(
+        repo_summaries, repo_articles, repo_clean_articles, repo_metadata,
+        block_size=int(os.getenv("CLEAN_BLOCK_SIZE", "256")),
+        nlp_batch_size=int(os.getenv("NOUN_BATCH_SIZE", "64")),
+        nlp_n_process=int(os.getenv("NOUN_N_PROCESS", "1")),
+        embedding_store=get_embedding_store(),
+    )
     print("Embedding model: sentence-transformers/all-MiniLM-L6-v2 (local cache)")
     processed_sample = service.clean_articles(sample_temp)
     print(f"Processing, embedding, and insertion of cleaned articles for batch {processed_sample} completed.")
+    print(f"Summary cache: {summary_cache_stats() or 'disabled'}")
+    print(f"Embedding cache: {embedding_cache_stats() or 'disabled'}")
     return processed_sample
 
 
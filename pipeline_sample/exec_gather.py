@@ -30,6 +30,7 @@ from services.metadata import find_last_sample, update_next_in_previous_doc
 from adapters.scrapers import FunctionScraper
 from adapters.pipelines import HFPipelines
 from adapters.link_pool_gate import LinkPoolGate  # <-- gate
+from pipeline_sample.summarizer import summary_cache_stats
 
 # HF setup (local cache)
 from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline as hf_pipeline
@@ -53,6 +54,10 @@ CANDIDATE_TOPICS = [
     "climate and environment", "education and schools", "war and conflict", "travel and tourism",
 ]
 
+# Articles per classify_many call (zero-shot + sentiment run as padded batches of this size)
+CLASSIFY_BATCH_SIZE = int(os.getenv("CLASSIFY_BATCH_SIZE", "8"))
+GATHER_WRITE_BATCH = int(os.getenv("GATHER_WRITE_BATCH", "500"))
+
 
 def _build_scrapers(newsapi_only: bool, target_date: Optional[str]) -> list[FunctionScraper]:
     if newsapi_only:
@@ -80,7 +85,7 @@ def main(*, newsapi_only: bool = False, target_date: Optional[str] = None) -> in
 
     # Build pipelines + classifier
     pipes = HFPipelines(sentiment_pipeline, topic_pipeline, CANDIDATE_TOPICS)
-    classifier = ClassifierService(pipes, candidate_topics=CANDIDATE_TOPICS)
+    classifier = ClassifierService(pipes, candidate_topics=CANDIDATE_TOPICS, batch_size=CLASSIFY_BATCH_SIZE)
 
     # Repos
     repo_articles = ArticlesRepository()
@@ -89,7 +94,12 @@ def main(*, newsapi_only: bool = False, target_date: Optional[str] = None) -> in
     repo_summaries = SummariesRepository()
 
     # Link-pool gate
-    gate = LinkPoolGate(repo_link_pool)
+    gate = LinkPoolGate(
+        repo_link_pool,
+        prefilter=os.getenv("LINK_PREFILTER", "on").lower() not in {"0", "off", "false", "no"},
+        verify_hits=os.getenv("LINK_PREFILTER_VERIFY", "on").lower() not in {"0", "off", "false", "no"},
+        write_batch=GATHER_WRITE_BATCH,
+    )
 
     # Small adapters
     class _Batches:
@@ -115,10 +125,14 @@ def main(*, newsapi_only: bool = False, target_date: Optional[str] = None) -> in
         classifier=classifier,
         scrapers=scrapers,
         link_pool_gate=gate,
+        micro_batch=CLASSIFY_BATCH_SIZE,
+        write_batch=GATHER_WRITE_BATCH,
     )
 
     sample_id = usecase.run()
     print(f"✅ Gather+Classify completed. Sample: {sample_id}")
+    print(f"Summary cache: {summary_cache_stats() or 'disabled'}")
+    print(f"Link pool gate: {gate.stats()}")
     return 0
 
 
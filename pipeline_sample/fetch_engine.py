@@ -0,0 +1,162 @@
+# pipeline_sample/fetch_engine.py
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+import requests
+import trafilatura
+
+T = TypeVar("T")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; LanguageTrendExplorer/1.0; +https://github.com/christianfitaram)",
+}
+
+# Retry on throttling and transient upstream errors only; other 4xx are final.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchEngine:
+    """
+    Shared, bounded fetch+extract engine for the scrapers.
+
+    - A single thread pool (`max_workers`) is shared by every scraper.
+    - At most `per_host` requests hit the same host at once.
+    - Each request has a `timeout`; transient failures are retried `retries` times
+      with linear backoff.
+    - `stream()` keeps a bounded window of in-flight jobs and yields results as they
+      complete, so scrapers can keep yielding dicts lazily.
+    """
+
+    def __init__(
+            self,
+            max_workers: int = 16,
+            per_host: int = 4,
+            timeout: float = 10.0,
+            retries: int = 2,
+            backoff: float = 0.5,
+            extract: Optional[Callable[[bytes], Optional[str]]] = None,
+            headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.per_host = max(1, int(per_host))
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.extract = extract or trafilatura.extract
+        self.headers = headers or DEFAULT_HEADERS
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- internals ---
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = (urlparse(url).hostname or "").lower()
+        with self._host_lock:
+            sem = self._host_slots.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = sem
+            return sem
+
+    def _session(self) -> requests.Session:
+        # requests.Session is not thread-safe; keep one per worker thread.
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = requests.Session()
+            s.headers.update(self.headers)
+            self._local.session = s
+        return s
+
+    def _download(self, url: str) -> Optional[bytes]:
+        last_err: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * attempt)
+            try:
+                with self._slot(url):
+                    res = self._session().get(url, timeout=self.timeout)
+                if res.status_code in RETRY_STATUSES:
+                    last_err = RuntimeError(f"HTTP {res.status_code}")
+                    continue
+                res.raise_for_status()
+                # raw bytes: trafilatura detects the charset (res.text falls back to ISO-8859-1)
+                return res.content
+            except requests.HTTPError as e:
+                last_err = e
+                break
+            except Exception as e:
+                last_err = e
+        print(f"Failed to fetch article: {url}, error: {last_err}")
+        return None
+
+    # --- public API ---
+    def fetch_and_extract(self, url: str) -> Optional[str]:
+        """Download `url` (with retries) and return the extracted main text, or None."""
+        html = self._download(url)
+        if not html:
+            return None
+        try:
+            return self.extract(html)
+        except Exception as e:
+            print(f"Failed to extract article: {url}, error: {e}")
+            return None
+
+    def stream(self, jobs: Iterable[Tuple[str, T]], window: Optional[int] = None) -> Iterator[Tuple[T, Optional[str]]]:
+        """
+        Fetch `(url, payload)` jobs concurrently and yield `(payload, text)` in completion order.
+        At most `window` jobs (default 2x max_workers) are in flight at any time.
+        """
+        window = window or self.max_workers * 2
+        pending: Dict[Future, T] = {}
+        queue = deque(jobs)
+        try:
+            while queue or pending:
+                while queue and len(pending) < window:
+                    url, payload = queue.popleft()
+                    pending[self._pool.submit(self.fetch_and_extract, url)] = payload
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    payload = pending.pop(fut)
+                    yield payload, fut.result()
+        finally:
+            # consumer stopped early: drop what hasn't started yet
+            for fut in pending:
+                fut.cancel()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_engine: Optional[FetchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Process-wide engine shared by all scrapers; tuned via FETCH_* env vars."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine(
+                max_workers=int(os.getenv("FETCH_MAX_WORKERS", "16")),
+                per_host=int(os.getenv("FETCH_PER_HOST", "4")),
+                timeout=float(os.getenv("FETCH_TIMEOUT", "10")),
+                retries=int(os.getenv("FETCH_RETRIES", "2")),
+            )
+        return _engine
+
+
+def set_fetch_engine(engine: Optional[FetchEngine]) -> None:
+    """Swap the shared engine (tests, custom wiring). None resets to env defaults."""
+    global _engine
+    with _engine_lock:
+        _engine = engine
+
+
+__all__ = ["FetchEngine", "get_fetch_engine", "set_fetch_engine"]
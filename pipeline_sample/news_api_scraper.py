@@ -5,9 +5,10 @@ from datetime import datetime, date, UTC, timezone
 from typing import Dict, Iterable, Optional, Union
 
 import requests
-import trafilatura
 from dotenv import load_dotenv
 
+from pipeline_sample.fetch_engine import get_fetch_engine
+
 TOPIC_QUERY = (
     "politics OR government OR sports OR athletics OR science OR research OR "
     "technology OR innovation OR health OR medicine OR business OR finance OR "
@@ -50,16 +51,6 @@ def _date_param(d: Optional[Union[str, date, datetime]]) -> str:
     return str(d)
 
 
-def _fetch_and_extract(url: str) -> Optional[str]:
-    try:
-        downloaded = trafilatura.fetch_url(url)
-        if downloaded:
-            return trafilatura.extract(downloaded)
-    except Exception as e:
-        print(f"Failed to fetch article: {url}, error: {e}")
-    return None
-
-
 def scrape_newsapi_stream(
     language: str = "en",
     page_size: int = 50,
@@ -91,6 +82,7 @@ def scrape_newsapi_stream(
             print(f"Error fetching news (page {page}): {e}")
             return
 
+        jobs = []
         for a in data.get("articles", []):
             content = (a.get("content") or "")
             if any(snippet in content for snippet in UNWANTED_CONTENT_SNIPPETS):
@@ -99,8 +91,10 @@ def scrape_newsapi_stream(
             url = a.get("url")
             if not url:
                 continue
+            jobs.append((url, a))
 
-            text = _fetch_and_extract(url)
+        for a, text in get_fetch_engine().stream(jobs):
+            url = a.get("url")
             if not text or not text.strip():
                 continue
 
@@ -147,6 +141,7 @@ def scrape_all_categories(
                     print(f"Error fetching category '{category}', page {page}: {e}")
                     continue
 
+                jobs = []
                 for a in data.get("articles", []):
                     published_at_str = a.get("publishedAt")
                     if not published_at_str:
@@ -167,8 +162,11 @@ def scrape_all_categories(
                     url = a.get("url")
                     if not url:
                         continue
+                    jobs.append((url, a))
 
-                    text = _fetch_and_extract(url)
+                for a, text in get_fetch_engine().stream(jobs):
+                    url = a.get("url")
+                    published_at_str = a.get("publishedAt")
                     if not text or not text.strip():
                         continue
 
@@ -2,10 +2,15 @@
 import os
 import re
 import torch
+from bisect import bisect_right
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Sequence, Tuple
 
-from transformers import pipeline, BartTokenizer, AutoModelForSeq2SeqLM
+from transformers import pipeline, BartTokenizerFast, AutoModelForSeq2SeqLM
+
+from core.paths import cache_dir
+from lib.cache.sqlite_cache import SQLiteCache, content_key
 import os
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"   # TensorFlow: suppress INFO & WARNING
 os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "1"  # Optional: quieter MPS fallback
@@ -24,6 +29,8 @@ UNWANTED_KEYWORDS = [
 HF_HOME = Path(os.getenv("HF_HOME", "models/transformers")).resolve()
 MODEL_REPO = "facebook/bart-large-cnn"
 MODEL_CACHE_DIRNAME = "models--facebook--bart-large-cnn"  # HF cache naming
+# Everything besides model + text that changes a summary; bump when chunking/generation rules change.
+SUMMARY_PARAMS = "chunk=512;lengths=v1;recurse>512;decode=skip_special"
 
 
 # -------------------------
@@ -43,9 +50,10 @@ _DEVICE_DEFAULT = _default_device()
 # Lazy singletons
 # -------------------------
 _SNAPSHOT_PATH: Optional[Path] = None
-_TOKENIZER: Optional[BartTokenizer] = None
+_TOKENIZER: Optional[BartTokenizerFast] = None
 _MODEL: Optional[AutoModelForSeq2SeqLM] = None
 _PIPELINE = None  # hf pipeline
+_SUMMARY_CACHE: Optional[SQLiteCache] = None
 
 
 def _resolve_local_snapshot(base: Path, repo_dirname: str) -> Path:
@@ -78,7 +86,7 @@ def _ensure_loaded(device_id: Optional[int] = None) -> None:
         _SNAPSHOT_PATH = _resolve_local_snapshot(HF_HOME, MODEL_CACHE_DIRNAME)
 
     if _TOKENIZER is None:
-        _TOKENIZER = BartTokenizer.from_pretrained(_SNAPSHOT_PATH)
+        _TOKENIZER = BartTokenizerFast.from_pretrained(_SNAPSHOT_PATH)
 
     if _MODEL is None:
         _MODEL = AutoModelForSeq2SeqLM.from_pretrained(_SNAPSHOT_PATH)
@@ -111,30 +119,183 @@ def _choose_device(device: str | int) -> int:
         return _DEVICE_DEFAULT
 
 
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?]) +")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A slice of an article plus its token ids (no special tokens), ready for generation."""
+    text: str
+    input_ids: List[int]
+
+    @property
+    def length(self) -> int:
+        return len(self.input_ids)
+
+
+def chunk_text_ids(text: str, max_tokens: int = 512) -> List[Chunk]:
+    """
+    Split into ~token-limited chunks, tokenizing the article exactly once.
+    Sentences come from the same regex as before; each token is assigned to a sentence via
+    the fast tokenizer's offset mapping, so no per-sentence encode is needed.
+    A single sentence longer than `max_tokens` is cut into `max_tokens` windows.
+    """
+    if _TOKENIZER is None:
+        _ensure_loaded()  # need tokenizer
+    enc = _TOKENIZER(text, add_special_tokens=False, return_offsets_mapping=True)  # type: ignore[misc]
+    ids: List[int] = list(enc["input_ids"])
+    offsets: List[Tuple[int, int]] = [tuple(o) for o in enc["offset_mapping"]]
+    if not ids:
+        return []
+
+    # sentence k covers chars [starts[k], starts[k + 1])
+    starts = [0] + [m.end() for m in _SENTENCE_BREAK.finditer(text)]
+
+    # contiguous token ranges per sentence: (first_token, end_token)
+    spans: List[Tuple[int, int]] = []
+    sent_of_prev = -1
+    for t, (char_start, _) in enumerate(offsets):
+        k = bisect_right(starts, char_start) - 1
+        if k != sent_of_prev:
+            spans.append((t, t + 1))
+            sent_of_prev = k
+        else:
+            spans[-1] = (spans[-1][0], t + 1)
+
+    # split oversize sentences into windows
+    pieces: List[Tuple[int, int]] = []
+    for a, b in spans:
+        while b - a > max_tokens:
+            pieces.append((a, a + max_tokens))
+            a += max_tokens
+        pieces.append((a, b))
+
+    # greedy packing, same rule as the sentence-level chunker
+    chunks: List[Chunk] = []
+    cur_a = cur_b = None
+    for a, b in pieces:
+        if cur_a is not None and (b - cur_a) > max_tokens:
+            chunks.append(_make_chunk(text, ids, offsets, cur_a, cur_b))
+            cur_a = None
+        if cur_a is None:
+            cur_a = a
+        cur_b = b
+    if cur_a is not None:
+        chunks.append(_make_chunk(text, ids, offsets, cur_a, cur_b))
+    return chunks
+
+
+def _make_chunk(text: str, ids: List[int], offsets: List[Tuple[int, int]], a: int, b: int) -> Chunk:
+    return Chunk(text=text[offsets[a][0]:offsets[b - 1][1]].strip(), input_ids=ids[a:b])
+
+
 def chunk_text(text: str, max_tokens: int = 512) -> List[str]:
     """
     Split into ~token-limited chunks using the real tokenizer.
     """
-    _ensure_loaded()  # need tokenizer
-    sentences = re.split(r"(?<=[.!?]) +", text)
-    chunks: List[str] = []
-    current_chunk = ""
-    current_len = 0
-
-    for sentence in sentences:
-        token_len = len(_TOKENIZER.encode(sentence, add_special_tokens=False))  # type: ignore[arg-type]
-        if current_len + token_len > max_tokens:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence
-            current_len = token_len
-        else:
-            current_chunk += (" " if current_chunk else "") + sentence
-            current_len += token_len
+    return [c.text for c in chunk_text_ids(text, max_tokens=max_tokens)]
 
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-    return chunks
+
+def _length_bucket(input_len: int) -> int:
+    """summarize_many bucket of a chunk: power-of-two token ranges below 200, one bucket above."""
+    if input_len >= 200:
+        return 512
+    return 1 << max(input_len - 1, 0).bit_length()
+
+
+def _generation_lengths(input_len: int) -> Tuple[int, int]:
+    """(max_length, min_length) for a chunk of `input_len` tokens."""
+    if input_len < 200:
+        max_len = max(int(input_len * 0.8), 20)
+        return max_len, min(10, max_len // 2)
+    return 200, 80
+
+
+def _model_device():
+    dev = getattr(_PIPELINE, "device", None)
+    return dev if dev is not None else getattr(_MODEL, "device", "cpu")
+
+
+def _generate(chunks: List[Chunk], max_len: int, min_len: int) -> List[Tuple[str, int]]:
+    """
+    Generate summaries straight from pre-computed token ids (no re-encode).
+    Rows are right-padded to the longest chunk in the batch.
+    Returns (summary_text, summary_token_count) per chunk.
+    """
+    rows = [_TOKENIZER.build_inputs_with_special_tokens(c.input_ids) for c in chunks]
+    pad_id = _TOKENIZER.pad_token_id
+    width = max(len(r) for r in rows)
+    input_ids = torch.full((len(rows), width), pad_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+    for i, r in enumerate(rows):
+        input_ids[i, :len(r)] = torch.tensor(r, dtype=torch.long)
+        attention_mask[i, :len(r)] = 1
+
+    device = _model_device()
+    with torch.no_grad():
+        out = _MODEL.generate(
+            input_ids=input_ids.to(device),
+            attention_mask=attention_mask.to(device),
+            max_length=max_len,
+            min_length=min_len,
+            do_sample=False,
+        )
+    special = set(_TOKENIZER.all_special_ids)
+    texts = _TOKENIZER.batch_decode(out, skip_special_tokens=True)
+    counts = [sum(1 for t in row.tolist() if t not in special) for row in out]
+    return list(zip(texts, counts))
+
+
+def _joined_token_len(counts: List[int]) -> int:
+    """Token length of the summaries joined with newlines (one token per separator)."""
+    return sum(counts) + max(len(counts) - 1, 0)
+
+
+def _ensure_ready(device: str | int) -> int:
+    device_id = _choose_device(device)
+
+    # Ensure model is available on the requested device
+    _ensure_loaded(device_id=device_id)
+
+    # Safety guard: make sure model/tokenizer exist
+    if _MODEL is None or _TOKENIZER is None:
+        raise RuntimeError("Summarizer pipeline did not initialize correctly. "
+                           "Check that the local HF cache exists and HF_HOME is set.")
+    return device_id
+
+
+def _summary_cache_enabled() -> bool:
+    return os.getenv("SUMMARY_CACHE", "on").strip().lower() not in {"0", "off", "false", "no"}
+
+
+def get_summary_cache() -> Optional[SQLiteCache]:
+    """
+    Persistent summary cache shared by classify and clean (SQLite under CACHE_DIR).
+    Env: SUMMARY_CACHE=off disables it; SUMMARY_CACHE_PATH, SUMMARY_CACHE_MAX_ENTRIES,
+    SUMMARY_CACHE_TTL_DAYS tune it.
+    """
+    global _SUMMARY_CACHE
+    if not _summary_cache_enabled():
+        return None
+    if _SUMMARY_CACHE is None:
+        path = os.getenv("SUMMARY_CACHE_PATH") or str(cache_dir() / "summaries.sqlite")
+        ttl_days = os.getenv("SUMMARY_CACHE_TTL_DAYS")
+        _SUMMARY_CACHE = SQLiteCache(
+            path,
+            table="summaries",
+            max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "200000")),
+            ttl_seconds=float(ttl_days) * 86400 if ttl_days else None,
+        )
+    return _SUMMARY_CACHE
+
+
+def summary_cache_stats() -> Dict[str, int]:
+    cache = get_summary_cache()
+    return cache.stats() if cache else {}
+
+
+def _summary_key(text: str) -> str:
+    return content_key(text, MODEL_REPO, SUMMARY_PARAMS)
 
 
 def smart_summarize(text: str, device: str | int = "auto") -> str:
@@ -143,43 +304,40 @@ def smart_summarize(text: str, device: str | int = "auto") -> str:
     - Lazy‑loads model/tokenizer/pipeline on first use.
     - If text is short (<200 chars), returns as‑is.
     - Uses chunking + rare recursive pass to keep output <~512 tokens.
+    - The article is tokenized once; chunk ids go straight into generation.
+    - Results are memoized in the persistent summary cache (see get_summary_cache).
     """
     txt = (text or "").strip()
     if len(txt) < 200:
         return txt
 
-    device_id = _choose_device(device)
+    cache = get_summary_cache()
+    key = _summary_key(txt)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
 
-    # Ensure pipeline is available on the requested device
-    _ensure_loaded(device_id=device_id)
+    summary = _summarize_text(txt, device)
+    if cache is not None:
+        cache.put(key, summary)
+    return summary
 
-    # Safety guard: make sure pipeline/tokenizer exist
-    if _PIPELINE is None or _TOKENIZER is None:
-        raise RuntimeError("Summarizer pipeline did not initialize correctly. "
-                           "Check that the local HF cache exists and HF_HOME is set.")
 
-    chunks = chunk_text(txt)  # this calls _ensure_loaded() too, but we already did it
-    summaries: List[str] = []
+def _summarize_text(txt: str, device: str | int) -> str:
+    if len(txt) < 200:
+        return txt
+
+    device_id = _ensure_ready(device)
 
-    for chunk in chunks:
+    summaries: List[str] = []
+    counts: List[int] = []
+    for chunk in chunk_text_ids(txt):
         try:
-            input_len = len(_TOKENIZER.encode(chunk, add_special_tokens=False))
-            if input_len < 200:
-                max_len = max(int(input_len * 0.8), 20)
-                min_len = min(10, max_len // 2)
-            else:
-                max_len = 200
-                min_len = 80
-
-            # Either form works once _PIPELINE is set; keep explicit __call__ for clarity
-            result = _PIPELINE.__call__(
-                chunk,
-                max_length=max_len,
-                min_length=min_len,
-                do_sample=False
-            )
-            summary = result[0]["summary_text"]
+            max_len, min_len = _generation_lengths(chunk.length)
+            summary, n_tokens = _generate([chunk], max_len, min_len)[0]
             summaries.append(summary)
+            counts.append(n_tokens)
 
             if torch.backends.mps.is_available():
                 torch.mps.empty_cache()
@@ -187,9 +345,111 @@ def smart_summarize(text: str, device: str | int = "auto") -> str:
             print(f"[summarizer] Error summarizing chunk: {e}")
 
     text_processed = "\n".join(summaries)
-    token_len = len(_TOKENIZER.encode(text_processed, add_special_tokens=False))
 
-    if token_len > 512:
-        return smart_summarize(text_processed, device=device_id)
+    if _joined_token_len(counts) > 512:
+        return _summarize_text(text_processed, device=device_id)
 
     return text_processed
+
+
+def _summarize_bucket(chunks: List[Chunk], batch_size: int) -> List[Optional[Tuple[str, int]]]:
+    """
+    Run length-sorted (longest first) chunks through the model as padded batches.
+    Each batch takes the generation lengths of its shortest chunk, so no chunk gets a
+    longer summary than it would on its own.
+    A failing batch is retried chunk by chunk; chunks that still fail come back as None.
+    """
+    out: List[Optional[Tuple[str, int]]] = []
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        max_len, min_len = _generation_lengths(min(c.length for c in batch))
+        try:
+            out.extend(_generate(batch, max_len, min_len))
+        except Exception as e:
+            print(f"[summarizer] Batch of {len(batch)} failed ({e}); retrying chunk by chunk")
+            for chunk in batch:
+                try:
+                    out.append(_generate([chunk], max_len, min_len)[0])
+                except Exception as chunk_err:
+                    print(f"[summarizer] Error summarizing chunk: {chunk_err}")
+                    out.append(None)
+
+        if torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+    return out
+
+
+def summarize_many(texts: Sequence[str], device: str | int = "auto", batch_size: int = 8) -> List[str]:
+    """
+    Batched counterpart of `smart_summarize` for many articles.
+    - Chunks every article, then pools chunks from all articles.
+    - Buckets chunks by token-length range (powers of two, see _length_bucket) and sorts a
+      bucket by token length, so each padded batch wastes little padding; a batch uses the
+      generation lengths of its shortest chunk (see _summarize_bucket).
+    - Reassembles per-article summaries in chunk order and runs the recursive second pass
+      for all over-long results together.
+    - Consults the persistent summary cache first; only misses reach the model.
+    Returns one summary per input, in input order.
+    """
+    results: List[str] = [(t or "").strip() for t in texts]
+    todo = [i for i, t in enumerate(results) if len(t) >= 200]
+    if not todo:
+        return results
+
+    cache = get_summary_cache()
+    if cache is None:
+        return _summarize_many(results, device, batch_size)
+
+    keys = {i: _summary_key(results[i]) for i in todo}
+    found = cache.get_many(keys.values())
+    misses = [i for i in todo if keys[i] not in found]
+    for i in todo:
+        if keys[i] in found:
+            results[i] = found[keys[i]]
+    if misses:
+        computed = _summarize_many([results[i] for i in misses], device, batch_size)
+        cache.put_many([(keys[i], summary) for i, summary in zip(misses, computed)])
+        for i, summary in zip(misses, computed):
+            results[i] = summary
+    return results
+
+
+def _summarize_many(texts: Sequence[str], device: str | int, batch_size: int) -> List[str]:
+    results: List[str] = [(t or "").strip() for t in texts]
+    todo = [i for i, t in enumerate(results) if len(t) >= 200]
+    if not todo:
+        return results
+
+    device_id = _ensure_ready(device)
+
+    # 1) pool chunks from all articles: length bucket -> [(article_idx, chunk_idx, chunk)]
+    buckets: Dict[int, List[Tuple[int, int, Chunk]]] = {}
+    n_chunks: Dict[int, int] = {}
+    for i in todo:
+        chunks = chunk_text_ids(results[i])
+        n_chunks[i] = len(chunks)
+        for j, chunk in enumerate(chunks):
+            buckets.setdefault(_length_bucket(chunk.length), []).append((i, j, chunk))
+
+    # 2) padded batches per bucket, longest first
+    pieces: Dict[Tuple[int, int], Optional[Tuple[str, int]]] = {}
+    for entries in buckets.values():
+        entries.sort(key=lambda e: e[2].length, reverse=True)
+        summaries = _summarize_bucket([e[2] for e in entries], batch_size)
+        for (i, j, _), summary in zip(entries, summaries):
+            pieces[(i, j)] = summary
+
+    # 3) reassemble; over-long results get a second (batched) pass
+    second_pass: List[int] = []
+    for i in todo:
+        parts = [p for p in (pieces.get((i, j)) for j in range(n_chunks[i])) if p is not None]
+        results[i] = "\n".join(text for text, _ in parts)
+        if _joined_token_len([n for _, n in parts]) > 512:
+            second_pass.append(i)
+
+    if second_pass:
+        redone = _summarize_many([results[i] for i in second_pass], device=device_id, batch_size=batch_size)
+        for i, summary in zip(second_pass, redone):
+            results[i] = summary
+
+    return results
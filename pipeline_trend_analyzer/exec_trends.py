@@ -1,5 +1,7 @@
 # pipeline_sample/exec_trends.py
 from __future__ import annotations
+import os
+from pathlib import Path
 from typing import Optional
 from datetime import datetime, UTC
 
@@ -7,11 +9,17 @@ from datetime import datetime, UTC
 from lib.repositories.clean_articles_repository import CleanArticlesRepository
 from lib.repositories.trend_threads_repository import TrendThreadsRepository
 from lib.repositories.daily_trends_repository import DailyTrendsRepository
+from lib.repositories.cluster_state_repository import ClusterStateRepository
+from lib.cache.thread_index import ThreadCentroidIndex
+from core.paths import cache_dir
 
 # Use cases (built in earlier phases)
-from app.use_cases.build_daily_clusters import BuildDailyClustersUseCase
+from app.use_cases.build_daily_clusters import BuildDailyClustersUseCase, BuildDailyClustersConfig
 from app.use_cases.rank_clusters import RankClustersUseCase
 from app.use_cases.link_threads import LinkThreadsUseCase
+from services.trends_config import TrendsConfig
+from services.embeddings import get_embedding_store
+from services.labeling import get_doc_freq_store
 
 # Helper to default to last sample if not provided
 from services.metadata import find_last_sample
@@ -22,7 +30,8 @@ def main(
         limit: int = 15,
         persist: bool = True,  # --persist / --dry-run
         date: Optional[str] = None,  # YYYY-MM-DD (defaults to today UTC)
-        print_top: int = 5
+        print_top: int = 5,
+        as_of: Optional[str] = None,  # ISO timestamp recency is scored against (defaults to now)
 ) -> int:
     # Resolve sample + date
     sample = sample_id or find_last_sample()
@@ -30,6 +39,8 @@ def main(
         print("No sample provided and none found in metadata. Aborting.")
         return 1
     date_iso = date or datetime.now(UTC).date().isoformat()
+    # one clock for the whole run: reproducible scores (pass --as-of to replay a run)
+    as_of_dt = _parse_as_of(as_of) if as_of else datetime.now(UTC)
 
     # Repos
     clean_repo = CleanArticlesRepository()
@@ -37,8 +48,25 @@ def main(
     daily_repo = DailyTrendsRepository()
 
     # Phase 2: build clusters
-    builder = BuildDailyClustersUseCase(clean_repo)
-    built = builder.run(sample)
+    incremental = os.getenv("CLUSTER_INCREMENTAL", "off").lower() in {"1", "on", "true", "yes"}
+    idf_days = int(os.getenv("LABEL_IDF_DAYS", "0"))
+    builder = BuildDailyClustersUseCase(
+        clean_repo,
+        BuildDailyClustersConfig(
+            backend=os.getenv("CLUSTER_BACKEND", "agglomerative"),
+            incremental=incremental,
+            full_recluster_every=int(os.getenv("CLUSTER_FULL_EVERY", "6")),
+            label_idf_days=idf_days,
+        ),
+        # state is only written on --persist runs
+        state_repo=ClusterStateRepository() if incremental and persist else None,
+        # vectors from the clean stage's per-sample .npy (Mongo fallback when missing/stale)
+        embedding_store=get_embedding_store(),
+        # rolling IDF for cluster labels over the previous LABEL_IDF_DAYS days
+        doc_freq_store=get_doc_freq_store() if idf_days > 0 else None,
+    )
+    built = builder.run(sample, date_iso=date_iso)
+    print(f"Clusters built ({built.get('meta', {}).get('mode', 'full')}): {built.get('meta')}")
     clusters = built.get("clusters", [])
     if not clusters:
         print(f"No clusters for sample {sample}.")
@@ -46,15 +74,27 @@ def main(
 
     # Phase 3: rank clusters (importance)
     ranker = RankClustersUseCase(clean_repo)
-    ranked = ranker.run(sample, clusters)
+    # members + scoring fields come from the builder's in-memory batch (no re-query of the sample)
+    ranked = ranker.run(sample, clusters, batch=built.get("batch"), as_of=as_of_dt)
 
     # Phase 4: link threads (EMA + novelty)
+    lookback = int(os.getenv("LINK_LOOKBACK_DAYS", "1"))
+    index_path = Path(os.getenv("THREAD_INDEX_PATH") or cache_dir() / "thread_index")
     linker = LinkThreadsUseCase(
         clean_repo=clean_repo,
         threads_repo=threads_repo if persist else _NoopThreadsRepo(),
         daily_repo=daily_repo if persist else _NoopDailyRepo(),
+        cfg=TrendsConfig(
+            link_one_to_one=os.getenv("LINK_ONE_TO_ONE", "off").lower() in {"1", "on", "true", "yes"},
+            link_lookback_days=lookback,
+        ),
+        # multi-day linking reads thread centroids from the local index; dry runs read an
+        # existing index but never create or append to it
+        index=ThreadCentroidIndex(index_path) if lookback > 1 and (persist or index_path.exists()) else None,
+        persist_index=persist,
     )
-    linked = linker.run(sample_id=sample, date_iso=date_iso, ranked_clusters=ranked.clusters)
+    linked = linker.run(sample_id=sample, date_iso=date_iso, ranked_clusters=ranked.clusters,
+                        batch=ranked.batch)
 
     # Console output
     print(f"\nTop threads for {date_iso} (sample {sample})")
@@ -72,6 +112,12 @@ def main(
     return 0
 
 
+def _parse_as_of(value: str) -> datetime:
+    """ISO date/time ('Z' allowed); naive values are taken as UTC."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
+
+
 # --- No-op adapters for --dry-run mode ---
 class _NoopThreadsRepo:
     def get_threads_on(self, date_iso: str):
@@ -80,6 +126,9 @@ class _NoopThreadsRepo:
     def get_recent_for_thread(self, thread_id: str, since_iso: str):
         return []
 
+    def get_recent_for_threads(self, thread_ids, since_iso: str):
+        return []
+
     def upsert_today(self, selector, doc):
         pass
 
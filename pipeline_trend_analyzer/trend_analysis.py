@@ -1,6 +1,7 @@
 # pipeline_sample/exec_trends.py
 from __future__ import annotations
 import argparse
+import os
 import pandas as pd
 
 from utils.validation import is_valid_sample
@@ -8,6 +9,7 @@ from lib.repositories.clean_articles_repository import CleanArticlesRepository
 from lib.repositories.metadata_repository import MetadataRepository
 from lib.repositories.daily_trends_repository import DailyTrendsRepository
 from app.use_cases.analyze_daily_trends import AnalyzeDailyTrendsUseCase
+from services.daily_trends import DAILY_TRENDS_BACKENDS
 
 
 def _resolve_sample(sample: str | None) -> str:
@@ -26,6 +28,8 @@ def main() -> int:
     p.add_argument("--persist", action="store_true", help="Persist the daily trends document")
     p.add_argument("--mark-processed", action="store_true", help="Mark articles as processed")
     p.add_argument("--no-print", action="store_true", help="Do not print the ranked words preview")
+    p.add_argument("--backend", choices=DAILY_TRENDS_BACKENDS, default=os.getenv("DAILY_TRENDS_BACKEND", "python"),
+                   help="Count nouns in Python over the cursor, or in a Mongo aggregation (top words only)")
     args = p.parse_args()
 
     sample_id = _resolve_sample(args.sample)
@@ -34,6 +38,7 @@ def main() -> int:
         clean_repo=CleanArticlesRepository(),
         meta_repo=MetadataRepository(),
         trends_repo=DailyTrendsRepository(),
+        backend=args.backend,
     )
 
     result = usecase.run(
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+bench_build_memory.py
+
+Peak Python memory (tracemalloc) and bytes read from Mongo (BSON size of returned documents)
+for BuildDailyClustersUseCase on a large synthetic sample. Documents are served by a small
+streaming in-memory collection (mongomock copies whole collections per query, which would
+swamp the measurement):
+- "one_phase": the former read pattern, every article with text/summary/embedding in one list;
+- "two_phase": ids + embeddings streamed with a batched cursor, then display fields for
+  members of kept clusters only (`text` only where `summary` is empty).
+Clustering and labeling are identical in both, so differences come from the reads.
+
+Usage examples:
+  python scripts/bench_build_memory.py
+  python scripts/bench_build_memory.py --n 50000 --text-bytes 6000 --noise 0.5
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import bson
+import mongomock
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import lib.db.mongo_client as mongo_client  # noqa: E402
+from app.use_cases.build_daily_clusters import BuildDailyClustersConfig, BuildDailyClustersUseCase  # noqa: E402
+from lib.repositories.clean_articles_repository import CleanArticlesRepository  # noqa: E402
+
+_ONE_PHASE_PROJECTION = {
+    "_id": 1, "title": 1, "url": 1, "summary": 1, "text": 1, "nouns": 1,
+    "embedding": 1, "topic": 1, "sentiment": 1, "source": 1, "source_domain": 1, "published_at": 1
+}
+WORDS = ["harbor", "senate", "turbine", "glacier", "vaccine", "orchestra", "tariff", "drought", "rally", "merger"]
+
+
+class StreamingCollection:
+    """
+    Minimal server stand-in: documents are kept as BSON, find() streams projected documents one
+    at a time (decoded from BSON, as a driver would) and counts the bytes sent. Supports the
+    selectors the build stage uses: sample equality, _id $in and _id $nin. _id lookups are indexed.
+    """
+
+    name = "clean_articles"
+
+    def __init__(self) -> None:
+        self._docs: Dict[Any, bytes] = {}
+        self._by_sample: Dict[str, List[Any]] = {}
+        self.bytes = 0
+        self.docs = 0
+
+    def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True):
+        ids = []
+        for d in docs:
+            d = {"_id": bson.ObjectId(), **d}
+            self._docs[d["_id"]] = bson.encode(d)
+            self._by_sample.setdefault(d.get("sample"), []).append(d["_id"])
+            ids.append(d["_id"])
+        return type("Result", (), {"inserted_ids": ids})()
+
+    def find(self, selector: Dict[str, Any], projection: Dict[str, int] | None = None):
+        return StreamingCursor(self, selector, projection)
+
+    def _ids(self, selector: Dict[str, Any]) -> List[Any]:
+        cond = selector.get("_id") or {}
+        if "$in" in cond:
+            return [i for i in cond["$in"] if i in self._docs]
+        ids = self._by_sample.get(selector.get("sample"), [])
+        if "$nin" in cond:
+            skip = set(cond["$nin"])
+            ids = [i for i in ids if i not in skip]
+        return ids
+
+
+class StreamingCursor:
+    def __init__(self, coll: StreamingCollection, selector: Dict[str, Any], projection: Dict[str, int] | None) -> None:
+        self._coll = coll
+        self._selector = selector
+        self._fields = [k for k, v in (projection or {}).items() if v]
+
+    def batch_size(self, n: int) -> "StreamingCursor":
+        return self
+
+    def __iter__(self):
+        for i in self._coll._ids(self._selector):
+            doc = bson.decode(self._coll._docs[i])
+            if self._fields:
+                doc = {k: doc[k] for k in self._fields if k in doc}
+            wire = bson.encode(doc)
+            self._coll.bytes += len(wire)
+            self._coll.docs += 1
+            yield bson.decode(wire)
+
+
+class OnePhaseUseCase(BuildDailyClustersUseCase):
+    """The former pattern: one full-projection list; member fields come from it, not a second query."""
+
+    def _stream(self, selector: Dict[str, Any]) -> Tuple[List[Any], np.ndarray]:
+        docs = list(self.clean_repo.get_articles_broad(selector, _ONE_PHASE_PROJECTION))
+        self._docs = {d["_id"]: d for d in docs}
+        return [d["_id"] for d in docs], np.array([d["embedding"] for d in docs], dtype="float32")
+
+    def _member_docs(self, ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        return {i: self._docs[i] for i in ids}
+
+
+def populate(repo: CleanArticlesRepository, n: int, dim: int, text_bytes: int, noise: float, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    k = max(1, n // 40)
+    centres = rng.normal(size=(k, dim)).astype("float32")
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    n_noise = int(n * noise)
+    X = centres[rng.integers(0, k, size=n - n_noise)] + rng.normal(scale=0.3 / np.sqrt(dim), size=(n - n_noise, dim))
+    X = np.vstack([X, rng.normal(size=(n_noise, dim))]).astype("float32")
+    body = ("lorem ipsum " * (text_bytes // 12 + 1))[:text_bytes]
+    for start in range(0, n, 5000):
+        repo.create_articles_many([
+            {"sample": "bench", "title": f"title {i}", "url": f"https://x.example/{i}",
+             "summary": f"{WORDS[i % 10]} {WORDS[(i // 10) % 10]} story number {i} " * 4,
+             "text": body, "nouns": [WORDS[i % 10]], "topic": "world", "sentiment": "neutral",
+             "source": "x", "source_domain": "x.example", "embedding": X[i]}
+            for i in range(start, min(n, start + 5000))
+        ])
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark memory and transfer of the build stage")
+    ap.add_argument("--n", type=int, default=20000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--text-bytes", type=int, default=4000)
+    ap.add_argument("--noise", type=float, default=0.3, help="Share of unclustered articles")
+    ap.add_argument("--backend", default="threshold")
+    args = ap.parse_args()
+
+    mongo_client._db = mongomock.MongoClient().db
+    repo = CleanArticlesRepository()
+    repo.collection = meter = StreamingCollection()
+    populate(repo, args.n, args.dim, args.text_bytes, args.noise)
+    cfg = BuildDailyClustersConfig(backend=args.backend)
+
+    print(f"{'mode':<10} {'seconds':>8} {'docs read':>10} {'MB read':>8} {'peak MB':>8} {'clusters':>9}")
+    for name, cls in (("one_phase", OnePhaseUseCase), ("two_phase", BuildDailyClustersUseCase)):
+        meter.bytes = meter.docs = 0
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        out = cls(repo, cfg).run("bench")
+        dt = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<10} {dt:>8.1f} {meter.docs:>10} {meter.bytes / 1e6:>8.1f} {peak / 1e6:>8.1f} "
+              f"{len(out['clusters']):>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
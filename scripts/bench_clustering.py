@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+bench_clustering.py
+
+Time the clustering backends of services/clusterer.py on synthetic, embedding-like data:
+unit vectors (dim 384) drawn around many topic centres plus uniform noise, at 1k/10k/50k.
+
+The exact "agglomerative" backend builds an n×n distance matrix, so it is skipped above
+--max-exact vectors. Agreement with it is reported as the adjusted Rand index (ARI).
+
+Usage examples:
+  python scripts/bench_clustering.py
+  python scripts/bench_clustering.py --sizes 1000 10000 --backends threshold knn_graph
+  python scripts/bench_clustering.py --sizes 50000 --max-exact 0
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.clusterer import CLUSTER_BACKENDS, cluster_embeddings  # noqa: E402
+
+
+def synthetic_embeddings(n: int, dim: int = 384, cluster_frac: float = 0.05,
+                         spread: float = 0.35, noise_frac: float = 0.2, seed: int = 7) -> np.ndarray:
+    """~n*cluster_frac topics; each article = topic centre + gaussian jitter; noise_frac are unrelated."""
+    rng = np.random.default_rng(seed)
+    k = max(1, int(n * cluster_frac))
+    centres = rng.normal(size=(k, dim)).astype("float32")
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    n_noise = int(n * noise_frac)
+    assign = rng.integers(0, k, size=n - n_noise)
+    X = centres[assign] + rng.normal(scale=spread / np.sqrt(dim), size=(n - n_noise, dim)).astype("float32")
+    X = np.vstack([X, rng.normal(size=(n_noise, dim)).astype("float32")])
+    X = X[rng.permutation(n)]
+    return (X / np.linalg.norm(X, axis=1, keepdims=True)).astype("float32")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark clustering backends")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    ap.add_argument("--backends", nargs="+", default=list(CLUSTER_BACKENDS), choices=CLUSTER_BACKENDS)
+    ap.add_argument("--max-exact", type=int, default=10000, help="Skip agglomerative above this size")
+    ap.add_argument("--cosine-threshold", type=float, default=0.30)
+    ap.add_argument("--min-cluster-size", type=int, default=3)
+    ap.add_argument("--knn-k", type=int, default=10)
+    ap.add_argument("--block-size", type=int, default=2048)
+    args = ap.parse_args()
+
+    print(f"{'n':>7} {'backend':<14} {'seconds':>9} {'clusters':>9} {'noise':>7} {'ARI vs exact':>13}")
+    for n in args.sizes:
+        X = synthetic_embeddings(n)
+        exact = None
+        for backend in args.backends:
+            if backend == "agglomerative" and n > args.max_exact:
+                print(f"{n:>7} {backend:<14} {'skipped (n > --max-exact)':>41}")
+                continue
+            t0 = time.perf_counter()
+            labels, centroids = cluster_embeddings(
+                X,
+                cosine_threshold=args.cosine_threshold,
+                min_cluster_size=args.min_cluster_size,
+                backend=backend,
+                knn_k=args.knn_k,
+                block_size=args.block_size,
+            )
+            dt = time.perf_counter() - t0
+            if backend == "agglomerative":
+                exact = labels
+            ari = f"{adjusted_rand_score(exact, labels):13.3f}" if exact is not None else f"{'—':>13}"
+            print(f"{n:>7} {backend:<14} {dt:9.2f} {len(centroids):>9} {int((labels == -1).sum()):>7} {ari}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+bench_daily_trends.py
+
+Compare DailyTrendsService.compute (streaming, integer-coded counters) with the previous
+occurrence-list implementation on a synthetic corpus: wall time and peak Python memory
+(tracemalloc) for the whole step, i.e. reading the articles as analyze does plus counting.
+- occurrences: articles materialized as a list, one record per noun, per-word label lists;
+- streaming:   articles consumed from a generator (as from a Mongo cursor).
+
+Usage examples:
+  python scripts/bench_daily_trends.py
+  python scripts/bench_daily_trends.py --articles 300000 --vocab 50000
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.daily_trends import DailyTrendsService  # noqa: E402
+
+TOPICS = ["world", "business", "technology", "science", "health", "sports", "unknown"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+
+@dataclass(frozen=True)
+class WordOccurrence:
+    word: str
+    topic: Optional[str]
+    sentiment: Optional[str]
+
+
+def occurrence_compute(articles, limit):
+    """The previous implementation (without its per-article print)."""
+    occ = []
+    for a in articles:
+        topic = (a.get("topic") or "").strip().lower()
+        sentiment = (a.get("sentiment", {}).get("label") or "").strip().lower()
+        tval = topic if topic not in {"", "topic", "unknown", "none"} else None
+        sval = sentiment if sentiment not in {"", "n/a", "label", "unknown", "none"} else None
+        for noun in a.get("nouns", []) or []:
+            occ.append(WordOccurrence(word=noun, topic=tval, sentiment=sval))
+    counter = Counter(w.word for w in occ)
+    topics, sentiments = defaultdict(list), defaultdict(list)
+    for w in occ:
+        if w.topic:
+            topics[w.word].append(w.topic)
+        if w.sentiment:
+            sentiments[w.word].append(w.sentiment)
+
+    def dist(values):
+        c = Counter(values)
+        total = sum(c.values()) or 1
+        return [{"label": k, "percentage": round(v / total * 100)} for k, v in c.most_common()]
+
+    ranked = [{"word": w, "count": n, "rank": i + 1,
+               "context": {"topics": dist(topics.get(w, [])), "sentiments": dist(sentiments.get(w, []))}}
+              for i, (w, n) in enumerate(counter.most_common(limit))]
+    return {"metrics": {"total_words": sum(counter.values()), "distinct_words": len(counter)}, "ranked_words": ranked}
+
+
+def corpus(n, vocab, seed=0):
+    """Articles as the analyze projection returns them; nouns Zipf-distributed like real text."""
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        picks = np.minimum(rng.zipf(1.2, size=int(rng.integers(5, 25))), vocab) - 1
+        yield {"_id": i, "nouns": [f"noun{j}" for j in picks.tolist()],
+               "topic": TOPICS[i % len(TOPICS)], "sentiment": {"label": SENTIMENTS[i % len(SENTIMENTS)]}}
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, dt, peak
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark daily noun trend counting")
+    ap.add_argument("--articles", type=int, default=100_000)
+    ap.add_argument("--vocab", type=int, default=20_000)
+    ap.add_argument("--limit", type=int, default=15)
+    args = ap.parse_args()
+
+    runs = {
+        "occurrences": lambda: occurrence_compute(list(corpus(args.articles, args.vocab)), args.limit),
+        "streaming": lambda: DailyTrendsService().compute(corpus(args.articles, args.vocab), limit=args.limit),
+    }
+    print(f"{args.articles} articles, vocabulary {args.vocab} (time includes generating the corpus)")
+    results = {}
+    for name, fn in runs.items():
+        results[name], dt, peak = measure(fn)
+        print(f"{name:<12} {dt:>7.2f}s  peak {peak / 1e6:>8.1f} MB")
+    print(f"identical output: {results['occurrences'] == results['streaming']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
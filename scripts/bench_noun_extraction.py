@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+bench_noun_extraction.py
+
+Compare noun extraction throughput (docs/sec):
+  - before: full `en_core_web_sm` pipeline, one `nlp(text)` call per article
+  - after : parser/NER excluded, `ArticlesService.extract_nouns_many` over `nlp.pipe`
+
+Corpus:
+  - default: --synthetic N generated news-like articles (fixture corpus, no DB needed)
+  - --corpus FILE: plain-text file, articles separated by blank lines
+  - --sample-id: raw article texts of a sample from Mongo
+
+Usage examples:
+  python scripts/bench_noun_extraction.py --synthetic 500
+  python scripts/bench_noun_extraction.py --synthetic 2000 --batch-size 128 --n-process 2
+  python scripts/bench_noun_extraction.py --sample-id 1-2025-08-16 --limit 300
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import spacy
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.articles import ArticlesService  # noqa: E402
+
+_SENTENCES = [
+    "The central bank held interest rates steady amid signs of cooling inflation.",
+    "Officials said the storm had displaced thousands of residents along the coast.",
+    "The company reported quarterly revenue above analyst expectations.",
+    "Negotiators met for a third day without reaching an agreement on the ceasefire.",
+    "Researchers published new findings on the long-term effects of the vaccine.",
+    "The striker scored twice as the home side came back from a goal down.",
+    "Lawmakers debated the bill late into the night before a narrow vote.",
+    "Analysts warned that supply chain disruptions could persist into next year.",
+]
+
+
+def synthetic_corpus(n: int, seed: int = 7) -> List[str]:
+    rnd = random.Random(seed)
+    return [" ".join(rnd.choice(_SENTENCES) for _ in range(rnd.choice([5, 15, 30, 60]))) for _ in range(n)]
+
+
+def file_corpus(path: str) -> List[str]:
+    raw = Path(path).read_text(encoding="utf-8")
+    return [a.strip() for a in raw.split("\n\n") if a.strip()]
+
+
+def mongo_corpus(sample_id: str, limit: int) -> List[str]:
+    from lib.repositories.articles_repository import ArticlesRepository
+    repo = ArticlesRepository()
+    cursor = repo.get_articles({"sample": sample_id}, {"text": 1}).limit(limit)
+    return [(d.get("text") or "").strip() for d in cursor if (d.get("text") or "").strip()]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark per-doc full pipeline vs batched nlp.pipe noun extraction")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--synthetic", type=int, default=500, help="Generate N synthetic articles (default)")
+    src.add_argument("--corpus", help="Plain-text file; articles separated by blank lines")
+    src.add_argument("--sample-id", help="Read raw article texts of this sample from Mongo")
+    ap.add_argument("--limit", type=int, default=300, help="Max articles when reading from Mongo")
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--n-process", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.corpus:
+        texts = file_corpus(args.corpus)
+    elif args.sample_id:
+        texts = mongo_corpus(args.sample_id, args.limit)
+    else:
+        texts = synthetic_corpus(args.synthetic)
+    if not texts:
+        print("No articles to process.")
+        return 1
+    print(f"Corpus: {len(texts)} articles, {sum(len(t) for t in texts)} chars, "
+          f"batch_size={args.batch_size}, n_process={args.n_process}")
+
+    # before: full pipeline, per document (model load outside the timed section)
+    full = spacy.load("en_core_web_sm")
+    t0 = time.perf_counter()
+    before: List[List[str]] = [ArticlesService._nouns(full(t)) for t in texts]
+    t_before = time.perf_counter() - t0
+    print(f"before (full, per-doc) : {t_before:8.2f}s  ({len(texts) / t_before:8.1f} docs/s)  pipes={full.pipe_names}")
+
+    # after: trimmed pipeline + nlp.pipe (repos are not needed for extraction)
+    service = ArticlesService(None, None, None, None,
+                              nlp_batch_size=args.batch_size, nlp_n_process=args.n_process)
+    t0 = time.perf_counter()
+    after = service.extract_nouns_many(texts)
+    t_after = time.perf_counter() - t0
+    print(f"after  (trimmed, pipe) : {t_after:8.2f}s  ({len(texts) / t_after:8.1f} docs/s)  pipes={service.nlp.pipe_names}")
+
+    print(f"speedup                : {t_before / t_after:8.2f}x")
+    same = sum(1 for a, b in zip(before, after) if a == b)
+    print(f"identical noun lists   : {same}/{len(texts)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
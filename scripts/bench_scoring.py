@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+bench_scoring.py
+
+Compare cluster scoring (services/scoring.py) on a synthetic sample:
+- per-article: score_cluster() per cluster (article_weight per doc, as RankClustersUseCase did);
+- columnar: score_clusters() (per-article weights once as arrays + one segmented sum).
+Also reports the largest relative score difference between the two.
+
+Usage examples:
+  python scripts/bench_scoring.py
+  python scripts/bench_scoring.py --docs 200000 --clusters 5000
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.scoring import score_cluster, score_clusters  # noqa: E402
+from services.scoring_config import ScoringConfig  # noqa: E402
+
+DOMAINS = ["reuters.com", "www.bbc.com", "apnews.com", "cnn.com"] + [f"site{i}.example" for i in range(200)]
+CATEGORIES = ["general", "world", "business", "technology", "science", "health", "sports", None]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark per-article vs columnar cluster scoring")
+    ap.add_argument("--docs", type=int, default=50_000)
+    ap.add_argument("--clusters", type=int, default=2_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    now = datetime.now(timezone.utc)
+    docs = [{
+        "source_domain": DOMAINS[rng.integers(len(DOMAINS))],
+        "category": CATEGORIES[rng.integers(len(CATEGORIES))],
+        "published_at": (now - timedelta(minutes=int(rng.integers(0, 72 * 60)))).isoformat().replace("+00:00", "Z"),
+    } for _ in range(args.docs)]
+    # every doc in one cluster, cluster sizes skewed like real samples
+    labels = np.minimum(rng.zipf(1.3, size=args.docs), args.clusters) - 1
+    members = [np.flatnonzero(labels == c) for c in range(args.clusters)]
+    members = [m for m in members if len(m)]
+    cfg = ScoringConfig()
+
+    def per_article():
+        return [score_cluster([docs[i] for i in m], cfg, as_of=now) for m in members]
+
+    def columnar():
+        return score_clusters(docs, members, cfg, as_of=now)
+
+    print(f"{len(docs)} docs in {len(members)} clusters")
+    results = {}
+    for name, fn in (("per-article", per_article), ("columnar", columnar)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            results[name] = fn()
+            best = min(best, time.perf_counter() - t0)
+        print(f"{name:<12} {best:>8.3f}s")
+    diff = max(abs(a["cluster_score_today"] - b["cluster_score_today"]) / max(abs(a["cluster_score_today"]), 1e-12)
+               for a, b in zip(results["per-article"], results["columnar"]))
+    print(f"max relative score difference {diff:.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
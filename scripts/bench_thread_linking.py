@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+bench_thread_linking.py
+
+Time LinkThreadsUseCase._link_targets (one clusters × threads matmul) against the former
+per-pair Python loop (cosine_sim for every cluster/thread pair) on synthetic centroids:
+yesterday's threads are random unit vectors (dim 384), today's clusters are jittered copies
+of a subset of them plus unrelated ones.
+
+The loop is skipped above --max-loop pairs. Agreement with it is the share of clusters that
+got the same thread (or none) from both.
+
+Usage examples:
+  python scripts/bench_thread_linking.py
+  python scripts/bench_thread_linking.py --threads 2000 20000 --clusters 1000
+  python scripts/bench_thread_linking.py --one-to-one --max-loop 0
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.use_cases.link_threads import LinkThreadsUseCase  # noqa: E402
+from services.trends_config import TrendsConfig  # noqa: E402
+from utils.trend_utils import cosine_sim  # noqa: E402
+
+
+def synthetic_centroids(n_threads: int, n_clusters: int, dim: int = 384, carried: float = 0.6,
+                        spread: float = 0.3, seed: int = 7):
+    """`carried` of today's clusters continue a random thread (centre + jitter); the rest are new."""
+    rng = np.random.default_rng(seed)
+    prev = rng.normal(size=(n_threads, dim)).astype("float32")
+    prev /= np.linalg.norm(prev, axis=1, keepdims=True)
+    n_carried = min(n_threads, int(n_clusters * carried))
+    picks = rng.choice(n_threads, size=n_carried, replace=False)
+    today = prev[picks] + rng.normal(scale=spread / np.sqrt(dim), size=(n_carried, dim)).astype("float32")
+    today = np.vstack([today, rng.normal(size=(n_clusters - n_carried, dim)).astype("float32")])
+    threads = [{"thread_id": f"thr-{i}", "centroid": v.tolist()} for i, v in enumerate(prev)]
+    return [v.tolist() for v in today], threads
+
+
+def loop_link_targets(today: List[List[float]], threads: List[Dict[str, Any]],
+                      threshold: float) -> List[Optional[Dict[str, Any]]]:
+    """The previous implementation: rebuild each thread centroid and call cosine_sim per pair."""
+    out = []
+    for vec in today:
+        c = np.array(vec, dtype="float32")
+        best, best_sim = None, -1.0
+        for t in threads:
+            c_prev = np.array(t.get("centroid") or [], dtype="float32")
+            if c_prev.size == 0:
+                continue
+            sim = cosine_sim(c, c_prev)
+            if sim > best_sim:
+                best_sim, best = sim, t
+        out.append(best if best and best_sim >= threshold else None)
+    return out
+
+
+def _ids(targets: List[Optional[Dict[str, Any]]]) -> List[Optional[str]]:
+    return [t["thread_id"] if t else None for t in targets]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark thread linking")
+    ap.add_argument("--threads", type=int, nargs="+", default=[1000, 5000, 20000])
+    ap.add_argument("--clusters", type=int, default=500)
+    ap.add_argument("--threshold", type=float, default=0.80)
+    ap.add_argument("--one-to-one", action="store_true", help="Also time one-to-one assignment")
+    ap.add_argument("--max-loop", type=int, default=1_000_000, help="Skip the loop above this many pairs")
+    args = ap.parse_args()
+
+    print(f"{'threads':>8} {'clusters':>9} {'method':<11} {'seconds':>9} {'linked':>7} {'agree':>7}")
+    for n in args.threads:
+        today, threads = synthetic_centroids(n, args.clusters)
+        methods = [("matrix", False)] + ([("one_to_one", True)] if args.one_to_one else [])
+
+        loop_ids = None
+        if n * args.clusters <= args.max_loop:
+            t0 = time.perf_counter()
+            loop_ids = _ids(loop_link_targets(today, threads, args.threshold))
+            dt = time.perf_counter() - t0
+            linked = sum(i is not None for i in loop_ids)
+            print(f"{n:>8} {args.clusters:>9} {'loop':<11} {dt:9.3f} {linked:>7} {'—':>7}")
+        else:
+            print(f"{n:>8} {args.clusters:>9} {'loop':<11} {'skipped (pairs > --max-loop)':>25}")
+
+        for name, one_to_one in methods:
+            uc = LinkThreadsUseCase(None, None, None,
+                                    TrendsConfig(link_threshold_cosine=args.threshold, link_one_to_one=one_to_one))
+            t0 = time.perf_counter()
+            ids = _ids(uc._link_targets(today, threads))
+            dt = time.perf_counter() - t0
+            linked = sum(i is not None for i in ids)
+            agree = f"{np.mean([a == b for a, b in zip(ids, loop_ids)]):7.3f}" if loop_ids else f"{'—':>7}"
+            print(f"{n:>8} {args.clusters:>9} {name:<11} {dt:9.3f} {linked:>7} {agree}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+bench_vector_codec.py
+
+Compare embedding storage encodings (lib/db/vector_codec.py) for one sample's worth of
+vectors: BSON bytes per document field (≈ what is stored and sent over the wire) and the
+time to decode BSON into an (n, dim) float32 matrix, as BuildDailyClustersUseCase needs.
+
+Usage examples:
+  python scripts/bench_vector_codec.py
+  python scripts/bench_vector_codec.py --n 20000 --dim 768
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import bson
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.db.vector_codec import VECTOR_ENCODINGS, decode_vector, encode_vector  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark embedding encodings")
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--dim", type=int, default=384)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.n, args.dim)).astype("float32")
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+
+    print(f"{'encoding':<9} {'bytes/doc':>10} {'total MB':>9} {'decode s':>9} {'max abs err':>12}")
+    for enc in reversed(VECTOR_ENCODINGS):  # list (legacy) first
+        raw = [bson.encode({"embedding": encode_vector(v, enc)}) for v in X]
+        t0 = time.perf_counter()
+        Y = np.stack([decode_vector(bson.decode(b)["embedding"]) for b in raw])
+        dt = time.perf_counter() - t0
+        size = sum(len(b) for b in raw)
+        print(f"{enc:<9} {size // args.n:>10} {size / 1e6:>9.2f} {dt:>9.3f} {float(np.abs(Y - X).max()):>12.2e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+migrate_embeddings.py
+
+Re-encode `clean_articles.embedding` in place (see lib/db/vector_codec.py):
+legacy float lists -> BSON float32 vectors (default), float16, or back to lists.
+Documents already in the target encoding are skipped, so the script can be re-run.
+
+Env:
+  MONGO_URI, MONGO_DB_NAME   as for the pipelines
+
+Usage examples:
+  # Preview: how many docs and how many embedding bytes would change
+  python scripts/migrate_embeddings.py --dry-run
+
+  # Migrate one sample, then everything
+  python scripts/migrate_embeddings.py --sample-id 2-2025-08-10
+  python scripts/migrate_embeddings.py
+
+  # Roll back to float lists
+  python scripts/migrate_embeddings.py --encoding list
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import bson
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lib.db.vector_codec import VECTOR_ENCODINGS, decode_vector, encode_vector, is_encoded  # noqa: E402
+from lib.repositories.clean_articles_repository import CleanArticlesRepository  # noqa: E402
+
+
+def _size(value) -> int:
+    return len(bson.encode({"embedding": value}))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Re-encode stored clean_articles embeddings")
+    ap.add_argument("--encoding", default="float32", choices=VECTOR_ENCODINGS)
+    ap.add_argument("--sample-id", default=None, help="Only this sample (default: all)")
+    ap.add_argument("--batch", type=int, default=1000, help="Updates per bulk write")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    repo = CleanArticlesRepository(vector_encoding=args.encoding)
+    query = {"embedding": {"$exists": True, "$ne": None}}
+    if args.sample_id:
+        query["sample"] = args.sample_id
+
+    t0 = time.perf_counter()
+    seen = changed = before = after = 0
+    # raw collection: the repo would decode the vectors we want to inspect
+    cursor = repo.collection.find(query, {"embedding": 1}, batch_size=args.batch)
+    with repo.bulk_writer(max_ops=args.batch, max_delay=None) as writer:
+        for doc in cursor:
+            seen += 1
+            value = doc["embedding"]
+            if is_encoded(value, args.encoding):
+                continue
+            new = encode_vector(decode_vector(value), args.encoding)
+            changed += 1
+            before += _size(value)
+            after += _size(new)
+            if not args.dry_run:
+                writer.update_one({"_id": doc["_id"]}, {"$set": {"embedding": new}})
+            if seen % 10_000 == 0:
+                print(f"  … {seen} scanned, {changed} to re-encode")
+
+    verb = "Would re-encode" if args.dry_run else "Re-encoded"
+    ratio = f" ({before / after:.1f}× smaller)" if after and before > after else ""
+    print(f"{verb} {changed} of {seen} embeddings to {args.encoding}: "
+          f"{before / 1e6:.1f} MB → {after / 1e6:.1f} MB{ratio} in {time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+rebuild_thread_index.py
+
+(Re)build the on-disk thread centroid index used for multi-day linking
+(LINK_LOOKBACK_DAYS > 1 in `trends`) from the trend_threads history in Mongo.
+Run it once before enabling the lookback, or after deleting the index directory;
+`trends --persist` keeps it up to date afterwards.
+
+Env:
+  MONGO_URI, MONGO_DB_NAME   as for the pipelines
+  THREAD_INDEX_PATH          index directory (default: <CACHE_DIR>/thread_index)
+
+Usage examples:
+  python scripts/rebuild_thread_index.py --days 30
+  python scripts/rebuild_thread_index.py --days 90 --path /tmp/thread_index --fresh
+"""
+from __future__ import annotations
+import argparse
+import os
+import shutil
+import sys
+from datetime import datetime, UTC, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.paths import cache_dir  # noqa: E402
+from lib.cache.thread_index import ThreadCentroidIndex  # noqa: E402
+from lib.repositories.trend_threads_repository import TrendThreadsRepository  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Rebuild the thread centroid index from trend_threads")
+    ap.add_argument("--days", type=int, default=30, help="How many days of history to index")
+    ap.add_argument("--path", default=os.getenv("THREAD_INDEX_PATH") or str(cache_dir() / "thread_index"))
+    ap.add_argument("--fresh", action="store_true", help="Delete the existing index first")
+    args = ap.parse_args()
+
+    if args.fresh and Path(args.path).exists():
+        shutil.rmtree(args.path)
+    index = ThreadCentroidIndex(args.path)
+    since = (datetime.now(UTC).date() - timedelta(days=args.days)).isoformat()
+
+    added = 0
+    for doc in TrendThreadsRepository().iter_threads_since(since):
+        added += index.add_many([doc])
+        if added % 10_000 == 0:
+            index.flush()
+    index.flush()
+    print(f"✅ Indexed {added} thread centroids since {since} → {args.path} ({len(index)} rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
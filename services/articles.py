@@ -1,17 +1,22 @@
 """Domain-level interfaces and services for working with articles."""
-from urllib.parse import urlparse
 from __future__ import annotations
-from services.embeddings import embed_text
-from pipeline_sample.summarizer import smart_summarize  # reuse your local summarizer
+from urllib.parse import urlparse
+from services.embeddings import embed_texts_cached
+from pipeline_sample.summarizer import smart_summarize, summarize_many  # reuse your local summarizer
 from datetime import datetime, UTC
 from typing import Protocol, Dict, Any, Iterable, Optional, List
+import numpy as np
 import spacy
 
+# extract_nouns only reads POS, lemma, stop and alpha flags: skip the parser and NER
+_NOUN_PIPE_EXCLUDE = ["parser", "ner", "senter"]
+
 # Exposed names
 __all__ = [
     "ArticlesRepositoryProtocol",
     "CleanArticlesRepositoryProtocol",
     "MetadataRepositoryProtocol",
+    "EmbeddingStoreProtocol",
     "ArticlesService",
 ]
 
@@ -39,12 +44,24 @@ class ArticlesRepositoryProtocol(Protocol):
 
     def update_articles(self, selector: Dict[str, Any], update_data: Dict[str, Any]) -> int: ...
 
+    # Optional bulk variant; clean_articles falls back to update_articles per id.
+    def update_many_articles(self, selector: Dict[str, Any], update_data: Dict[str, Any]) -> int: ...
+
 
 class CleanArticlesRepositoryProtocol(Protocol):
     """Interface for storing cleaned article documents."""
 
     def create_articles(self, data: Dict[str, Any]) -> str: ...
 
+    # Optional bulk variant; clean_articles falls back to create_articles per doc.
+    def create_articles_many(self, docs: List[Dict[str, Any]]) -> List[str]: ...
+
+
+class EmbeddingStoreProtocol(Protocol):
+    """Per-sample vector matrix on disk (see lib.cache.embedding_store.SampleEmbeddingStore)."""
+
+    def append(self, sample_id: str, ids: List[Any], X: Any) -> int: ...
+
 
 class MetadataRepositoryProtocol(Protocol):
     """Interface for reading and updating metadata documents."""
@@ -61,22 +78,49 @@ class ArticlesService:
             repo_articles: ArticlesRepositoryProtocol,
             repo_clean_articles: CleanArticlesRepositoryProtocol,
             repo_metadata: MetadataRepositoryProtocol,
+            block_size: int = 256,
+            nlp_batch_size: int = 64,
+            nlp_n_process: int = 1,
+            embedding_store: Optional[EmbeddingStoreProtocol] = None,
     ) -> None:
         self.repo_summaries = repo_summaries
         self.repo_articles = repo_articles
         self.repo_clean_articles = repo_clean_articles
         self.repo_metadata = repo_metadata
-        self.nlp = spacy.load("en_core_web_sm")
+        self.block_size = max(1, block_size)  # articles embedded per encode call
+        self.nlp_batch_size = nlp_batch_size
+        self.nlp_n_process = nlp_n_process
+        # cleaned vectors are also appended here (one matrix per sample) for the trends stage
+        self.embedding_store = embedding_store
+        # tok2vec/tagger/attribute_ruler/lemmatizer only
+        self.nlp = spacy.load("en_core_web_sm", exclude=_NOUN_PIPE_EXCLUDE)
 
-    def extract_nouns(self, text: str) -> List[str]:
-        """Return a list of lemmatised, lowercase nouns from the given text."""
-        doc = self.nlp(text)
+    @staticmethod
+    def _nouns(doc) -> List[str]:
         return [
             token.lemma_.lower()
             for token in doc
             if token.pos_ == "NOUN" and not token.is_stop and token.is_alpha
         ]
 
+    def extract_nouns(self, text: str) -> List[str]:
+        """Return a list of lemmatised, lowercase nouns from the given text."""
+        return self._nouns(self.nlp(text))
+
+    def extract_nouns_many(
+            self,
+            texts: Iterable[str],
+            batch_size: Optional[int] = None,
+            n_process: Optional[int] = None,
+    ) -> List[List[str]]:
+        """Batched `extract_nouns` over `nlp.pipe`; one noun list per text, in input order."""
+        docs = self.nlp.pipe(
+            texts,
+            batch_size=batch_size or self.nlp_batch_size,
+            n_process=n_process or self.nlp_n_process,
+        )
+        return [self._nouns(doc) for doc in docs]
+
     def _source_domain(self, url: str | None) -> str | None:
         if not url:
             return None
@@ -86,25 +130,48 @@ class ArticlesService:
         except Exception:
             return None
 
-    def _choose_summary(self, article: Dict[str, Any]) -> str:
-        # Prefer existing summary if your gather/classify wrote one.
+    @staticmethod
+    def _stored_summary(article: Dict[str, Any]) -> Optional[str]:
+        # Prefer existing summary if your gather/classify wrote one; short texts stand as-is.
         summary = (article.get("summary") or "").strip()
         if summary:
             return summary
-        # Fallback: smart_summarize (already cached model)
         text = (article.get("text") or "").strip()
-        if len(text) <= 200:
-            return text
-        return smart_summarize(text)
+        return text if len(text) <= 200 else None
+
+    def _choose_summary(self, article: Dict[str, Any]) -> str:
+        summary = self._stored_summary(article)
+        if summary is not None:
+            return summary
+        # Fallback: smart_summarize (already cached model)
+        return smart_summarize((article.get("text") or "").strip())
+
+    def _choose_summaries(self, articles: List[Dict[str, Any]]) -> List[str]:
+        """`_choose_summary` per article; the fallback summaries run as one summarize_many call."""
+        summaries = [self._stored_summary(a) for a in articles]
+        todo = [i for i, s in enumerate(summaries) if s is None]
+        if todo:
+            texts = [(articles[i].get("text") or "").strip() for i in todo]
+            for i, summary in zip(todo, summarize_many(texts)):
+                summaries[i] = summary
+        return summaries
 
     def clean_articles(self, sample_id: str) -> str:
-        """Clean raw articles for a given sample using the injected repositories."""
+        """
+        Clean raw articles for a given sample using the injected repositories.
+        Articles are handled in blocks of `block_size`: nouns of a block come from one
+        `nlp.pipe` pass and summaries are embedded in one batched (and content-hash cached)
+        call, then the block is persisted.
+        """
         count = 0
         self.repo_metadata.update_metadata(
             {"_id": sample_id},
             {"$set": {"cleaning_sample_startedAt": datetime.now(UTC)}},
         )
 
+        block: List[Dict[str, Any]] = []
+        stored_ids: List[Any] = []
+        stored_vectors: List[Any] = []
         for article in self.repo_articles.get_articles({"sample": sample_id}):
             text = (article.get("text") or "").strip()
             if not text:
@@ -112,19 +179,46 @@ class ArticlesService:
             count += 1
             print(f"[{count}] Cleaning article: {article.get('title', 'No Title')}")
 
-            # 1) linguistic features
-            nouns = self.extract_nouns(text)
+            block.append({"article": article, "text": text})
+            if len(block) >= self.block_size:
+                self._flush_block(block, sample_id, stored_ids, stored_vectors)
+                block = []
+        if block:
+            self._flush_block(block, sample_id, stored_ids, stored_vectors)
+        if self.embedding_store is not None and stored_ids:
+            self.embedding_store.append(sample_id, stored_ids, np.vstack(stored_vectors))
+
+        self.repo_metadata.update_metadata(
+            {"_id": sample_id},
+            {"$set": {"cleaning_sample_finishedAt": datetime.now(UTC)}},
+        )
+        return sample_id
 
-            # 2) summary for embedding
-            summary = self._choose_summary(article)
+    def _flush_block(
+            self,
+            block: List[Dict[str, Any]],
+            sample_id: str,
+            stored_ids: List[Any],
+            stored_vectors: List[Any],
+    ) -> None:
+        # 1) linguistic features, one nlp.pipe pass per block
+        for item, nouns in zip(block, self.extract_nouns_many(item["text"] for item in block)):
+            item["nouns"] = nouns
+        # 2) summary for embedding, missing ones summarized as one batch
+        summaries = self._choose_summaries([item["article"] for item in block])
+        for item, summary in zip(block, summaries):
+            item["summary"] = summary
 
-            # 3) vector embedding on summary (normalize in service)
-            vector = embed_text(summary)  # List[float32]
+        # 3) vector embeddings on summaries, one batched call per block (normalized in service)
+        vectors = embed_texts_cached([item["summary"] for item in block])
 
+        cleaned_docs: List[Dict[str, Any]] = []
+        for item, vector in zip(block, vectors):
+            article = item["article"]
             # 4) handy domain
             domain = self._source_domain(article.get("url"))
 
-            cleaned_doc: Dict[str, Any] = {
+            cleaned_docs.append({
                 "title": article.get("title"),
                 "url": article.get("url"),
                 "source": article.get("source"),
@@ -137,25 +231,29 @@ class ArticlesService:
                 # analysis fields
                 "topic": article.get("topic"),
                 "sentiment": article.get("sentiment"),
-                "nouns": nouns,
-                "summary": summary,
-                "embedding": vector,
+                "nouns": item["nouns"],
+                "summary": item["summary"],
+                "embedding": vector,  # float32; the repo encodes it for storage
 
                 # processing flags
                 "isProcessed": False,
                 "isEmbedded": True,
                 "isCleaned": True,
-            }
+            })
 
-            # mark raw article cleaned (keeps your current behavior)
-            self.repo_articles.update_articles(
-                {"_id": article.get("_id")},
-                {"$set": {"isCleaned": True}},
-            )
-            self.repo_clean_articles.create_articles(cleaned_doc)
+        # 5) persist: one unordered insert for the block, then flag the raw articles cleaned
+        create_many = getattr(self.repo_clean_articles, "create_articles_many", None)
+        if create_many:
+            inserted = create_many(cleaned_docs)
+        else:
+            inserted = [self.repo_clean_articles.create_articles(doc) for doc in cleaned_docs]
+        stored_ids.extend(inserted)
+        stored_vectors.append(vectors)
 
-        self.repo_metadata.update_metadata(
-            {"_id": sample_id},
-            {"$set": {"cleaning_sample_finishedAt": datetime.now(UTC)}},
-        )
-        return sample_id
+        ids = [item["article"].get("_id") for item in block]
+        update_many = getattr(self.repo_articles, "update_many_articles", None)
+        if update_many:
+            update_many({"_id": {"$in": ids}}, {"$set": {"isCleaned": True}})
+        else:
+            for _id in ids:
+                self.repo_articles.update_articles({"_id": _id}, {"$set": {"isCleaned": True}})
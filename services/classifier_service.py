@@ -1,15 +1,18 @@
 # services/classifier_service.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, Protocol
+from typing import Dict, Any, List, Optional, Protocol, Sequence
 
-from pipeline_sample.summarizer import smart_summarize
+from pipeline_sample.summarizer import smart_summarize, summarize_many
 
 
 @dataclass(frozen=True)
 class Pipelines(Protocol):
     def sentiment(self, text: str) -> Dict[str, Any]: ...
     def topic(self, text: str) -> Dict[str, Any]: ...
+    # Optional batched variants (see HFPipelines); classify_many falls back to the single calls.
+    def sentiment_many(self, texts: Sequence[str], batch_size: int = 8) -> List[Dict[str, Any]]: ...
+    def topic_many(self, texts: Sequence[str], batch_size: int = 8) -> List[Dict[str, Any]]: ...
 
 
 @dataclass(frozen=True)
@@ -39,15 +42,39 @@ class ArticleOut:
 class ClassifierService:
     """Pure(ish) classify: doesn’t touch DB. Pipelines are injected."""
 
-    def __init__(self, pipelines: Pipelines, candidate_topics: list[str]) -> None:
+    def __init__(self, pipelines: Pipelines, candidate_topics: list[str], batch_size: int = 8) -> None:
         self.pipes = pipelines
         self.candidate_topics = candidate_topics
+        self.batch_size = batch_size
 
-    def classify(self, art: ArticleIn, batch: int, sample: str) -> ArticleOut:
-        text_for_cls = art.text if len(art.text) <= 200 else smart_summarize(art.text)
-        topic = self.pipes.topic(text_for_cls)           # expects {"labels":[...], ...}
-        sentiment = self.pipes.sentiment(text_for_cls)   # expects {"label": "...", "score": ...}
+    @staticmethod
+    def _needs_summary(art: ArticleIn) -> bool:
+        return len(art.text) > 200
 
+    @classmethod
+    def _text_for_cls(cls, art: ArticleIn) -> str:
+        return smart_summarize(art.text) if cls._needs_summary(art) else art.text
+
+    @classmethod
+    def _texts_for_cls(cls, articles: Sequence[ArticleIn], batch_size: int) -> List[str]:
+        """`_text_for_cls` per article; long texts are summarized together by summarize_many."""
+        texts = [a.text for a in articles]
+        long_idx = [i for i, a in enumerate(articles) if cls._needs_summary(a)]
+        if long_idx:
+            summaries = summarize_many([texts[i] for i in long_idx], batch_size=batch_size)
+            for i, summary in zip(long_idx, summaries):
+                texts[i] = summary
+        return texts
+
+    @staticmethod
+    def _build_out(
+            art: ArticleIn,
+            text_for_cls: str,
+            topic: Dict[str, Any],
+            sentiment: Dict[str, Any],
+            batch: int,
+            sample: str,
+    ) -> ArticleOut:
         topic_label = topic["labels"][0] if topic.get("labels") else "unknown"
 
         return ArticleOut(
@@ -64,3 +91,39 @@ class ClassifierService:
             sample=sample,
         )
 
+    def classify(self, art: ArticleIn, batch: int, sample: str) -> ArticleOut:
+        text_for_cls = self._text_for_cls(art)
+        topic = self.pipes.topic(text_for_cls)           # expects {"labels":[...], ...}
+        sentiment = self.pipes.sentiment(text_for_cls)   # expects {"label": "...", "score": ...}
+        return self._build_out(art, text_for_cls, topic, sentiment, batch, sample)
+
+    def classify_many(
+            self,
+            articles: Sequence[ArticleIn],
+            batch: int,
+            sample: str,
+            batch_size: Optional[int] = None,
+    ) -> List[ArticleOut]:
+        """
+        Same output as calling `classify` per article, but summaries, topic and sentiment
+        run as padded batches of `batch_size` texts (defaults to the service's batch_size).
+        """
+        if not articles:
+            return []
+        bs = batch_size or self.batch_size
+        texts = self._texts_for_cls(articles, bs)
+
+        topic_many = getattr(self.pipes, "topic_many", None)
+        sentiment_many = getattr(self.pipes, "sentiment_many", None)
+        topics = topic_many(texts, batch_size=bs) if topic_many else [self.pipes.topic(t) for t in texts]
+        sentiments = sentiment_many(texts, batch_size=bs) if sentiment_many else [self.pipes.sentiment(t) for t in texts]
+        if len(topics) != len(texts) or len(sentiments) != len(texts):
+            raise RuntimeError(
+                f"Batched pipelines returned {len(topics)} topics / {len(sentiments)} sentiments "
+                f"for {len(texts)} texts"
+            )
+
+        return [
+            self._build_out(a, t, tp, st, batch, sample)
+            for a, t, tp, st in zip(articles, texts, topics, sentiments)
+        ]
@@ -1,21 +1,30 @@
 # services/clusterer.py
 from __future__ import annotations
-from typing import Tuple
+from dataclasses import dataclass
+from typing import List, Tuple
 import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from sklearn.cluster import AgglomerativeClustering
 
+# "agglomerative": exact average linkage; O(n²) time and memory, fine up to a few thousand vectors.
+# "threshold":     single pass leader clustering over float32 blocks; ~O(n·k) for k clusters.
+# "knn_graph":     blockwise top-k cosine graph (mutual edges above threshold) + connected components;
+#                  O(block·n) memory, no n×n matrix is ever held.
+CLUSTER_BACKENDS = ("agglomerative", "threshold", "knn_graph")
 
-def cluster_embeddings(
-        X: np.ndarray,
-        cosine_threshold: float = 0.30,  # lower = looser clusters; tune 0.25–0.35
-        min_cluster_size: int = 3,
-) -> Tuple[np.ndarray, np.ndarray]:
-    """
-    Returns (labels, centroids). Noise points (singletons) get -1.
-    """
-    if len(X) == 0:
-        return np.array([], dtype=int), np.zeros((0, X.shape[1]), dtype=X.dtype)
+# Upper bound on the block × n temporaries of one knn_graph block (similarities + argpartition)
+_KNN_BLOCK_BYTES = 256 * 2 ** 20
+
+
+def _normalize(X: np.ndarray) -> np.ndarray:
+    X = np.asarray(X, dtype="float32")
+    return X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-9)
 
+
+def _agglomerative_labels(X: np.ndarray, cosine_threshold: float) -> np.ndarray:
+    if len(X) < 2:
+        return np.zeros(len(X), dtype=int)
     # Agglomerative supports metric='cosine' with linkage='average'
     # Use distance_threshold mapping from cosine sim: dist = 1 - sim
     dist_threshold = max(1e-6, cosine_threshold)  # treat as distance directly
@@ -25,21 +34,164 @@ def cluster_embeddings(
         linkage="average",
         distance_threshold=dist_threshold,
     )
-    labels = model.fit_predict(X)
-
-    # Drop tiny clusters to noise = -1
-    final = labels.copy()
-    if len(final):
-        for lbl in set(final.tolist()):
-            if lbl == -1:
-                continue
-            size = int((final == lbl).sum())
-            if size < min_cluster_size:
-                final[final == lbl] = -1
-
-    # Compute centroids for non-noise clusters
-    uniq = sorted([c for c in set(final.tolist()) if c != -1])
-    centroids = []
-    for c in uniq:
-        centroids.append(X[final == c].mean(axis=0))
-    return final, np.vstack(centroids) if centroids else np.zeros((0, X.shape[1]), dtype=X.dtype)
+    return model.fit_predict(X)
+
+
+def _threshold_labels(X: np.ndarray, cosine_threshold: float, block_size: int) -> np.ndarray:
+    """
+    Leader clustering: each row joins the most similar existing cluster (cosine to the running
+    centroid) if within `cosine_threshold`, else it starts a new cluster. Rows are handled in
+    blocks so similarities are one (block × clusters) matmul.
+    """
+    Xn = _normalize(X)
+    n, d = Xn.shape
+    sim_min = 1.0 - cosine_threshold
+    labels = np.full(n, -1, dtype=np.int64)
+    sums = np.zeros((max(16, n // 8), d), dtype=np.float32)
+    k = 0
+
+    for start in range(0, n, block_size):
+        B = Xn[start:start + block_size]
+        lab = np.full(len(B), -1, dtype=np.int64)
+        if k:
+            C = sums[:k] / (np.linalg.norm(sums[:k], axis=1, keepdims=True) + 1e-9)
+            S = B @ C.T
+            best = S.argmax(axis=1)
+            ok = S[np.arange(len(B)), best] >= sim_min
+            lab[ok] = best[ok]
+
+        # rows that matched nothing seed new clusters, greedily, among themselves
+        rest = np.flatnonzero(lab == -1)
+        while rest.size:
+            lead = rest[0]
+            members = rest[(B[rest] @ B[lead]) >= sim_min]
+            members = np.union1d(members, [lead])
+            lab[members] = k
+            k += 1
+            if k > len(sums):
+                sums = np.vstack([sums, np.zeros_like(sums)])
+            rest = np.setdiff1d(rest, members, assume_unique=True)
+
+        np.add.at(sums, lab, B)
+        labels[start:start + len(B)] = lab
+    return labels
+
+
+def _knn_graph_labels(X: np.ndarray, cosine_threshold: float, k: int, block_size: int) -> np.ndarray:
+    """Connected components of the mutual top-k graph, keeping edges with cosine ≥ 1 - threshold."""
+    Xn = _normalize(X)
+    n = len(Xn)
+    k = min(k, n - 1)
+    if k < 1:
+        return np.arange(n)
+    sim_min = 1.0 - cosine_threshold
+
+    # rows per block so the float32 similarities and the int64 argpartition index fit the budget
+    step = max(1, min(block_size, _KNN_BLOCK_BYTES // (n * (Xn.itemsize + 8))))
+    rows, cols = [], []
+    for start in range(0, n, step):
+        stop = min(n, start + step)
+        S = Xn[start:stop] @ Xn.T
+        np.negative(S, out=S)  # ascending order = most similar first
+        S[np.arange(stop - start), np.arange(start, stop)] = np.inf  # no self edges
+        nbr = np.ascontiguousarray(np.argpartition(S, k - 1, axis=1)[:, :k])  # drop the block × n index
+        keep = -np.take_along_axis(S, nbr, axis=1) >= sim_min
+        del S
+        rows.append(np.repeat(np.arange(start, stop), k)[keep.ravel()])
+        cols.append(nbr[keep])
+
+    r, c = np.concatenate(rows), np.concatenate(cols)
+    A = coo_matrix((np.ones(len(r), dtype=np.int8), (r, c)), shape=(n, n)).tocsr()
+    A = A.multiply(A.T)  # mutual neighbours only: curbs single-linkage chaining
+    _, labels = connected_components(A, directed=False)
+    return labels
+
+
+@dataclass(frozen=True)
+class ClusterSummary:
+    """
+    Everything downstream needs from one clustering pass, computed together.
+    - labels:   per-row label, -1 = noise
+    - ids:      kept cluster labels, ascending (row i of centroids/sizes/members)
+    - sizes:    member count per kept cluster
+    - members:  row indices per kept cluster, ascending
+    - centroids: mean vector per kept cluster (same dtype as X)
+    """
+    labels: np.ndarray
+    ids: np.ndarray
+    sizes: np.ndarray
+    members: List[np.ndarray]
+    centroids: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def first_appearance_order(self) -> np.ndarray:
+        """Cluster positions ordered by their lowest row index (the order a row scan meets them)."""
+        firsts = np.array([m[0] for m in self.members], dtype=np.int64)
+        return np.argsort(firsts, kind="stable")
+
+
+def _summarize(labels: np.ndarray, X: np.ndarray, min_cluster_size: int) -> ClusterSummary:
+    """Drop clusters smaller than min_cluster_size to noise (-1), then group rows with one stable sort."""
+    labels = np.asarray(labels)
+    uniq, inv, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    keep = (uniq != -1) & (counts >= min_cluster_size)
+    final = np.where(keep[inv], labels, -1)
+
+    # rows of kept clusters, grouped by label (ascending) and by row index within a label
+    rows = np.flatnonzero(keep[inv])
+    rows = rows[np.argsort(final[rows], kind="stable")]
+    sizes = counts[keep]
+    if not len(sizes):
+        return ClusterSummary(labels=final, ids=uniq[keep], sizes=sizes, members=[],
+                              centroids=np.zeros((0, X.shape[1]), dtype=X.dtype))
+
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    members = np.split(rows, starts[1:])
+    sums = np.add.reduceat(X[rows].astype(np.float64), starts, axis=0)
+    centroids = (sums / sizes[:, None]).astype(X.dtype)
+    return ClusterSummary(labels=final, ids=uniq[keep], sizes=sizes, members=members, centroids=centroids)
+
+
+def cluster_summary(
+        X: np.ndarray,
+        cosine_threshold: float = 0.30,  # lower = looser clusters; tune 0.25–0.35
+        min_cluster_size: int = 3,
+        backend: str = "agglomerative",
+        knn_k: int = 10,
+        block_size: int = 2048,
+) -> ClusterSummary:
+    """
+    Cluster rows of X and return labels, sizes, member indices and centroids in one pass.
+    `backend` is one of CLUSTER_BACKENDS; all share the same threshold and noise rule.
+    """
+    if len(X) == 0:
+        return _summarize(np.array([], dtype=int), X, min_cluster_size)
+
+    if backend == "agglomerative":
+        labels = _agglomerative_labels(X, cosine_threshold)
+    elif backend == "threshold":
+        labels = _threshold_labels(X, cosine_threshold, block_size)
+    elif backend == "knn_graph":
+        labels = _knn_graph_labels(X, cosine_threshold, knn_k, block_size)
+    else:
+        raise ValueError(f"Unknown clustering backend {backend!r}; expected one of {CLUSTER_BACKENDS}")
+
+    return _summarize(labels, X, min_cluster_size)
+
+
+def cluster_embeddings(
+        X: np.ndarray,
+        cosine_threshold: float = 0.30,  # lower = looser clusters; tune 0.25–0.35
+        min_cluster_size: int = 3,
+        backend: str = "agglomerative",
+        knn_k: int = 10,
+        block_size: int = 2048,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (labels, centroids). Noise points (clusters below min_cluster_size) get -1.
+    Centroids are in ascending label order. See cluster_summary for sizes/members too.
+    """
+    summary = cluster_summary(X, cosine_threshold, min_cluster_size, backend, knn_k, block_size)
+    return summary.labels, summary.centroids
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from collections import Counter, defaultdict
 from dataclasses import dataclass
-from typing import Dict, Any, List, Optional, TypedDict
+from typing import Dict, Any, Iterable, List, Optional, TypedDict
 
 
 class DistributionItem(TypedDict):
@@ -25,28 +25,36 @@ class WordOccurrence:
     sentiment: Optional[str]
 
 
+# topic / sentiment labels that carry no information
+_NO_TOPIC = {"", "topic", "unknown", "none"}
+_NO_SENTIMENT = {"", "n/a", "label", "unknown", "none"}
+
+# Where the counting runs: in Python over the cursor, or in a Mongo aggregation
+DAILY_TRENDS_BACKENDS = ("python", "mongo")
+
+
+def _label(value: Any, skip: set[str]) -> Optional[str]:
+    v = (value or "").strip().lower()
+    return v if v not in skip else None
+
+
 class DailyTrendsService:
     """
     Pure application service:
-    - input: list of cleaned article dicts
+    - input: iterable of cleaned article dicts (a cursor is consumed as it streams)
     - output: ranked words + simple metrics (no I/O, no DB)
+    compute() keeps only counters: words get integer codes in first-seen order, with a count per
+    code and Counters keyed by (word code, topic / sentiment code). First-seen order is what
+    Counter.most_common() breaks ties by, so rankings and distributions keep that order.
+    The occurrence-list helpers (extract_occurrences ... build_ranked_words) give the same
+    result with one WordOccurrence per noun.
     """
 
-    def extract_occurrences(self, articles: List[Dict[str, Any]]) -> List[WordOccurrence]:
+    def extract_occurrences(self, articles: Iterable[Dict[str, Any]]) -> List[WordOccurrence]:
         out: List[WordOccurrence] = []
         for a in articles:
-            print(f"Processing article: {a.get('title', 'No Title')}")  # Debugging output
-            topic = (a.get("topic") or "").strip().lower()
-            sentiment = (a.get("sentiment", {}).get("label") or "").strip().lower()
-            nouns = a.get("nouns", []) or []
-
-            valid_topic = topic not in {"", "topic", "unknown", "none"}
-            valid_sent = sentiment not in {"", "n/a", "label", "unknown", "none"}
-
-            tval = topic if valid_topic else None
-            sval = sentiment if valid_sent else None
-
-            for noun in nouns:
+            tval, sval = self._context(a)
+            for noun in a.get("nouns", []) or []:
                 out.append(WordOccurrence(word=noun, topic=tval, sentiment=sval))
         return out
 
@@ -66,14 +74,6 @@ class DailyTrendsService:
                 sentiments[w.word].append(w.sentiment)
         return topics, sentiments
 
-    @staticmethod
-    def distribution(values: List[str]) -> List[DistributionItem]:
-        if not values:
-            return []
-        c = Counter(values)
-        total = sum(c.values()) or 1
-        return [{"label": k, "percentage": round((v / total) * 100)} for k, v in c.most_common()]
-
     def build_ranked_words(
             self,
             top_words: List[tuple[str, int]],
@@ -93,7 +93,46 @@ class DailyTrendsService:
             })
         return ranked
 
-    def compute(self, articles: List[Dict[str, Any]], limit: int = 15) -> Dict[str, Any]:
+    @staticmethod
+    def _context(article: Dict[str, Any]) -> tuple[Optional[str], Optional[str]]:
+        return (_label(article.get("topic"), _NO_TOPIC),
+                _label((article.get("sentiment") or {}).get("label"), _NO_SENTIMENT))
+
+    @staticmethod
+    def _code(codes: Dict[str, int], value: str) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    @staticmethod
+    def distribution(values: List[str]) -> List[DistributionItem]:
+        if not values:
+            return []
+        c = Counter(values)
+        total = sum(c.values()) or 1
+        return [{"label": k, "percentage": round((v / total) * 100)} for k, v in c.most_common()]
+
+    @staticmethod
+    def distribution_from_counts(counts: List[tuple[str, int]]) -> List[DistributionItem]:
+        """`distribution` of already counted labels: (label, count) pairs in first-seen order."""
+        if not counts:
+            return []
+        total = sum(c for _, c in counts) or 1
+        ordered = sorted(counts, key=lambda lc: lc[1], reverse=True)  # stable: ties stay first-seen
+        return [{"label": k, "percentage": round((v / total) * 100)} for k, v in ordered]
+
+    @staticmethod
+    def _by_word(pairs: Counter, labels: Dict[str, int], words: set[int]) -> Dict[int, List[tuple[str, int]]]:
+        """(label, count) per word code in `words`, in first-seen order of the pair."""
+        names = list(labels)
+        out: Dict[int, List[tuple[str, int]]] = defaultdict(list)
+        for (w, label), c in pairs.items():
+            if w in words:
+                out[w].append((names[label], c))
+        return out
+
+    def compute(self, articles: Iterable[Dict[str, Any]], limit: Optional[int] = 15) -> Dict[str, Any]:
         """
         Returns a pure result dict:
         {
@@ -101,12 +140,113 @@ class DailyTrendsService:
           "ranked_words": [RankedWord, ...]
         }
         """
-        occurrences = self.extract_occurrences(articles)
-        counter = self.build_counter(occurrences)
-        metrics = {
-            "total_words": sum(counter.values()),
-            "distinct_words": len(counter),
-        }
-        top_words = self.top_n(counter, limit)
-        ranked_words = self.build_ranked_words(top_words, occurrences)
+        words: Dict[str, int] = {}
+        counts: List[int] = []
+        topic_codes: Dict[str, int] = {}
+        sentiment_codes: Dict[str, int] = {}
+        by_topic: Counter = Counter()
+        by_sentiment: Counter = Counter()
+        for a in articles:
+            tval, sval = self._context(a)
+            coded = []
+            for noun in a.get("nouns") or []:
+                w = words.get(noun)
+                if w is None:
+                    w = words[noun] = len(counts)
+                    counts.append(0)
+                counts[w] += 1
+                coded.append(w)
+            if tval and coded:
+                t = self._code(topic_codes, tval)
+                by_topic.update((w, t) for w in coded)
+            if sval and coded:
+                s = self._code(sentiment_codes, sval)
+                by_sentiment.update((w, s) for w in coded)
+
+        metrics = {"total_words": sum(counts), "distinct_words": len(counts)}
+        # most common first, ties in first-seen order (as Counter.most_common)
+        top = sorted(range(len(counts)), key=counts.__getitem__, reverse=True)[:limit]
+        names = list(words)
+        topics = self._by_word(by_topic, topic_codes, set(top))
+        sentiments = self._by_word(by_sentiment, sentiment_codes, set(top))
+        ranked_words: List[RankedWord] = [{
+            "word": names[w],
+            "count": counts[w],
+            "rank": idx + 1,
+            "context": {
+                "topics": self.distribution_from_counts(topics.get(w, [])),
+                "sentiments": self.distribution_from_counts(sentiments.get(w, [])),
+            },
+        } for idx, w in enumerate(top)]
         return {"metrics": metrics, "ranked_words": ranked_words}
+
+
+class DailyTrendsAggregation:
+    """
+    DailyTrendsService.compute pushed down to MongoDB: pipeline() counts nouns per
+    (word, raw topic, raw sentiment) with `$unwind`/`$group` on the server and returns one
+    document with the top-`limit` words and the sample metrics; result() turns it into the
+    same {"metrics", "ranked_words"} dict.
+    - Ties are broken by first occurrence, (article _id, position in `nouns`), which is the
+      Python backend's cursor order whenever natural order follows _id (ObjectId inserts).
+    - Labels are normalized here, not on the server: a word has few raw (topic, sentiment)
+      pairs, and the client only receives those of the top words.
+    """
+
+    @staticmethod
+    def pipeline(match: Dict[str, Any], limit: Optional[int] = 15) -> List[Dict[str, Any]]:
+        first = {"first_id": 1, "first_pos": 1}
+        return [
+            {"$match": match},
+            # explicit nulls: missing labels group together with null ones
+            {"$project": {"nouns": 1, "t": {"$ifNull": ["$topic", None]}, "s": {"$ifNull": ["$sentiment.label", None]}}},
+            {"$sort": {"_id": 1}},
+            {"$unwind": {"path": "$nouns", "includeArrayIndex": "pos"}},
+            {"$group": {
+                "_id": {"w": "$nouns", "t": "$t", "s": "$s"},
+                "n": {"$sum": 1},
+                "first_id": {"$first": "$_id"},
+                "first_pos": {"$first": "$pos"},
+            }},
+            {"$sort": first},
+            {"$group": {
+                "_id": "$_id.w",
+                "count": {"$sum": "$n"},
+                "first_id": {"$first": "$first_id"},
+                "first_pos": {"$first": "$first_pos"},
+                "context": {"$push": {"t": "$_id.t", "s": "$_id.s", "n": "$n", **{k: f"${k}" for k in first}}},
+            }},
+            {"$facet": {
+                "top": [{"$sort": {"count": -1, **first}}] + ([{"$limit": limit}] if limit is not None else []),
+                "metrics": [{"$group": {"_id": None, "total_words": {"$sum": "$count"}, "distinct_words": {"$sum": 1}}}],
+            }},
+        ]
+
+    @staticmethod
+    def result(docs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        doc = next(iter(docs), None) or {}
+        metrics = (doc.get("metrics") or [{}])[0]
+        ranked_words: List[RankedWord] = []
+        for idx, w in enumerate(doc.get("top") or []):
+            topics: Dict[str, int] = {}
+            sentiments: Dict[str, int] = {}
+            # first-seen order of each normalized label
+            for c in sorted(w.get("context") or [], key=lambda c: (c["first_id"], c["first_pos"])):
+                t, s = _label(c.get("t"), _NO_TOPIC), _label(c.get("s"), _NO_SENTIMENT)
+                if t:
+                    topics[t] = topics.get(t, 0) + c["n"]
+                if s:
+                    sentiments[s] = sentiments.get(s, 0) + c["n"]
+            ranked_words.append({
+                "word": w["_id"],
+                "count": w["count"],
+                "rank": idx + 1,
+                "context": {
+                    "topics": DailyTrendsService.distribution_from_counts(list(topics.items())),
+                    "sentiments": DailyTrendsService.distribution_from_counts(list(sentiments.items())),
+                },
+            })
+        return {
+            "metrics": {"total_words": metrics.get("total_words", 0), "distinct_words": metrics.get("distinct_words", 0)},
+            "ranked_words": ranked_words,
+        }
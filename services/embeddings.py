@@ -2,15 +2,24 @@
 from __future__ import annotations
 import os
 from pathlib import Path
-from typing import List, Sequence, Optional
+from typing import Dict, Sequence, Optional
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from core.paths import cache_dir
+from lib.cache.embedding_store import SampleEmbeddingStore
+from lib.cache.sqlite_cache import SQLiteCache, content_key
+
 _CACHE = Path(os.getenv("HF_HOME", os.getenv("TRANSFORMERS_CACHE", "models/transformers"))).resolve()
 _MODEL_NAME = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Anything besides model + text that changes a vector; bump when encode() settings change.
+_EMBED_PARAMS = "normalize=1;dtype=float32"
 
 _model: Optional[SentenceTransformer] = None
+_embedding_cache: Optional[SQLiteCache] = None
+_embedding_store: Optional[SampleEmbeddingStore] = None
 
 
 def get_embedder() -> SentenceTransformer:
@@ -20,10 +29,73 @@ def get_embedder() -> SentenceTransformer:
     return _model
 
 
-def embed_texts(texts: Sequence[str]) -> np.ndarray:
+def embed_texts(texts: Sequence[str], batch_size: int = _BATCH_SIZE) -> np.ndarray:
     """Return L2-normalized float32 embeddings [n, d]."""
     if not texts:
         return np.zeros((0, 384), dtype="float32")
     m = get_embedder()
-    X = m.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+    X = m.encode(list(texts), batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
     return X.astype("float32")
+
+
+def get_embedding_cache() -> Optional[SQLiteCache]:
+    """
+    Persistent text -> vector cache (float32 blobs, SQLite under CACHE_DIR).
+    Env: EMBED_CACHE=off disables it; EMBED_CACHE_PATH, EMBED_CACHE_MAX_ENTRIES tune it.
+    """
+    global _embedding_cache
+    if os.getenv("EMBED_CACHE", "on").strip().lower() in {"0", "off", "false", "no"}:
+        return None
+    if _embedding_cache is None:
+        path = os.getenv("EMBED_CACHE_PATH") or str(cache_dir() / "embeddings.sqlite")
+        _embedding_cache = SQLiteCache(
+            path,
+            table="embeddings",
+            max_entries=int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "500000")),
+        )
+    return _embedding_cache
+
+
+def get_embedding_store() -> Optional[SampleEmbeddingStore]:
+    """
+    Per-sample memory-mapped embedding matrices (.npy under CACHE_DIR/sample_vectors), written
+    by the clean stage and read by the trends stage. Env: EMBED_STORE=off, EMBED_STORE_PATH.
+    """
+    global _embedding_store
+    if os.getenv("EMBED_STORE", "on").strip().lower() in {"0", "off", "false", "no"}:
+        return None
+    if _embedding_store is None:
+        _embedding_store = SampleEmbeddingStore(os.getenv("EMBED_STORE_PATH") or cache_dir() / "sample_vectors")
+    return _embedding_store
+
+
+def embedding_cache_stats() -> Dict[str, int]:
+    cache = get_embedding_cache()
+    return cache.stats() if cache else {}
+
+
+def embed_texts_cached(texts: Sequence[str], batch_size: int = _BATCH_SIZE) -> np.ndarray:
+    """
+    Same result as `embed_texts`, but vectors are looked up by content hash first;
+    only unseen texts reach the model (in one batched encode) and are then stored.
+    """
+    cache = get_embedding_cache()
+    if cache is None or not texts:
+        return embed_texts(texts, batch_size=batch_size)
+
+    keys = [content_key(t, _MODEL_NAME, _EMBED_PARAMS) for t in texts]
+    found = cache.get_many(keys)
+    # de-duplicate misses so repeated texts within a block are encoded once
+    missing: Dict[str, str] = {}
+    for k, t in zip(keys, texts):
+        if k not in found and k not in missing:
+            missing[k] = t
+
+    vectors: Dict[str, np.ndarray] = {k: np.frombuffer(v, dtype="float32") for k, v in found.items()}
+    if missing:
+        X = embed_texts(list(missing.values()), batch_size=batch_size)
+        cache.put_many((k, row.tobytes()) for k, row in zip(missing, X))
+        vectors.update(zip(missing, X))
+
+    return np.stack([vectors[k] for k in keys]).astype("float32", copy=False)
+
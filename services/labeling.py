@@ -1,10 +1,18 @@
 # services/labeling.py
 from __future__ import annotations
-from typing import Dict, List, Tuple
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
 from collections import Counter
 
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from core.paths import cache_dir
+from lib.cache.doc_freq_store import DocFreqStore
+
+_doc_freq_store: Optional[DocFreqStore] = None
 
 
 def tfidf_top_terms(texts: List[str], k: int = 8) -> List[str]:
@@ -24,14 +32,95 @@ def tfidf_top_terms(texts: List[str], k: int = 8) -> List[str]:
     return [inv_vocab[i] for i in idx]
 
 
+class TfidfLabeler:
+    """
+    One vocabulary and IDF for all clusters of a sample, instead of a vectorizer per cluster.
+    - fit once over every (member) text of the sample, same settings as tfidf_top_terms;
+    - `history` = (n_docs, document frequencies) of earlier days (see DocFreqStore) is added to
+      the sample's own counts, so IDF reflects a rolling multi-day corpus;
+    - top_terms_many() scores all clusters with one sparse (clusters × docs) @ (docs × terms)
+      product: row c is the mean l2-normalized tf-idf vector of cluster c, as in tfidf_top_terms.
+    """
+
+    def __init__(
+            self,
+            texts: Sequence[str],
+            history: Optional[Tuple[int, Dict[str, int]]] = None,
+            max_df: float = 0.9,
+    ) -> None:
+        self.n_docs = len(texts)
+        self.terms = np.array([], dtype=object)
+        self.df = np.zeros(0, dtype=np.int64)
+        self.X: Optional[csr_matrix] = None
+        if not texts:
+            return
+        try:
+            counts, vect = self._count(texts, max_df)
+        except ValueError:
+            # every term above max_df (tiny or uniform samples): keep them all
+            try:
+                counts, vect = self._count(texts, 1.0)
+            except ValueError:  # no terms at all (empty or stop words only)
+                return
+        self.terms = vect.get_feature_names_out()
+        self.df = np.bincount(counts.indices, minlength=len(self.terms))
+
+        n, df = self.n_docs, self.df.astype(np.float64)
+        if history:
+            hist_n, hist_df = history
+            n += hist_n
+            df += np.array([hist_df.get(t, 0) for t in self.terms], dtype=np.float64)
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0  # sklearn's smooth idf
+        self.X = normalize(counts.multiply(idf).tocsr(), norm="l2")
+
+    @staticmethod
+    def _count(texts: Sequence[str], max_df: float):
+        vect = CountVectorizer(stop_words="english", max_df=max_df, min_df=1, ngram_range=(1, 2))
+        return vect.fit_transform(texts).tocsr(), vect
+
+    def top_terms_many(self, groups: Sequence[Sequence[int]], k: int = 8) -> List[List[str]]:
+        """Top-k terms per group of text indices (highest mean tf-idf first)."""
+        if self.X is None or not len(groups):
+            return [[] for _ in groups]
+        rows = np.concatenate([np.asarray(g, dtype=np.int64) for g in groups] + [np.zeros(0, dtype=np.int64)])
+        owner = np.repeat(np.arange(len(groups)), [len(g) for g in groups])
+        weight = np.concatenate([np.full(len(g), 1.0 / max(1, len(g))) for g in groups] + [np.zeros(0)])
+        G = csr_matrix((weight, (owner, rows)), shape=(len(groups), self.n_docs))
+        M = (G @ self.X).tocsr()
+
+        out: List[List[str]] = []
+        for c in range(len(groups)):
+            lo, hi = M.indptr[c], M.indptr[c + 1]
+            data, idx = M.data[lo:hi], M.indices[lo:hi]
+            top = np.lexsort((idx, -data))[:k]  # score desc, then vocabulary order
+            out.append([str(self.terms[i]) for i in idx[top]])
+        return out
+
+    def doc_freqs(self, min_df: int = 2) -> Tuple[int, Dict[str, int]]:
+        """(n_docs, {term: df}) of this sample for DocFreqStore; terms below min_df are dropped."""
+        keep = np.flatnonzero(self.df >= min_df)
+        return self.n_docs, {str(self.terms[i]): int(self.df[i]) for i in keep}
+
+
+def get_doc_freq_store() -> DocFreqStore:
+    """Per-sample document frequencies for rolling IDF (JSON under CACHE_DIR/idf; env LABEL_IDF_PATH)."""
+    global _doc_freq_store
+    if _doc_freq_store is None:
+        _doc_freq_store = DocFreqStore(os.getenv("LABEL_IDF_PATH") or cache_dir() / "idf")
+    return _doc_freq_store
+
+
 def label_from_terms_entities_topics(
         summaries: List[str],
         entities_lists: List[List[str]],
         topics: List[str],
         top_terms_k: int = 8,
         top_entities_k: int = 6,
+        terms: Optional[List[str]] = None,
 ) -> Tuple[str, List[str], List[str], Dict[str, int]]:
-    terms = tfidf_top_terms(summaries, k=top_terms_k)
+    # `terms` precomputed by TfidfLabeler; otherwise a per-cluster fit
+    if terms is None:
+        terms = tfidf_top_terms(summaries, k=top_terms_k)
     ent_counter: Counter[str] = Counter()
     for ents in entities_lists:
         ent_counter.update([e.lower() for e in (ents or [])])
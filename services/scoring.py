@@ -2,20 +2,25 @@
 from __future__ import annotations
 from datetime import datetime, timezone
 from math import exp, log
-from typing import Dict, Any, Iterable, List
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
 from services.scoring_config import ScoringConfig
 
 
-def _hours_since(published_at: Any) -> float:
+def _hours_since(published_at: Any, as_of: Optional[datetime] = None) -> float:
+    # `as_of`: the run's clock (aware datetime); reading now() per article drifts within a run
     if not published_at:
         return 72.0
+    now = as_of or datetime.now(timezone.utc)
     try:
         # accept either datetime or ISO string
         if isinstance(published_at, str):
             # naive parse for 'YYYY-MM-DDTHH:MM:SSZ'
-            return (datetime.now(timezone.utc) - datetime.fromisoformat(
+            return (now - datetime.fromisoformat(
                 published_at.replace("Z", "+00:00"))).total_seconds() / 3600.0
-        return (datetime.now(timezone.utc) - published_at).total_seconds() / 3600.0
+        return (now - published_at).total_seconds() / 3600.0
     except Exception:
         return 72.0
 
@@ -35,18 +40,18 @@ def _category_weight(cat: str | None, cfg: ScoringConfig) -> float:
     return cfg.category_weights.get(cat.lower(), cfg.category_weights.get("general", 1.0))
 
 
-def _recency_weight(published_at: Any, cfg: ScoringConfig) -> float:
-    h = _hours_since(published_at)
+def _recency_weight(published_at: Any, cfg: ScoringConfig, as_of: Optional[datetime] = None) -> float:
+    h = _hours_since(published_at, as_of)
     return exp(-h / max(cfg.recency_tau_hours, 1.0))
 
 
-def article_weight(doc: Dict[str, Any], cfg: ScoringConfig) -> float:
+def article_weight(doc: Dict[str, Any], cfg: ScoringConfig, as_of: Optional[datetime] = None) -> float:
     """
     Lightweight, interpretable weight in [~0.3..1.0+].
     Combines source authority, recency, category. (You can add more factors later.)
     """
     sw = _source_weight(doc.get("source_domain") or doc.get("source"), cfg)
-    rw = _recency_weight(doc.get("published_at"), cfg)
+    rw = _recency_weight(doc.get("published_at"), cfg, as_of)
     cw = _category_weight(doc.get("category"), cfg)
     # Simple smooth combination
     return 0.5 * sw + 0.3 * rw + 0.2 * cw
@@ -60,8 +65,117 @@ def diversity_bonus(sources: Iterable[str], cfg: ScoringConfig) -> float:
     return cfg.diversity_bonus_zeta * log(1.0 + reputable)
 
 
-def score_cluster(member_docs: List[Dict[str, Any]], cfg: ScoringConfig) -> Dict[str, float]:
-    w_sum = sum(article_weight(d, cfg) for d in member_docs)
+def score_cluster(
+        member_docs: List[Dict[str, Any]],
+        cfg: ScoringConfig,
+        as_of: Optional[datetime] = None,
+) -> Dict[str, float]:
+    w_sum = sum(article_weight(d, cfg, as_of) for d in member_docs)
     srcs = [(d.get("source_domain") or d.get("source") or "").lower() for d in member_docs]
     bonus = diversity_bonus(srcs, cfg)
     return {"sum_article_weight": w_sum, "diversity_bonus": bonus, "cluster_score_today": w_sum + bonus}
+
+
+# ---- Columnar engine: all clusters of a sample at once ----
+def _published_ts(published_at: Any) -> float:
+    """Epoch seconds of an aware datetime / ISO string; NaN where _hours_since falls back to 72h."""
+    if not published_at:
+        return float("nan")
+    try:
+        dt = datetime.fromisoformat(published_at.replace("Z", "+00:00")) \
+            if isinstance(published_at, str) else published_at
+        # naive times cannot be compared with an aware "now" (the per-article path gives up too)
+        return dt.timestamp() if dt.tzinfo is not None else float("nan")
+    except Exception:
+        return float("nan")
+
+
+def published_times(
+        docs: Sequence[Dict[str, Any]],
+        ids: Optional[Sequence[Any]] = None,
+        cache: Optional[Dict[Any, float]] = None,
+) -> np.ndarray:
+    """
+    Parsed publish times (epoch seconds, NaN = unknown) of `docs`. With `ids` and a `cache`
+    dict, times are memoized per article id, so re-scoring a sample parses nothing again.
+    """
+    if ids is None or cache is None:
+        return np.fromiter((_published_ts(d.get("published_at")) for d in docs), dtype=np.float64, count=len(docs))
+    out = np.empty(len(docs), dtype=np.float64)
+    for i, (_id, d) in enumerate(zip(ids, docs)):
+        ts = cache.get(_id)
+        if ts is None:
+            ts = cache[_id] = _published_ts(d.get("published_at"))
+        out[i] = ts
+    return out
+
+
+def _codes(keys: Iterable[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Integer code per key + the distinct keys, in first-seen order."""
+    index: Dict[Any, int] = {}
+    codes = np.fromiter((index.setdefault(k, len(index)) for k in keys), dtype=np.int64)
+    return codes, list(index)
+
+
+def article_arrays(
+        docs: Sequence[Dict[str, Any]],
+        cfg: ScoringConfig,
+        as_of: Optional[datetime] = None,
+        published: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-article inputs of score_clusters, computed once per sample:
+    - weights: article_weight() of every doc at `as_of` (source/category weights looked up once
+      per distinct value, recency as one vectorized exp over `published`, see published_times);
+    - source codes: distinct lower-cased source per doc, -1 for none (diversity);
+    - reputable: per source code, source weight >= 0.9.
+    """
+    src_codes, sources = _codes((d.get("source_domain") or d.get("source") or "").lower() for d in docs)
+    src_w = np.array([_source_weight(s, cfg) for s in sources], dtype=np.float64)
+    cat_codes, cats = _codes(d.get("category") for d in docs)
+    cat_w = np.array([_category_weight(c, cfg) for c in cats], dtype=np.float64)
+
+    ts = published if published is not None else published_times(docs)
+    now = (as_of or datetime.now(timezone.utc)).timestamp()
+    hours = np.where(np.isnan(ts), 72.0, (now - ts) / 3600.0)
+    rec_w = np.exp(-hours / max(cfg.recency_tau_hours, 1.0))
+
+    weights = 0.5 * src_w[src_codes] + 0.3 * rec_w + 0.2 * cat_w[cat_codes]
+    # diversity counts non-empty sources only
+    empty = sources.index("") if "" in sources else -1
+    src_codes = np.where(src_codes == empty, -1, src_codes)
+    return weights, src_codes, src_w >= 0.9
+
+
+def score_clusters(
+        docs: Sequence[Dict[str, Any]],
+        members: Sequence[Sequence[int]],
+        cfg: ScoringConfig,
+        as_of: Optional[datetime] = None,
+        published: Optional[np.ndarray] = None,
+) -> List[Dict[str, float]]:
+    """
+    score_cluster() for every cluster: members[c] are indices into `docs`. Weights are summed per
+    cluster with one bincount over the concatenated member indices; diversity counts distinct
+    reputable sources per cluster from (cluster, source code) pairs.
+    """
+    weights, src_codes, reputable = article_arrays(docs, cfg, as_of, published)
+    k = len(members)
+    if not k:
+        return []
+    idx = np.concatenate([np.asarray(m, dtype=np.int64) for m in members])
+    owner = np.repeat(np.arange(k), [len(m) for m in members])
+    w_sum = np.bincount(owner, weights=weights[idx], minlength=k)
+
+    codes = src_codes[idx]
+    keep = codes >= 0
+    keep[keep] = reputable[codes[keep]]
+    pairs = np.unique(owner[keep] * max(1, len(reputable)) + codes[keep])
+    n_reputable = np.bincount(pairs // max(1, len(reputable)), minlength=k)
+
+    zeta = cfg.diversity_bonus_zeta
+    out: List[Dict[str, float]] = []
+    for s, r in zip(w_sum.tolist(), n_reputable.tolist()):
+        bonus = zeta * log(1.0 + r) if r else 0.0
+        out.append({"sum_article_weight": s, "diversity_bonus": bonus, "cluster_score_today": s + bonus})
+    return out
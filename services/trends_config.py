@@ -7,6 +7,10 @@ from dataclasses import dataclass
 class TrendsConfig:
     # Cosine similarity to *link* a new cluster with an existing thread
     link_threshold_cosine: float = 0.80
+    # One-to-one linking: a thread is claimed by at most one cluster (best pairs first)
+    link_one_to_one: bool = False
+    # Days of thread history to link against; beyond 1 (yesterday) needs a ThreadCentroidIndex
+    link_lookback_days: int = 1
     # EMA smoothing for momentum
     ema_lambda: float = 0.70
     # Window (days) to judge novelty of entity sets
@@ -0,0 +1,57 @@
+# tests/test_build_projections.py
+import mongomock
+import numpy as np
+import pytest
+
+import lib.db.mongo_client as mongo_client
+from app.use_cases.build_daily_clusters import BuildDailyClustersUseCase
+
+SAMPLE = "1-2025-08-16"
+WORDS = ["harbor", "senate", "turbine", "glacier", "vaccine", "orchestra", "tariff"]
+
+
+@pytest.fixture
+def clean(monkeypatch):
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+
+    monkeypatch.setattr(mongo_client, "_db", mongomock.MongoClient().db)
+    return CleanArticlesRepository()
+
+
+class SpyRepo:
+    def __init__(self, repo):
+        self.repo = repo
+        self.calls = []
+
+    def get_articles_broad(self, filter_param, projection_param=None, batch_size=None):
+        docs = list(self.repo.get_articles_broad(filter_param, projection_param, batch_size=batch_size))
+        self.calls.append({"filter": filter_param, "projection": projection_param, "batch_size": batch_size,
+                           "returned": len(docs)})
+        return docs
+
+
+def test_text_fields_are_fetched_only_for_kept_cluster_members(clean):
+    rng = np.random.default_rng(0)
+    centre = rng.normal(size=32)
+    X = np.vstack([centre + rng.normal(scale=0.02, size=(4, 32)), rng.normal(size=(3, 32))])
+    clean.create_articles_many([
+        {"sample": SAMPLE, "title": f"t{i}", "summary": "" if i == 0 else f"story {WORDS[i % len(WORDS)]} {i}",
+         "text": f"long body {WORDS[i % len(WORDS)]} " * 50, "nouns": ["n"], "topic": "world",
+         "source_domain": "x.example", "embedding": v}
+        for i, v in enumerate(X)
+    ])
+    ids = [clean.get_one_article({"title": f"t{i}"})["_id"] for i in range(len(X))]
+
+    spy = SpyRepo(clean)
+    out = BuildDailyClustersUseCase(spy).run(SAMPLE)
+    assert [c["size"] for c in out["clusters"]] == [4]
+
+    vectors, views, texts = spy.calls
+    # phase 1: ids and embeddings of the whole sample, batched cursor
+    assert vectors["projection"] == {"_id": 1, "embedding": 1} and vectors["returned"] == 7
+    assert vectors["batch_size"] == 2000
+    # phase 2: display fields for the 4 members only, no text and no vectors
+    assert views["filter"] == {"_id": {"$in": ids[:4]}}
+    assert "text" not in views["projection"] and "embedding" not in views["projection"]
+    # text only where the summary is empty
+    assert texts["filter"] == {"_id": {"$in": [ids[0]]}} and texts["projection"] == {"_id": 1, "text": 1}
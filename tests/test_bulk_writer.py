@@ -0,0 +1,254 @@
+# tests/test_bulk_writer.py
+from collections import Counter
+
+import mongomock
+import pytest
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import lib.db.mongo_client as mongo_client
+from lib.db.bulk_writer import BulkWriter
+
+
+class CountingCollection:
+    """
+    mongomock collection stand-in that counts round trips per method.
+    bulk_write is replayed op by op (mongomock's own bulk_write rejects newer pymongo UpdateOne).
+    """
+
+    COUNTED = {"insert_one", "insert_many", "update_one", "update_many", "find_one_and_update"}
+
+    def __init__(self, coll, trips: Counter, counted=COUNTED):
+        self._coll = coll
+        self.trips = trips
+        self.counted = counted
+
+    def __getattr__(self, name):
+        attr = getattr(self._coll, name)
+        if name in self.counted:
+            def counted(*args, **kwargs):
+                self.trips[name] += 1
+                return attr(*args, **kwargs)
+            return counted
+        return attr
+
+    def bulk_write(self, ops, ordered=True):
+        self.trips["bulk_write"] += 1
+        res = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nUpserted": 0, "writeErrors": []}
+        for i, op in enumerate(ops):
+            try:
+                if isinstance(op, InsertOne):
+                    self._coll.insert_one(op._doc)
+                    res["nInserted"] += 1
+                    continue
+                update = self._coll.update_one if isinstance(op, UpdateOne) else self._coll.update_many
+                r = update(op._filter, op._doc, upsert=op._upsert)
+                res["nMatched"] += r.matched_count
+                res["nModified"] += r.modified_count
+                res["nUpserted"] += int(r.upserted_id is not None)
+            except DuplicateKeyError as e:
+                res["writeErrors"].append({"index": i, "errmsg": str(e)})
+                if ordered:
+                    break
+        if res["writeErrors"]:
+            raise BulkWriteError(res)
+        return type("Result", (), {"bulk_api_result": res})()
+
+
+class CountingDB:
+    def __init__(self, counted=CountingCollection.COUNTED):
+        self._db = mongomock.MongoClient().db
+        self.trips = Counter()
+        self.counted = counted
+
+    def __getitem__(self, name):
+        return CountingCollection(self._db[name], self.trips, self.counted)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = CountingDB()
+    monkeypatch.setattr(mongo_client, "_db", fake)
+    return fake
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_flushes_by_size_and_on_exit(db):
+    coll = db["articles"]
+    with BulkWriter(coll, max_ops=100, max_delay=None) as writer:
+        for i in range(250):
+            writer.insert_one({"i": i})
+        assert db.trips["bulk_write"] == 2
+        assert len(writer) == 50
+    assert db.trips["bulk_write"] == 3
+    assert coll.count_documents({}) == 250
+    assert writer.stats.as_dict() == {
+        "ops": 250, "round_trips": 3, "inserted": 250, "matched": 0, "modified": 0, "upserted": 0, "errors": 0,
+    }
+
+
+def test_flushes_when_oldest_op_is_too_old(db):
+    clock = Clock()
+    writer = BulkWriter(db["articles"], max_ops=1000, max_delay=2.0, clock=clock)
+    writer.insert_one({"i": 0})
+    clock.t = 1.0
+    writer.insert_one({"i": 1})
+    assert db.trips["bulk_write"] == 0
+    clock.t = 2.5
+    writer.insert_one({"i": 2})
+    assert db.trips["bulk_write"] == 1 and len(writer) == 0
+
+
+def test_unordered_batch_survives_a_failing_op(db):
+    coll = db["link_pool"]
+    coll.create_index("url", unique=True)
+    writer = BulkWriter(coll, max_ops=10)
+    writer.insert_one({"url": "a"})
+    writer.insert_one({"url": "a"})
+    writer.insert_one({"url": "b"})
+    writer.update_one({"url": "c"}, {"$set": {"seen": True}}, upsert=True)
+    writer.update_many({"url": {"$in": ["a", "b"]}}, {"$set": {"seen": True}})
+    writer.flush()
+
+    assert writer.stats.errors == 1
+    assert writer.stats.inserted == 2 and writer.stats.upserted == 1
+    assert coll.count_documents({"seen": True}) == 3
+    assert writer.failed == [1]
+    writer.flush()
+    assert writer.failed == []
+
+
+def test_ordered_batch_reports_the_unattempted_tail_as_failed(db):
+    coll = db["link_pool"]
+    coll.create_index("url", unique=True)
+    writer = BulkWriter(coll, max_ops=10, ordered=True)
+    for url in ("a", "b", "a", "c"):
+        writer.insert_one({"url": url})
+    writer.flush()
+
+    assert writer.failed == [2, 3]
+    assert coll.count_documents({}) == 2
+
+
+def test_clean_and_mark_processed_cost_a_handful_of_round_trips(db, monkeypatch):
+    import numpy as np
+    import services.articles as articles_mod
+    from app.use_cases.analyze_daily_trends import AnalyzeDailyTrendsUseCase
+    from lib.repositories.articles_repository import ArticlesRepository
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+
+    monkeypatch.setattr(articles_mod.spacy, "load", lambda name, **kwargs: articles_mod.spacy.blank("en"))
+    monkeypatch.setattr(articles_mod, "embed_texts_cached", lambda texts: np.ones((len(texts), 4), dtype="float32"))
+
+    n = 1000
+    raw = ArticlesRepository()
+    raw.create_articles_many([
+        {"sample": "s", "title": f"t{i}", "url": f"https://x.example/{i}", "text": f"body {i}", "summary": f"sum {i}"}
+        for i in range(n)
+    ])
+    clean = CleanArticlesRepository()
+
+    class Meta:
+        def update_metadata(self, selector, update):
+            return 1
+
+    db.trips.clear()
+    service = articles_mod.ArticlesService(None, raw, clean, Meta(), block_size=250)
+    service.clean_articles("s")
+
+    assert clean.count_articles({"sample": "s"}) == n
+    assert raw.count_articles({"isCleaned": True}) == n
+    assert db.trips == Counter({"insert_many": 4, "update_many": 4})
+
+    class Trends:
+        def insert_daily_trends(self, doc):
+            return "1"
+
+    class Service:
+        def compute(self, articles, limit=15):
+            for _ in articles:  # like DailyTrendsService, read the whole stream
+                pass
+            return {"ranked_words": [], "metrics": {"total_words": 0, "distinct_words": 0}}
+
+    db.trips.clear()
+    AnalyzeDailyTrendsUseCase(clean, Meta(), Trends(), service=Service()).run("s", mark_processed=True)
+    assert clean.count_articles({"isProcessed": True}) == n
+    assert db.trips == Counter({"update_many": 1})
+
+
+def test_gather_buffers_inserts_and_marks_links_after_the_write(db):
+    from app.use_cases.gather_and_classify import GatherAndClassifyUseCase
+    from lib.repositories.articles_repository import ArticlesRepository
+    from lib.repositories.summaries_repository import SummariesRepository
+    from services.classifier_service import ClassifierService
+    from tests.test_gather_and_classify import (
+        TOPICS, FakeBatches, FakeGate, FakeMetadataRepo, FakePipelines, FakeSamples, FakeScraper,
+    )
+
+    items = [{"url": f"https://a.example/{i}", "title": f"a {i}", "text": f"a body {i}"} for i in range(30)]
+    articles, summaries = ArticlesRepository(), SummariesRepository()
+    gate = FakeGate()
+    marked_with_docs = []
+    mark = gate.mark_processed
+
+    def mark_after_write(url, sample_id):
+        marked_with_docs.append(articles.count_articles({"url": url}))
+        mark(url, sample_id)
+
+    gate.mark_processed = mark_after_write
+    db.trips.clear()
+    GatherAndClassifyUseCase(
+        articles_repo=articles,
+        metadata_repo=FakeMetadataRepo(),
+        summaries_repo=summaries,
+        batches=FakeBatches(),
+        samples=FakeSamples(),
+        classifier=ClassifierService(FakePipelines([]), candidate_topics=TOPICS),
+        scrapers=[FakeScraper("a", items, [])],
+        link_pool_gate=gate,
+        micro_batch=4,
+        write_batch=12,
+    ).run()
+
+    assert articles.count_articles({}) == summaries.count_articles({}) == 30
+    # 30 articles in flushes of >= 12: 12, 12 (after 3 micro-batches each), then the tail of 6
+    assert db.trips == Counter({"bulk_write": 6})
+    assert marked_with_docs == [1] * 30
+
+
+def test_gather_counts_and_marks_only_articles_that_were_written(db):
+    from app.use_cases.gather_and_classify import GatherAndClassifyUseCase
+    from lib.repositories.articles_repository import ArticlesRepository
+    from lib.repositories.summaries_repository import SummariesRepository
+    from services.classifier_service import ClassifierService
+    from tests.test_gather_and_classify import (
+        TOPICS, FakeBatches, FakeGate, FakeMetadataRepo, FakePipelines, FakeSamples, FakeScraper,
+    )
+
+    items = [{"url": f"https://a.example/{i}", "title": f"a {i}", "text": f"a body {i}"} for i in range(6)]
+    articles, summaries = ArticlesRepository(), SummariesRepository()
+    articles.collection.create_index("url", unique=True)
+    articles.create_articles({"url": items[2]["url"]})  # saved by an earlier, unmarked run
+    gate, meta = FakeGate(), FakeMetadataRepo()
+    sample = GatherAndClassifyUseCase(
+        articles_repo=articles,
+        metadata_repo=meta,
+        summaries_repo=summaries,
+        batches=FakeBatches(),
+        samples=FakeSamples(),
+        classifier=ClassifierService(FakePipelines([]), candidate_topics=TOPICS),
+        scrapers=[FakeScraper("a", items, [])],
+        link_pool_gate=gate,
+        micro_batch=4,
+    ).run()
+
+    assert gate.processed == {it["url"] for i, it in enumerate(items) if i != 2}
+    processed = meta.docs[sample]["articles_processed"]
+    assert processed == {"successfully": 5, "unsuccessfully": 1, "skipped": 0}
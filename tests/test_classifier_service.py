@@ -1,8 +1,23 @@
 # tests/test_classifier_service.py
 from datetime import datetime, timezone
+
+import pytest
+
+import pipeline_sample.summarizer as summarizer
 from services.classifier_service import ClassifierService, ArticleIn
 
 
+@pytest.fixture(autouse=True)
+def _isolated_summary_cache(monkeypatch, tmp_path):
+    # long texts reach the summarizer: keep its persistent cache out of the repo
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("SUMMARY_CACHE_PATH", raising=False)
+    monkeypatch.setattr(summarizer, "_SUMMARY_CACHE", None)
+    yield
+    if summarizer._SUMMARY_CACHE is not None:
+        summarizer._SUMMARY_CACHE.close()
+
+
 class FakePipelines:
     def __init__(self):
         self.topic_calls = []
@@ -74,3 +89,82 @@ def test_classify_long_text_does_not_crash():
     assert out.sample == "1-2025-08-10"
     assert "label" in out.sentiment
     assert out.topic in {"technology and innovation", "unknown"}
+
+
+class FakeBatchedPipelines(FakePipelines):
+    def __init__(self):
+        super().__init__()
+        self.batch_calls = []
+
+    def topic(self, text: str):
+        self.topic_calls.append(text)
+        label = "business and finance" if "market" in text else "technology and innovation"
+        return {"labels": [label], "scores": [0.9]}
+
+    def sentiment(self, text: str):
+        self.sent_calls.append(text)
+        return {"label": "NEGATIVE" if "crash" in text else "POSITIVE", "score": 0.9}
+
+    def topic_many(self, texts, batch_size=8):
+        self.batch_calls.append(("topic", len(texts), batch_size))
+        return [self.topic(t) for t in texts]
+
+    def sentiment_many(self, texts, batch_size=8):
+        self.batch_calls.append(("sentiment", len(texts), batch_size))
+        return [self.sentiment(t) for t in texts]
+
+
+def test_classify_many_matches_per_article_path():
+    texts = ["Chip makers rally.", "The market crash deepens.", "New phone released.", "Stock market calm."]
+    arts = [
+        ArticleIn(title=f"t{i}", url=f"https://example.com/{i}", text=t, source="src",
+                  scraped_at=datetime(2025, 8, 10, tzinfo=timezone.utc))
+        for i, t in enumerate(texts)
+    ]
+    pipes = FakeBatchedPipelines()
+    svc = ClassifierService(pipelines=pipes, candidate_topics=["technology and innovation", "business and finance"],
+                            batch_size=2)
+
+    single = [svc.classify(a, batch=2, sample="2-2025-08-10") for a in arts]
+    batched = svc.classify_many(arts, batch=2, sample="2-2025-08-10")
+
+    assert batched == single
+    assert ("topic", 4, 2) in pipes.batch_calls
+    assert ("sentiment", 4, 2) in pipes.batch_calls
+
+
+def test_classify_many_falls_back_without_batched_pipelines():
+    pipes = FakePipelines()
+    svc = ClassifierService(pipelines=pipes, candidate_topics=["technology and innovation"])
+    arts = [ArticleIn(title=None, url=f"https://example.com/{i}", text="short", source=None, scraped_at=None)
+            for i in range(3)]
+
+    out = svc.classify_many(arts, batch=1, sample="1-2025-08-10")
+
+    assert [o.url for o in out] == [a.url for a in arts]
+    assert len(pipes.topic_calls) == 3
+    assert svc.classify_many([], batch=1, sample="1-2025-08-10") == []
+
+
+def test_classify_many_summarizes_long_texts_in_one_batch(monkeypatch):
+    import services.classifier_service as cs
+
+    calls = []
+
+    def fake_summarize_many(texts, batch_size=8):
+        calls.append((list(texts), batch_size))
+        return [f"summary of {t[:4]}" for t in texts]
+
+    monkeypatch.setattr(cs, "summarize_many", fake_summarize_many)
+    monkeypatch.setattr(cs, "smart_summarize", lambda text: f"summary of {text[:4]}")
+    texts = ["short one", "aaaa " * 100, "short two", "bbbb " * 100]
+    arts = [ArticleIn(title=None, url=f"https://example.com/{i}", text=t, source=None, scraped_at=None)
+            for i, t in enumerate(texts)]
+    svc = ClassifierService(pipelines=FakeBatchedPipelines(), candidate_topics=["technology and innovation"],
+                            batch_size=2)
+
+    out = svc.classify_many(arts, batch=1, sample="1-2025-08-10")
+
+    assert [o.summary for o in out] == ["short one", "summary of aaaa", "short two", "summary of bbbb"]
+    assert calls == [([texts[1], texts[3]], 2)]
+    assert out == [svc.classify(a, batch=1, sample="1-2025-08-10") for a in arts]
@@ -0,0 +1,118 @@
+# tests/test_clusterer.py
+import numpy as np
+import pytest
+from sklearn.metrics import adjusted_rand_score
+
+from services.clusterer import CLUSTER_BACKENDS, cluster_embeddings
+
+
+def _blobs(seed=0):
+    """Six tight topics of 5..10 articles plus 8 unrelated singletons, shuffled."""
+    rng = np.random.default_rng(seed)
+    dim = 64
+    centres = rng.normal(size=(6, dim))
+    sizes = [5, 6, 7, 8, 9, 10]
+    rows, truth = [], []
+    for c, (centre, size) in enumerate(zip(centres, sizes)):
+        rows.append(centre + rng.normal(scale=0.05, size=(size, dim)))
+        truth += [c] * size
+    rows.append(rng.normal(size=(8, dim)))
+    truth += [-1] * 8
+    X = np.vstack(rows).astype("float32")
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+    perm = rng.permutation(len(X))
+    return X[perm], np.array(truth)[perm]
+
+
+@pytest.mark.parametrize("backend", CLUSTER_BACKENDS)
+def test_backends_recover_topics_and_keep_contract(backend):
+    X, truth = _blobs()
+    labels, centroids = cluster_embeddings(X, cosine_threshold=0.3, min_cluster_size=3, backend=backend,
+                                           block_size=16)
+
+    assert labels.shape == (len(X),)
+    assert adjusted_rand_score(truth, labels) == pytest.approx(1.0)
+    assert (labels[truth == -1] == -1).all()
+
+    kept = sorted(set(labels.tolist()) - {-1})
+    assert centroids.shape == (len(kept), X.shape[1]) and centroids.dtype == X.dtype
+    for row, lbl in zip(centroids, kept):
+        np.testing.assert_allclose(row, X[labels == lbl].mean(axis=0), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("backend", CLUSTER_BACKENDS)
+def test_min_cluster_size_rule(backend):
+    X, truth = _blobs()
+    labels, centroids = cluster_embeddings(X, min_cluster_size=8, backend=backend, block_size=16)
+    sizes = {int(lbl): int((labels == lbl).sum()) for lbl in set(labels.tolist()) - {-1}}
+    assert sorted(sizes.values()) == [8, 9, 10]
+    assert len(centroids) == 3
+
+
+def test_knn_graph_blocks_follow_the_memory_budget(monkeypatch):
+    import services.clusterer as clusterer
+
+    X, _ = _blobs()
+    expected, _ = cluster_embeddings(X, backend="knn_graph")
+    # budget for ~3 rows of similarities + indexes per block
+    monkeypatch.setattr(clusterer, "_KNN_BLOCK_BYTES", 3 * len(X) * 12)
+    blocks = []
+    real_negative = np.negative
+    monkeypatch.setattr(clusterer.np, "negative", lambda S, out=None: blocks.append(len(S)) or real_negative(S, out=out))
+
+    labels, _ = cluster_embeddings(X, backend="knn_graph")
+
+    np.testing.assert_array_equal(labels, expected)
+    assert max(blocks) == 3 and sum(blocks) == len(X)
+
+
+def test_empty_and_unknown_backend():
+    labels, centroids = cluster_embeddings(np.zeros((0, 8), dtype="float32"), backend="threshold")
+    assert labels.size == 0 and centroids.shape == (0, 8)
+    with pytest.raises(ValueError):
+        cluster_embeddings(np.ones((3, 8), dtype="float32"), backend="dbscan")
+
+
+def test_summary_matches_per_label_scans():
+    from services.clusterer import cluster_summary
+
+    X, _ = _blobs(seed=3)
+    summary = cluster_summary(X, min_cluster_size=6, backend="threshold")
+
+    kept = sorted(set(summary.labels.tolist()) - {-1})
+    assert summary.ids.tolist() == kept
+    for pos, lbl in enumerate(kept):
+        idx = np.flatnonzero(summary.labels == lbl)
+        assert summary.sizes[pos] == len(idx)
+        assert summary.members[pos].tolist() == idx.tolist()
+        np.testing.assert_allclose(summary.centroids[pos], X[idx].mean(axis=0), rtol=1e-5, atol=1e-6)
+
+    # first-appearance order == order in which a row scan meets each cluster
+    seen = list(dict.fromkeys(int(l) for l in summary.labels if l != -1))
+    assert [int(summary.ids[p]) for p in summary.first_appearance_order()] == seen
+
+
+def test_use_case_groups_like_a_row_scan():
+    from app.use_cases.build_daily_clusters import BuildDailyClustersUseCase
+
+    X, _ = _blobs(seed=5)
+
+    class Repo:
+        def get_articles_broad(self, filter_param, projection_param=None, batch_size=None):
+            return [{"_id": i, "title": f"t{i}", "summary": f"story {i} about topic", "nouns": ["topic"],
+                     "topic": "world", "source_domain": "x.example", "embedding": v.tolist()}
+                    for i, v in enumerate(X)]
+
+    out = BuildDailyClustersUseCase(Repo()).run("1-2025-08-16")
+    clusters = out["clusters"]
+
+    # reference: the previous dict-based regrouping over agglomerative labels
+    labels, _ = cluster_embeddings(X)
+    by_c = {}
+    for idx, c in enumerate(labels):
+        by_c.setdefault(int(c), []).append(idx)
+    expected = [(f"1-2025-08-16-{order}", len(idxs), [f"t{i}" for i in idxs][:6])
+                for order, idxs in enumerate(v for k, v in by_c.items() if k != -1)]
+    expected.sort(key=lambda e: e[1], reverse=True)
+
+    assert [(c["cluster_id"], c["size"], c["representative_titles"]) for c in clusters] == expected
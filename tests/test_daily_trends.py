@@ -0,0 +1,150 @@
+# tests/test_daily_trends.py
+from collections import Counter, defaultdict
+
+import mongomock
+import numpy as np
+import pytest
+
+import lib.db.mongo_client as mongo_client
+from services.daily_trends import DailyTrendsAggregation, DailyTrendsService
+
+NOUNS = [f"noun{i}" for i in range(60)]
+TOPICS = ["World", "sports ", "tech", " world", "", "unknown", "Topic", None]
+SENTIMENTS = ["positive", "NEGATIVE", "neutral", "n/a", "", "label", None]
+
+
+def _reference(articles, limit):
+    """The occurrence-list implementation the service replaced."""
+    occ = []
+    for a in articles:
+        topic = (a.get("topic") or "").strip().lower()
+        sentiment = ((a.get("sentiment") or {}).get("label") or "").strip().lower()
+        tval = topic if topic not in {"", "topic", "unknown", "none"} else None
+        sval = sentiment if sentiment not in {"", "n/a", "label", "unknown", "none"} else None
+        occ.extend((n, tval, sval) for n in a.get("nouns") or [])
+    counter = Counter(w for w, _, _ in occ)
+    topics, sentiments = defaultdict(list), defaultdict(list)
+    for w, t, s in occ:
+        if t:
+            topics[w].append(t)
+        if s:
+            sentiments[w].append(s)
+
+    def dist(values):
+        c = Counter(values)
+        total = sum(c.values()) or 1
+        return [{"label": k, "percentage": round(v / total * 100)} for k, v in c.most_common()]
+
+    ranked = [{"word": w, "count": n, "rank": i + 1,
+               "context": {"topics": dist(topics.get(w, [])), "sentiments": dist(sentiments.get(w, []))}}
+              for i, (w, n) in enumerate(counter.most_common(limit))]
+    return {"metrics": {"total_words": sum(counter.values()), "distinct_words": len(counter)}, "ranked_words": ranked}
+
+
+def _corpus(n, seed=0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        doc = {"_id": i, "title": f"t{i}", "nouns": [NOUNS[j] for j in rng.integers(0, len(NOUNS), rng.integers(0, 8))],
+               "topic": TOPICS[rng.integers(len(TOPICS))]}
+        label = SENTIMENTS[rng.integers(len(SENTIMENTS))]
+        if label is not None:
+            doc["sentiment"] = {"label": label, "score": 0.9}
+        out.append(doc)
+    return out
+
+
+@pytest.mark.parametrize("limit", [1, 15, 100, None])
+def test_ranked_words_match_the_occurrence_implementation(limit):
+    articles = _corpus(800)
+    assert DailyTrendsService().compute(iter(articles), limit=limit) == _reference(articles, limit)
+
+
+def test_occurrence_helpers_match_compute():
+    articles = _corpus(300, seed=3)
+    svc = DailyTrendsService()
+    occ = svc.extract_occurrences(articles)
+    ranked = svc.build_ranked_words(svc.top_n(svc.build_counter(occ), 15), occ)
+    assert ranked == svc.compute(articles, limit=15)["ranked_words"]
+    assert svc.distribution(["a", "b", "b"]) == svc.distribution_from_counts([("a", 1), ("b", 2)])
+
+
+def test_ties_keep_first_seen_order():
+    articles = [{"nouns": ["b", "a"], "topic": "x", "sentiment": {"label": "pos"}},
+                {"nouns": ["a", "b", "c"], "topic": "y", "sentiment": {"label": "neg"}},
+                {"nouns": [], "topic": "z"}]
+    got = DailyTrendsService().compute(articles, limit=3)
+    assert got == _reference(articles, 3)
+    assert [w["word"] for w in got["ranked_words"]] == ["b", "a", "c"]
+    assert [t["label"] for t in got["ranked_words"][0]["context"]["topics"]] == ["x", "y"]
+
+
+def test_use_case_streams_a_slim_projection(monkeypatch):
+    from app.use_cases.analyze_daily_trends import AnalyzeDailyTrendsUseCase
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+
+    monkeypatch.setattr(mongo_client, "_db", mongomock.MongoClient().db)
+    clean = CleanArticlesRepository()
+    articles = _corpus(200, seed=1)
+    clean.create_articles_many([{**a, "sample": "s", "text": "long body " * 100, "embedding": [0.1] * 16}
+                                for a in articles])
+
+    seen = []
+
+    class Spy(DailyTrendsService):
+        def compute(self, docs, limit=15):
+            return super().compute((seen.append(d) or d for d in docs), limit=limit)
+
+    class Meta:
+        def update_metadata(self, selector, update):
+            return 1
+
+    out = AnalyzeDailyTrendsUseCase(clean, Meta(), None, service=Spy()).run("s", limit=10, mark_processed=True)
+    assert out["ranked_words"] == _reference(articles, 10)["ranked_words"]
+    assert all("text" not in d and "embedding" not in d and "title" not in d for d in seen)
+    assert clean.count_articles({"isProcessed": True}) == 200
+
+
+class Meta:
+    def update_metadata(self, selector, update):
+        return 1
+
+
+@pytest.fixture
+def clean(monkeypatch):
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+
+    monkeypatch.setattr(mongo_client, "_db", mongomock.MongoClient().db)
+    return CleanArticlesRepository()
+
+
+@pytest.mark.parametrize("limit", [1, 15, None])
+def test_mongo_backend_matches_the_python_backend(clean, limit):
+    from app.use_cases.analyze_daily_trends import AnalyzeDailyTrendsUseCase
+
+    # ObjectId _ids, as real inserts get
+    articles = [{k: v for k, v in a.items() if k != "_id"} for a in _corpus(600, seed=2)]
+    clean.create_articles_many([{**a, "sample": "s"} for a in articles])
+    clean.create_articles_many([{**a, "sample": "other"} for a in _corpus(50, seed=3)])
+
+    python = AnalyzeDailyTrendsUseCase(clean, Meta(), None).run("s", limit=limit)
+    mongo = AnalyzeDailyTrendsUseCase(clean, Meta(), None, backend="mongo").run("s", limit=limit)
+    assert mongo == python
+    assert python["ranked_words"] == _reference(articles, limit)["ranked_words"]
+
+
+def test_aggregation_sends_only_the_top_words(clean):
+    from app.use_cases.analyze_daily_trends import AnalyzeDailyTrendsUseCase
+
+    clean.create_articles_many([{**a, "sample": "s"} for a in _corpus(300, seed=4)])
+    docs = list(clean.aggregate_articles(DailyTrendsAggregation.pipeline({"sample": "s"}, limit=5)))
+    assert len(docs) == 1 and len(docs[0]["top"]) == 5
+    assert docs[0]["metrics"][0]["distinct_words"] == len(NOUNS)
+
+    out = AnalyzeDailyTrendsUseCase(clean, Meta(), None, backend="mongo").run("s", mark_processed=True)
+    assert len(out["ranked_words"]) == 15
+    assert clean.count_articles({"isProcessed": True}) == 300
+    empty = AnalyzeDailyTrendsUseCase(clean, Meta(), None, backend="mongo").run("missing")
+    assert empty["ranked_words"] == [] and empty["metrics"] == {"total_words": 0, "distinct_words": 0}
+    with pytest.raises(ValueError):
+        AnalyzeDailyTrendsUseCase(clean, Meta(), None, backend="spark")
@@ -0,0 +1,115 @@
+# tests/test_embedding_store.py
+import json
+
+import mongomock
+import numpy as np
+import pytest
+
+import lib.db.mongo_client as mongo_client
+from lib.cache.embedding_store import SampleEmbeddingStore
+
+SAMPLE = "1-2025-08-16"
+WORDS = ["harbor", "senate", "turbine", "glacier", "vaccine", "orchestra", "tariff"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SampleEmbeddingStore(tmp_path / "vectors")
+
+
+def _unit(rng, n, dim=32):
+    X = rng.normal(size=(n, dim))
+    return (X / np.linalg.norm(X, axis=1, keepdims=True)).astype("float32")
+
+
+def test_write_load_and_lookup_by_ids(store):
+    X = _unit(np.random.default_rng(0), 6)
+    store.write(SAMPLE, [f"id{i}" for i in range(4)], X[:4] * 3)
+    store.append(SAMPLE, ["id4", "id5"], X[4:])
+
+    ids, M = store.load(SAMPLE)
+    assert ids == [f"id{i}" for i in range(6)] and isinstance(M, np.memmap)
+    assert np.allclose(M, X, atol=1e-6)  # normalized on write
+
+    same = store.vectors_for(SAMPLE, ids)
+    assert isinstance(same, np.memmap)  # file order: the map itself, no copy
+    assert np.allclose(store.vectors_for(SAMPLE, ["id5", "id1"]), X[[5, 1]], atol=1e-6)
+    assert store.vectors_for(SAMPLE, ["id1", "unknown"]) is None
+    assert store.vectors_for("other-sample", ids) is None
+    assert store.samples() == [SAMPLE]
+
+
+def test_half_written_ids_count_as_missing(store):
+    store.write(SAMPLE, ["a", "b"], np.ones((2, 4)))
+    _, ids_path = store._paths(SAMPLE)
+    ids_path.write_text(json.dumps(["a"]))
+    assert store.load(SAMPLE) is None
+
+
+def _clean_repo(monkeypatch):
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+
+    monkeypatch.setattr(mongo_client, "_db", mongomock.MongoClient().db)
+    return CleanArticlesRepository()
+
+
+def _insert(clean, X, prefix, with_embedding=True):
+    docs = [{"sample": SAMPLE, "title": f"{prefix} {i}", "summary": f"{prefix} story {WORDS[i % len(WORDS)]}",
+             "nouns": [prefix], "topic": "world", "source_domain": "x.example"} for i in range(len(X))]
+    if with_embedding:
+        for d, v in zip(docs, X):
+            d["embedding"] = v
+    return clean.create_articles_many(docs)
+
+
+def test_build_reads_vectors_from_the_store_and_falls_back_when_stale(store, monkeypatch):
+    import app.use_cases.build_daily_clusters as build_mod
+
+    clean = _clean_repo(monkeypatch)
+    rng = np.random.default_rng(1)
+    centres = _unit(rng, 2)
+    A = _unit(rng, 4) * 0.02 + centres[0]
+    B = _unit(rng, 3) * 0.02 + centres[1]
+    # Mongo holds no embeddings at all: only the store can supply them
+    ids = _insert(clean, np.vstack([A, B]), "alpha", with_embedding=False)
+    store.write(SAMPLE, ids, np.vstack([A, B]))
+
+    def no_model(texts):
+        raise AssertionError("should not embed")
+    monkeypatch.setattr(build_mod, "embed_texts_cached", no_model)
+
+    usecase = build_mod.BuildDailyClustersUseCase(clean, embedding_store=store)
+    assert [c["size"] for c in usecase.run(SAMPLE)["clusters"]] == [4, 3]
+
+    # cleaned later but the store was not updated: stored embeddings are fetched from Mongo instead
+    store.write(SAMPLE, ids[:5], np.vstack([A, B])[:5])
+    clean.update_many_articles({}, {"$set": {"embedding": centres[0]}})
+    out = usecase.run(SAMPLE)
+    assert [c["size"] for c in out["clusters"]] == [7]
+
+
+def test_clean_stage_appends_the_sample_matrix(store, monkeypatch):
+    import services.articles as articles_mod
+    from lib.repositories.articles_repository import ArticlesRepository
+
+    clean = _clean_repo(monkeypatch)
+    monkeypatch.setattr(articles_mod.spacy, "load", lambda name, **kwargs: articles_mod.spacy.blank("en"))
+    X = _unit(np.random.default_rng(2), 5, dim=16)
+    monkeypatch.setattr(articles_mod, "embed_texts_cached", lambda texts: X[[int(t.split()[1]) for t in texts]])
+
+    raw = ArticlesRepository()
+    raw.create_articles_many([
+        {"sample": SAMPLE, "title": f"t{i}", "url": f"https://x.example/{i}", "text": f"body {i}", "summary": f"sum {i}"}
+        for i in range(5)
+    ])
+
+    class Meta:
+        def update_metadata(self, selector, update):
+            return 1
+
+    articles_mod.ArticlesService(None, raw, clean, Meta(), block_size=2, embedding_store=store).clean_articles(SAMPLE)
+
+    ids, M = store.load(SAMPLE)
+    by_id = {str(d["_id"]): d["embedding"] for d in clean.get_articles({"sample": SAMPLE})}
+    assert sorted(ids) == sorted(by_id)
+    assert np.allclose(M, np.stack([by_id[i] for i in ids]), atol=1e-6)
@@ -0,0 +1,104 @@
+# tests/test_embeddings_cache.py
+import numpy as np
+import pytest
+
+import services.embeddings as emb
+
+
+def _fake_vectors(texts):
+    # deterministic 4-d unit vectors derived from the text
+    rows = []
+    for t in texts:
+        v = np.array([len(t), sum(map(ord, t)) % 97, t.count(" "), 1.0], dtype="float32")
+        rows.append(v / np.linalg.norm(v))
+    return np.stack(rows).astype("float32")
+
+
+@pytest.fixture
+def fake_embedder(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_embed_texts(texts, batch_size=64):
+        calls.append(list(texts))
+        return _fake_vectors(texts)
+
+    monkeypatch.setattr(emb, "embed_texts", fake_embed_texts)
+    monkeypatch.setattr(emb, "_embedding_cache", None)
+    monkeypatch.setenv("EMBED_CACHE", "on")
+    monkeypatch.setenv("EMBED_CACHE_PATH", str(tmp_path / "embeddings.sqlite"))
+    yield calls
+    if emb._embedding_cache is not None:
+        emb._embedding_cache.close()
+
+
+def test_cached_embeddings_match_and_skip_the_model(fake_embedder):
+    texts = ["alpha story", "beta story", "alpha story", "gamma"]
+    first = emb.embed_texts_cached(texts)
+
+    assert first.dtype == np.float32 and first.shape == (4, 4)
+    np.testing.assert_array_equal(first, _fake_vectors(texts))
+    # one batched call, duplicates encoded once
+    assert fake_embedder == [["alpha story", "beta story", "gamma"]]
+
+    again = emb.embed_texts_cached(["gamma", "alpha story", "delta"])
+    np.testing.assert_array_equal(again, _fake_vectors(["gamma", "alpha story", "delta"]))
+    assert fake_embedder[1:] == [["delta"]]
+    assert emb.embedding_cache_stats()["size"] == 4
+
+
+def test_clean_articles_embeds_in_blocks(fake_embedder, monkeypatch):
+    import services.articles as articles_mod
+
+    monkeypatch.setattr(articles_mod.spacy, "load", lambda name, **kwargs: articles_mod.spacy.blank("en"))
+
+    class Repo:
+        def __init__(self, docs=()):
+            self.docs = list(docs)
+            self.created, self.updates = [], []
+
+        def get_articles(self, params, projection=None):
+            return iter(self.docs)
+
+        def create_articles(self, data):
+            self.created.append(data)
+            return str(len(self.created))
+
+        def update_articles(self, selector, update):
+            self.updates.append(selector)
+            return 1
+
+        def update_metadata(self, selector, update):
+            return 1
+
+    raw = [{"_id": i, "title": f"t{i}", "url": f"https://x.example/{i}", "text": f"body {i}", "summary": f"summary {i}"}
+           for i in range(5)]
+    raw.insert(2, {"_id": "empty", "text": "  "})
+    # no stored summary: summarized once per block through summarize_many
+    del raw[-1]["summary"], raw[-2]["summary"]
+    raw[-2]["text"], raw[-1]["text"] = "long body 3 " * 40, "long body 4 " * 40
+    summarize_calls = []
+
+    def fake_summarize_many(texts, **kwargs):
+        summarize_calls.append(list(texts))
+        return [f"summary {t.split()[2]}" for t in texts]
+
+    monkeypatch.setattr(articles_mod, "summarize_many", fake_summarize_many)
+    articles, clean, meta = Repo(raw), Repo(), Repo()
+    service = articles_mod.ArticlesService(Repo(), articles, clean, meta, block_size=2)
+
+    assert service.clean_articles("1-2025-08-16") == "1-2025-08-16"
+
+    assert [len(c) for c in fake_embedder] == [2, 2, 1]
+    assert [len(c) for c in summarize_calls] == [1, 1]
+    assert [d["url"] for d in clean.created] == [f"https://x.example/{i}" for i in range(5)]
+    expected = _fake_vectors([f"summary {i}" for i in range(5)])
+    for doc, vec in zip(clean.created, expected):
+        assert doc["embedding"] == pytest.approx(vec.tolist())
+        assert doc["source_domain"] == "x.example" and doc["isEmbedded"] is True
+    assert [u["_id"] for u in articles.updates] == list(range(5))
+
+    # recleaning the sample reuses cached vectors
+    clean.created.clear()
+    service.clean_articles("1-2025-08-16")
+    assert len(fake_embedder) == 3
+    assert len(clean.created) == 5
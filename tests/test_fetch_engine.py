@@ -0,0 +1,157 @@
+# tests/test_fetch_engine.py
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pipeline_sample.fetch_engine import FetchEngine, set_fetch_engine
+
+DELAY = 0.2
+
+
+def _extract(html: bytes):
+    m = re.search(r"<p>(.*?)</p>", html.decode("utf-8"))
+    return m.group(1) if m else None
+
+
+@pytest.fixture
+def stand_in_server():
+    """Local HTTP stand-in: every article takes DELAY seconds; /flaky/* fails once with 503."""
+    state = {"active": 0, "peak": 0, "hits": {}}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+                state["hits"][self.path] = state["hits"].get(self.path, 0) + 1
+                hits = state["hits"][self.path]
+            try:
+                time.sleep(DELAY)
+                if self.path.startswith("/flaky/") and hits == 1:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if self.path.startswith("/missing/"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                accent = " – café naïve" if self.path.startswith("/utf8/") else ""
+                # UTF-8 without a declared charset (requests would guess ISO-8859-1 for .text)
+                body = f"<html><body><p>Body of {self.path}{accent}</p></body></html>".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield base, state
+    server.shutdown()
+    server.server_close()
+
+
+def _gather(engine: FetchEngine, base: str, n: int) -> tuple[float, list]:
+    jobs = [(f"{base}/article/{i}", i) for i in range(n)]
+    start = time.perf_counter()
+    out = list(engine.stream(jobs))
+    return time.perf_counter() - start, out
+
+
+def test_wall_time_scales_with_concurrency_not_article_count(stand_in_server):
+    base, _ = stand_in_server
+    n = 16
+
+    serial = FetchEngine(max_workers=1, per_host=1, extract=_extract)
+    parallel = FetchEngine(max_workers=8, per_host=8, extract=_extract)
+    try:
+        t_serial, out_serial = _gather(serial, base, n)
+        t_parallel, out_parallel = _gather(parallel, base, n)
+    finally:
+        serial.shutdown()
+        parallel.shutdown()
+
+    assert sorted(i for i, _ in out_parallel) == list(range(n))
+    assert all(text == f"Body of /article/{i}" for i, text in out_parallel)
+    assert len(out_serial) == n
+
+    # serial ~ n * DELAY; parallel ~ ceil(n / 8) * DELAY
+    assert t_serial >= n * DELAY * 0.9
+    assert t_parallel < (n / 8) * DELAY * 4
+    assert t_parallel < t_serial / 3
+
+
+def test_per_host_limit_bounds_in_flight_requests(stand_in_server):
+    base, state = stand_in_server
+    engine = FetchEngine(max_workers=8, per_host=2, extract=_extract)
+    try:
+        elapsed, out = _gather(engine, base, 8)
+    finally:
+        engine.shutdown()
+
+    assert len(out) == 8
+    assert state["peak"] <= 2
+    assert elapsed >= 4 * DELAY * 0.9
+
+
+def test_retries_transient_errors_but_not_client_errors(stand_in_server):
+    base, state = stand_in_server
+    engine = FetchEngine(max_workers=2, retries=2, backoff=0.01, extract=_extract)
+    try:
+        assert engine.fetch_and_extract(f"{base}/flaky/1") == "Body of /flaky/1"
+        assert engine.fetch_and_extract(f"{base}/missing/1") is None
+    finally:
+        engine.shutdown()
+
+    assert state["hits"]["/flaky/1"] == 2
+    assert state["hits"]["/missing/1"] == 1
+
+
+def test_scrapers_yield_function_scraper_shape(stand_in_server, monkeypatch):
+    import feedparser
+    from adapters.scrapers import FunctionScraper
+    from pipeline_sample.custom_scrapers import scrape_aljazeera
+
+    base, _ = stand_in_server
+    entries = [{"link": f"{base}/article/{i}", "title": f"Title {i}"} for i in range(6)]
+    entries.append({"link": f"{base}/missing/x", "title": "Gone"})
+    monkeypatch.setattr(feedparser, "parse", lambda url: type("Feed", (), {"entries": entries})())
+
+    engine = FetchEngine(max_workers=6, per_host=6, retries=0, extract=_extract)
+    set_fetch_engine(engine)
+    try:
+        start = time.perf_counter()
+        items = list(FunctionScraper(scrape_aljazeera).stream())
+        elapsed = time.perf_counter() - start
+    finally:
+        set_fetch_engine(None)
+        engine.shutdown()
+
+    assert len(items) == 6
+    assert elapsed < 6 * DELAY
+    for it in items:
+        assert set(it) == {"title", "url", "text", "source", "scraped_at"}
+        assert it["source"] == "aljazeera"
+        assert it["text"] == f"Body of {it['url'][len(base):]}"
+        assert it["title"] == "Title " + it["url"].rsplit("/", 1)[1]
+
+
+def test_undeclared_charset_reaches_the_extractor_as_bytes(stand_in_server):
+    base, _ = stand_in_server
+    engine = FetchEngine(max_workers=1, retries=0, extract=_extract)
+    try:
+        assert engine.fetch_and_extract(f"{base}/utf8/1") == "Body of /utf8/1 – café naïve"
+    finally:
+        engine.shutdown()
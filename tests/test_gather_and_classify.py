@@ -0,0 +1,210 @@
+# tests/test_gather_and_classify.py
+from datetime import datetime, timezone
+
+from app.use_cases.gather_and_classify import GatherAndClassifyUseCase
+from services.classifier_service import ClassifierService
+
+TOPICS = ["technology and innovation", "business and finance", "sports and athletics"]
+
+
+class FakePipelines:
+    def __init__(self, events):
+        self.events = events
+
+    def topic(self, text: str):
+        self.events.append(("classify", text))
+        # deterministic label from the text so distributions are meaningful
+        label = TOPICS[sum(map(ord, text)) % len(TOPICS)]
+        return {"labels": [label] + [t for t in TOPICS if t != label], "scores": [0.9, 0.05, 0.05]}
+
+    def sentiment(self, text: str):
+        return {"label": "POSITIVE" if len(text) % 2 else "NEGATIVE", "score": 0.9}
+
+
+class FakeScraper:
+    def __init__(self, name, items, events):
+        self.name = name
+        self.items = items
+        self.events = events
+
+    def stream(self):
+        for it in self.items:
+            self.events.append(("scrape", it["url"]))
+            yield {**it, "source": self.name, "scraped_at": datetime.now(timezone.utc)}
+
+
+class FakeRepo:
+    def __init__(self):
+        self.docs = []
+
+    def create_articles(self, data):
+        self.docs.append(dict(data))
+        return str(len(self.docs))
+
+
+class FakeMetadataRepo:
+    def __init__(self):
+        self.docs = {}
+
+    def insert_metadata(self, doc):
+        self.docs[doc["_id"]] = dict(doc)
+        return doc["_id"]
+
+    def update_metadata(self, selector, update):
+        self.docs[selector["_id"]].update(update.get("$set", {}))
+        return 1
+
+
+class FakeGate:
+    def __init__(self, processed=()):
+        self.processed = set(processed)
+        self.tracked = []
+
+    def is_processed(self, url):
+        return url in self.processed
+
+    def ensure_tracked(self, url):
+        self.tracked.append(url)
+
+    def mark_processed(self, url, sample_id):
+        self.processed.add(url)
+
+
+class FakeBatches:
+    def next_batch_number(self):
+        return 1
+
+
+class FakeSamples:
+    def new_sample_id(self):
+        return "1-2025-08-10"
+
+    def find_last_sample(self):
+        return None
+
+    def link_previous(self, prev, current):
+        pass
+
+
+def _items(prefix, n):
+    return [{"url": f"https://{prefix}.example/{i}", "title": f"{prefix} {i}", "text": f"{prefix} body {i} " * (i + 1)}
+            for i in range(n)]
+
+
+def _run(streaming: bool, micro_batch: int = 1):
+    events = []
+    scrapers = [
+        FakeScraper("a", _items("a", 4) + [{"url": "https://a.example/0", "title": "dup", "text": "dup"}], events),
+        FakeScraper("b", _items("b", 3) + [{"url": "https://b.example/empty", "title": "empty", "text": "  "}], events),
+        FakeScraper("c", _items("c", 5), events),
+    ]
+    meta = FakeMetadataRepo()
+    articles, summaries = FakeRepo(), FakeRepo()
+    usecase = GatherAndClassifyUseCase(
+        articles_repo=articles,
+        metadata_repo=meta,
+        summaries_repo=summaries,
+        batches=FakeBatches(),
+        samples=FakeSamples(),
+        classifier=ClassifierService(FakePipelines(events), candidate_topics=TOPICS),
+        scrapers=scrapers,
+        link_pool_gate=FakeGate(processed={"https://c.example/4"}),
+        streaming=streaming,
+        micro_batch=micro_batch,
+    )
+    sample = usecase.run()
+    return events, meta.docs[sample], articles.docs, summaries.docs
+
+
+def test_streaming_classifies_before_scrapers_are_drained():
+    events, _, _, _ = _run(streaming=True)
+    first_classify = next(i for i, e in enumerate(events) if e[0] == "classify")
+    last_scrape = max(i for i, e in enumerate(events) if e[0] == "scrape")
+    assert first_classify < last_scrape
+    # first article is classified right after it is scraped
+    assert events[0] == ("scrape", "https://a.example/0")
+    assert events[1][0] == "classify"
+
+
+def test_legacy_mode_drains_scrapers_first():
+    events, _, _, _ = _run(streaming=False)
+    first_classify = next(i for i, e in enumerate(events) if e[0] == "classify")
+    last_scrape = max(i for i, e in enumerate(events) if e[0] == "scrape")
+    assert last_scrape < first_classify
+
+
+def test_streaming_keeps_metadata_identical():
+    _, meta_stream, arts_stream, sums_stream = _run(streaming=True)
+    _, meta_legacy, arts_legacy, sums_legacy = _run(streaming=False)
+
+    for key in ("articles_processed", "topic_distribution", "sentiment_distribution"):
+        assert meta_stream[key] == meta_legacy[key]
+    assert meta_stream["articles_processed"] == {"successfully": 11, "unsuccessfully": 0, "skipped": 2}
+    assert [a["url"] for a in arts_stream] == [a["url"] for a in arts_legacy]
+    assert len(sums_stream) == len(arts_stream) == 11
+
+
+def test_micro_batches_classify_before_scrapers_are_drained():
+    events, _, _, _ = _run(streaming=True, micro_batch=4)
+    first_classify = next(i for i, e in enumerate(events) if e[0] == "classify")
+    last_scrape = max(i for i, e in enumerate(events) if e[0] == "scrape")
+    assert first_classify < last_scrape
+    assert [e[0] for e in events[:5]] == ["scrape"] * 4 + ["classify"]
+
+
+def test_micro_batches_match_per_article_path():
+    _, meta_single, arts_single, sums_single = _run(streaming=True, micro_batch=1)
+    _, meta_batched, arts_batched, sums_batched = _run(streaming=True, micro_batch=4)
+
+    for key in ("articles_processed", "topic_distribution", "sentiment_distribution"):
+        assert meta_batched[key] == meta_single[key]
+    strip = lambda docs: [{k: v for k, v in d.items() if k != "scraped_at"} for d in docs]
+    assert strip(arts_batched) == strip(arts_single)
+    assert strip(sums_batched) == strip(sums_single)
+
+
+class BufferedRepo(FakeRepo):
+    """Repo whose bulk_writer() holds inserts until flush (like lib.db.bulk_writer.BulkWriter)."""
+
+    def bulk_writer(self, max_ops=1000, max_delay=None):
+        repo, buf = self, []
+
+        class Writer:
+            def insert_one(self, doc):
+                buf.append(dict(doc))
+
+            def flush(self):
+                n = len(buf)
+                repo.docs.extend(buf)
+                buf.clear()
+                return n
+
+        return Writer()
+
+
+class BrokenScraper(FakeScraper):
+    def stream(self):
+        yield from super().stream()
+        raise ConnectionError("upstream went away")
+
+
+def test_buffered_articles_are_written_when_a_scraper_raises():
+    import pytest
+
+    articles, summaries, gate = BufferedRepo(), BufferedRepo(), FakeGate()
+    usecase = GatherAndClassifyUseCase(
+        articles_repo=articles,
+        metadata_repo=FakeMetadataRepo(),
+        summaries_repo=summaries,
+        batches=FakeBatches(),
+        samples=FakeSamples(),
+        classifier=ClassifierService(FakePipelines([]), candidate_topics=TOPICS),
+        scrapers=[BrokenScraper("a", _items("a", 5), [])],
+        link_pool_gate=gate,
+        micro_batch=2,
+    )
+    with pytest.raises(ConnectionError):
+        usecase.run()
+    # the two classified micro-batches are saved and marked; the unclassified 5th is left for a rerun
+    assert len(articles.docs) == len(summaries.docs) == 4
+    assert gate.processed == {it["url"] for it in _items("a", 4)}
@@ -0,0 +1,100 @@
+# tests/test_incremental_clusters.py
+import mongomock
+import numpy as np
+import pytest
+
+import lib.db.mongo_client as mongo_client
+from app.use_cases.build_daily_clusters import BuildDailyClustersConfig, BuildDailyClustersUseCase
+
+SAMPLE = "1-2025-08-16"
+DIM = 32
+WORDS = ["harbor", "senate", "turbine", "glacier", "vaccine", "orchestra", "tariff"]
+
+
+@pytest.fixture
+def repos(monkeypatch):
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+    from lib.repositories.cluster_state_repository import ClusterStateRepository
+
+    monkeypatch.setattr(mongo_client, "_db", mongomock.MongoClient().db)
+    return CleanArticlesRepository(), ClusterStateRepository()
+
+
+def _topic_vectors(rng, centre, n):
+    X = centre + rng.normal(scale=0.03, size=(n, DIM))
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def _insert(clean, vectors, prefix, topic):
+    clean.create_articles_many([
+        {"sample": SAMPLE, "title": f"{prefix} {i}", "summary": f"{prefix} story {WORDS[i % len(WORDS)]}", "nouns": [prefix],
+         "topic": topic, "source_domain": "x.example", "embedding": v.tolist()}
+        for i, v in enumerate(vectors)
+    ])
+
+
+def _membership(out):
+    return {c["cluster_id"]: sorted(c["representative_titles"]) for c in out["clusters"]}
+
+
+def test_incremental_assigns_new_articles_and_spawns_clusters(repos):
+    clean, state_repo = repos
+    rng = np.random.default_rng(1)
+    centres = rng.normal(size=(4, DIM))
+    _insert(clean, _topic_vectors(rng, centres[0], 5), "alpha", "world")
+    _insert(clean, _topic_vectors(rng, centres[1], 4), "beta", "business")
+    _insert(clean, rng.normal(size=(1, DIM)), "lonely", "world")
+
+    cfg = BuildDailyClustersConfig(incremental=True, full_recluster_every=2, full_recluster_ratio=1.0)
+    usecase = BuildDailyClustersUseCase(clean, cfg, state_repo=state_repo)
+
+    first = usecase.run(SAMPLE)
+    assert first["meta"] == {"count": 10, "mode": "full"}
+    assert [c["size"] for c in first["clusters"]] == [5, 4]
+    assert state_repo.get_state(SAMPLE)["noise"] and state_repo.get_state(SAMPLE)["runs_since_full"] == 0
+
+    # a later gather: two more alpha articles and a brand new gamma story
+    _insert(clean, _topic_vectors(rng, centres[0], 2), "alpha-late", "world")
+    _insert(clean, _topic_vectors(rng, centres[2], 3), "gamma", "sports")
+
+    second = usecase.run(SAMPLE)
+    assert second["meta"] == {"count": 15, "mode": "incremental", "new": 5}
+    sizes = {c["cluster_id"]: c["size"] for c in second["clusters"]}
+    assert sizes == {f"{SAMPLE}-0": 7, f"{SAMPLE}-1": 4, f"{SAMPLE}-2": 3}
+    alpha_ids = state_repo.get_state(SAMPLE)["clusters"][0]["members"]
+    assert {d["title"] for d in clean.get_articles({"_id": {"$in": alpha_ids}})} >= {"alpha-late 0", "alpha-late 1"}
+    assert second["clusters"][1]["topic_label"] == first["clusters"][1]["topic_label"]  # beta untouched
+
+    state = state_repo.get_state(SAMPLE)
+    assert state["runs_since_full"] == 1 and state["next_label"] == 3 and len(state["noise"]) == 1
+
+    # nothing new: served from state
+    third = usecase.run(SAMPLE)
+    assert third["meta"] == {"count": 15, "mode": "incremental", "new": 0}
+    assert _membership(third) == _membership(second)
+
+    # periodic full recluster agrees with the incremental result
+    _insert(clean, _topic_vectors(rng, centres[2], 1), "gamma-late", "sports")
+    usecase.run(SAMPLE)  # incremental run #2 -> runs_since_full == 2
+    full = usecase.run(SAMPLE)
+    assert full["meta"]["mode"] == "full"
+    assert sorted(c["size"] for c in full["clusters"]) == [4, 4, 7]
+
+
+def test_config_change_or_large_backlog_forces_full(repos):
+    clean, state_repo = repos
+    rng = np.random.default_rng(2)
+    centre = rng.normal(size=DIM)
+    _insert(clean, _topic_vectors(rng, centre, 4), "alpha", "world")
+
+    BuildDailyClustersUseCase(clean, BuildDailyClustersConfig(incremental=True), state_repo).run(SAMPLE)
+    _insert(clean, _topic_vectors(rng, centre, 3), "alpha-late", "world")
+
+    # 3 new vs 4 clustered exceeds the default 0.5 ratio
+    out = BuildDailyClustersUseCase(clean, BuildDailyClustersConfig(incremental=True), state_repo).run(SAMPLE)
+    assert out["meta"]["mode"] == "full"
+
+    _insert(clean, _topic_vectors(rng, centre, 1), "alpha-later", "world")
+    changed = BuildDailyClustersConfig(incremental=True, cosine_threshold=0.25)
+    out = BuildDailyClustersUseCase(clean, changed, state_repo).run(SAMPLE)
+    assert out["meta"]["mode"] == "full"
@@ -0,0 +1,92 @@
+# tests/test_labeling.py
+import mongomock
+import numpy as np
+import pytest
+
+import lib.db.mongo_client as mongo_client
+from lib.cache.doc_freq_store import DocFreqStore
+from services import labeling
+from services.labeling import TfidfLabeler, tfidf_top_terms
+
+TEXTS = [
+    "the senate passed a tariff bill on steel imports",
+    "tariff talks stall in the senate over steel",
+    "glacier melting accelerates in the alps",
+    "glacier retreat in the alps worries scientists",
+    "vaccine trial results look promising",
+]
+
+
+def test_one_group_matches_a_per_cluster_fit():
+    labeler = TfidfLabeler(TEXTS)
+    everything = labeler.top_terms_many([range(len(TEXTS))], k=1000)[0]
+    assert set(everything) == set(tfidf_top_terms(TEXTS, k=1000))
+    assert everything[0] == tfidf_top_terms(TEXTS, k=1)[0]
+
+
+def test_shared_cluster_terms_survive_and_idf_is_sample_wide():
+    senate, glacier, vaccine = TfidfLabeler(TEXTS).top_terms_many([[0, 1], [2, 3], [4]], k=3)
+    # a per-cluster fit drops terms present in every member (max_df); the sample-wide fit keeps them
+    assert {"senate", "tariff", "steel"} <= set(senate)
+    assert not {"senate", "tariff", "steel"} & set(tfidf_top_terms(TEXTS[:2], k=3))
+    assert {"glacier", "alps"} <= set(glacier)
+    assert vaccine and "glacier" not in vaccine
+
+
+def test_rolling_history_demotes_everyday_terms():
+    base = TfidfLabeler(TEXTS).top_terms_many([[0, 1]], k=3)[0]
+    history = (1000, {"senate": 900, "steel": 900})
+    rolled = TfidfLabeler(TEXTS, history=history).top_terms_many([[0, 1]], k=3)[0]
+    assert base[0] in {"senate", "steel", "tariff"} and rolled[0] == "tariff"
+    assert "senate" not in rolled
+
+
+def test_degenerate_inputs():
+    assert TfidfLabeler([]).top_terms_many([[]]) == [[]]
+    assert TfidfLabeler(["the a an", "of the"]).top_terms_many([[0, 1]]) == [[]]
+    # every word in every doc: max_df would remove all, so it is relaxed
+    assert TfidfLabeler(["solar panels", "solar panels"]).top_terms_many([[0, 1]], k=1) == [["panels"]]
+
+
+def test_doc_freq_store_window(tmp_path):
+    store = DocFreqStore(tmp_path)
+    store.save("1-2025-01-01", "2025-01-01", 10, {"a": 3, "b": 1})
+    store.save("1-2025-01-05", "2025-01-05", 20, {"a": 5})
+    store.save("2-2025-01-05", "2025-01-05", 7, {"b": 2})
+    store.save("2-2025-01-05", "2025-01-05", 8, {"b": 4})  # replaced
+    assert store.window("2025-01-01", "2025-01-06") == (38, {"a": 8, "b": 5})
+    assert store.window("2025-01-02", "2025-01-06", exclude="2-2025-01-05") == (20, {"a": 5})
+
+
+def test_use_case_fits_once_per_run_and_records_doc_freqs(tmp_path, monkeypatch):
+    import app.use_cases.build_daily_clusters as build_mod
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+
+    monkeypatch.setattr(mongo_client, "_db", mongomock.MongoClient().db)
+    clean = CleanArticlesRepository()
+    rng = np.random.default_rng(0)
+    centres = rng.normal(size=(5, 32))
+    words = ["harbor", "senate", "turbine", "glacier", "vaccine"]
+    clean.create_articles_many([
+        {"sample": "s", "title": f"t{c}{i}", "summary": f"{words[c]} story {words[(c + i) % 5]} number {i}",
+         "embedding": centres[c] + rng.normal(scale=0.02, size=32)}
+        for c in range(5) for i in range(4)
+    ])
+
+    fits = []
+    real = build_mod.TfidfLabeler
+    monkeypatch.setattr(build_mod, "TfidfLabeler", lambda *a, **k: fits.append(1) or real(*a, **k))
+    monkeypatch.setattr(labeling, "tfidf_top_terms", lambda *a, **k: pytest.fail("per-cluster fit"))
+
+    store = DocFreqStore(tmp_path)
+    cfg = build_mod.BuildDailyClustersConfig(label_idf_days=7)
+    out = build_mod.BuildDailyClustersUseCase(clean, cfg, doc_freq_store=store).run("s", date_iso="2025-03-01")
+
+    assert len(out["clusters"]) == 5 and len(fits) == 1
+    assert all(c["top_terms"] for c in out["clusters"])
+    n, df = store.window("2000-01-01", "2100-01-01")
+    # "story" is in every doc and falls to max_df, like in a per-cluster fit
+    assert n == 20 and df["harbor"] == 7 and "story" not in df
+    # recorded under the run date, not the wall clock
+    assert store.window("2025-03-01", "2025-03-02")[0] == 20
+    assert store.window("2025-03-02", "2100-01-01")[0] == 0
@@ -0,0 +1,95 @@
+# tests/test_link_pool_gate.py
+from collections import Counter
+
+import pytest
+
+import lib.db.mongo_client as mongo_client
+from adapters.link_pool_gate import LinkPoolGate
+from tests.test_bulk_writer import CountingCollection, CountingDB
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    from lib.repositories.link_pool_repository import LinkPoolRepository
+
+    db = CountingDB(counted=CountingCollection.COUNTED | {"find", "find_one"})
+    monkeypatch.setattr(mongo_client, "_db", db)
+    r = LinkPoolRepository()
+    r.collection.insert_many(
+        [{"url": f"https://old.example/{i}", "is_articles_processed": True, "in_sample": "1-2025-08-01"}
+         for i in range(900)]
+        + [{"url": "https://old.example/tracked-only"}]
+    )
+    db.trips.clear()
+    return r, db
+
+
+def _run_gate(gate, urls, sample="1-2025-08-10"):
+    """Mimic GatherAndClassifyUseCase: check, track, then mark processed."""
+    fresh = []
+    for url in urls:
+        if gate.is_processed(url):
+            continue
+        gate.ensure_tracked(url)
+        fresh.append(url)
+    for url in fresh:
+        gate.mark_processed(url, sample)
+    if hasattr(gate, "flush"):
+        gate.flush()
+    return fresh
+
+
+def _candidates():
+    return ([f"https://old.example/{i}" for i in range(0, 900, 3)]
+            + ["https://old.example/tracked-only"]
+            + [f"https://new.example/{i}" for i in range(100)])
+
+
+def test_prefilter_matches_per_url_decisions(repo):
+    r, db = repo
+    gate = LinkPoolGate(r, write_batch=1000)
+    fresh = _run_gate(gate, _candidates())
+
+    assert fresh == ["https://old.example/tracked-only"] + [f"https://new.example/{i}" for i in range(100)]
+    assert r.count({"is_articles_processed": True, "in_sample": "1-2025-08-10"}) == 101
+    assert r.count({}) == 1001
+    # 300 verified hits + 1 load query + 1 bulk write, instead of 401 lookups + 202 upserts
+    assert db.trips == Counter({"find_one": 300, "find": 1, "bulk_write": 1})
+    stats = gate.stats()
+    assert stats["prefilter_skips"] == 101 and stats["verify_queries"] == 300
+    assert stats["round_trips_avoided"] == (401 + 202) - (300 + 1 + 1)
+
+
+def test_without_verification_hits_cost_nothing(repo):
+    r, db = repo
+    gate = LinkPoolGate(r, verify_hits=False, write_batch=1000)
+    fresh = _run_gate(gate, _candidates())
+
+    assert len(fresh) == 101
+    assert db.trips == Counter({"find": 1, "bulk_write": 1})
+    # a URL marked in this run is seen as processed without another load
+    assert gate.is_processed("https://new.example/5")
+
+
+def test_plain_repo_keeps_per_url_calls():
+    class PlainRepo:
+        def __init__(self):
+            self.calls = Counter()
+            self.done = {"https://a.example/1"}
+
+        def find_one_by_url(self, url, *, projection=None):
+            self.calls["find_one"] += 1
+            return {"is_articles_processed": True} if url in self.done else None
+
+        def ensure_tracked(self, url):
+            self.calls["track"] += 1
+
+        def mark_processed(self, url, sample_id):
+            self.calls["mark"] += 1
+            self.done.add(url)
+
+    plain = PlainRepo()
+    gate = LinkPoolGate(plain)
+    assert _run_gate(gate, ["https://a.example/1", "https://a.example/2"]) == ["https://a.example/2"]
+    assert plain.calls == Counter({"find_one": 2, "track": 1, "mark": 1})
+    assert gate.stats()["round_trips_avoided"] == 0
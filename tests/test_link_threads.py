@@ -0,0 +1,199 @@
+# tests/test_link_threads.py
+import shutil
+
+import numpy as np
+import pytest
+
+from app.use_cases.link_threads import LinkThreadsUseCase
+from services.trends_config import TrendsConfig
+from utils.trend_utils import cosine_sim
+
+
+class FakeThreadsRepo:
+    def __init__(self, prev):
+        self.prev = prev
+        self.upserts = []
+
+    def get_threads_on(self, date_iso):
+        return [t for t in self.prev if t.get("date", date_iso) == date_iso]
+
+    def get_recent_for_thread(self, thread_id, since_iso):
+        return [t for t in self.prev if t["thread_id"] == thread_id and t.get("date", since_iso) >= since_iso]
+
+    def upsert_today(self, selector, doc):
+        self.upserts.append(doc)
+
+
+class FakeDailyRepo:
+    def upsert_daily(self, selector, doc):
+        pass
+
+
+def _unit(rng, n, dim=16):
+    X = rng.normal(size=(n, dim)).astype("float32")
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def _loop_target(vec, threads, threshold):
+    best, best_sim = None, -1.0
+    for t in threads:
+        c_prev = np.array(t.get("centroid") or [], dtype="float32")
+        if c_prev.size == 0:
+            continue
+        sim = cosine_sim(np.asarray(vec, dtype="float32"), c_prev)
+        if sim > best_sim:
+            best_sim, best = sim, t
+    return best if best and best_sim >= threshold else None
+
+
+def test_matrix_linking_matches_the_pairwise_loop():
+    rng = np.random.default_rng(0)
+    prev = _unit(rng, 200)
+    threads = [{"thread_id": f"thr-{i}", "centroid": v.tolist()} for i, v in enumerate(prev)]
+    threads.append({"thread_id": "thr-empty", "centroid": []})
+    today = np.vstack([prev[:40] + 0.05 * _unit(rng, 40), _unit(rng, 20)])
+    today = [v.tolist() for v in today] + [[]]
+
+    uc = LinkThreadsUseCase(None, FakeThreadsRepo([]), FakeDailyRepo(), TrendsConfig(link_threshold_cosine=0.8))
+    got = uc._link_targets(today, threads)
+    want = [_loop_target(v, threads, 0.8) if v else None for v in today]
+
+    assert [t and t["thread_id"] for t in got] == [t and t["thread_id"] for t in want]
+    assert sum(t is not None for t in got) == 40
+
+
+def test_one_to_one_gives_each_thread_to_its_closest_cluster():
+    rng = np.random.default_rng(1)
+    a, b = _unit(rng, 2)
+    threads = [{"thread_id": "thr-a", "centroid": a.tolist()}, {"thread_id": "thr-b", "centroid": b.tolist()}]
+    near_a = a + 0.02 * _unit(rng, 1)[0]
+    nearer_a = a + 0.01 * _unit(rng, 1)[0]
+    today = [near_a.tolist(), nearer_a.tolist(), (b + 0.02 * _unit(rng, 1)[0]).tolist()]
+
+    shared = LinkThreadsUseCase(None, None, None, TrendsConfig())._link_targets(today, threads)
+    assert [t["thread_id"] for t in shared] == ["thr-a", "thr-a", "thr-b"]
+
+    unique = LinkThreadsUseCase(None, None, None, TrendsConfig(link_one_to_one=True))._link_targets(today, threads)
+    assert [t and t["thread_id"] for t in unique] == [None, "thr-a", "thr-b"]
+
+
+def test_run_links_clusters_to_yesterdays_threads():
+    rng = np.random.default_rng(2)
+    prev = _unit(rng, 3)
+    threads_repo = FakeThreadsRepo([
+        {"thread_id": f"thr-{i}", "centroid": v.tolist(), "ema": 1.0, "top_entities": ["x"]}
+        for i, v in enumerate(prev)
+    ])
+    clusters = [
+        {"cluster_id": "s-0", "size": 5, "centroid": (prev[2] * 3).tolist(), "cluster_score_today": 2.0},
+        {"cluster_id": "s-1", "size": 4, "centroid": _unit(rng, 1)[0].tolist(), "cluster_score_today": 1.0},
+    ]
+
+    res = LinkThreadsUseCase(None, threads_repo, FakeDailyRepo()).run("s", "2025-01-02", clusters)
+
+    by_cluster = {t["cluster_id"]: t for t in res.threads}
+    assert by_cluster["s-0"]["thread_id"] == "thr-2"
+    assert by_cluster["s-0"]["ema"] == 0.7 * 2.0 + 0.3 * 1.0
+    assert by_cluster["s-1"]["thread_id"] == "thr-s-1"
+    assert len(threads_repo.upserts) == 2
+
+
+def test_novelty_history_is_one_query_for_all_linked_threads(monkeypatch):
+    import lib.db.mongo_client as mongo_client
+    from lib.repositories.daily_trends_repository import DailyTrendsRepository
+    from lib.repositories.trend_threads_repository import TrendThreadsRepository
+    from tests.test_bulk_writer import CountingDB
+
+    db = CountingDB(counted={"find", "update_one"})
+    monkeypatch.setattr(mongo_client, "_db", db)
+    threads_repo = TrendThreadsRepository()
+
+    rng = np.random.default_rng(3)
+    prev = _unit(rng, 60)
+    for day in ("2024-12-20", "2024-12-30", "2025-01-01"):
+        for i, v in enumerate(prev):
+            threads_repo.upsert_today({"date": day, "thread_id": f"thr-{i}"}, {
+                "date": day, "thread_id": f"thr-{i}", "centroid": v.tolist(),
+                "top_entities": [f"e{i}", day],
+            })
+    clusters = [
+        {"cluster_id": f"s-{i}", "size": 3, "centroid": v.tolist(), "top_entities": [f"E{i}", "2024-12-30"]}
+        for i, v in enumerate(prev)
+    ]
+
+    db.trips.clear()
+    res = LinkThreadsUseCase(None, threads_repo, DailyTrendsRepository()).run("s", "2025-01-02", clusters)
+
+    assert db.trips["find"] == 2  # yesterday's threads + one $in for the novelty window
+    assert db.trips["update_one"] == 0
+    # window is 7 days: 2024-12-20 is out; history {e_i, 2024-12-30, 2025-01-01} vs {e_i, 2024-12-30}
+    assert all(t["novelty"] == 1.0 - 2 / 3 for t in res.threads)
+
+    fallback = FakeThreadsRepo(list(threads_repo.collection.find({})))
+    res2 = LinkThreadsUseCase(None, fallback, FakeDailyRepo()).run("s", "2025-01-02", clusters)
+    assert [t["novelty"] for t in res2.threads] == [t["novelty"] for t in res.threads]
+
+
+def test_thread_index_persists_and_queries_a_date_window(tmp_path):
+    from lib.cache.thread_index import ThreadCentroidIndex
+
+    rng = np.random.default_rng(4)
+    V = _unit(rng, 5)
+    index = ThreadCentroidIndex(tmp_path / "idx", initial_capacity=2)
+    index.add("thr-a", "2025-01-01", V[0], ema=1.0)
+    index.add("thr-a", "2025-01-05", V[1], ema=2.0)
+    index.add("thr-b", "2025-01-03", V[2])
+    index.add("thr-c", "2025-01-09", V[3])
+    index.add("thr-b", "2025-01-03", V[4] * 2, ema=3.0)  # same day: replaced in place
+    index.flush()
+
+    reopened = ThreadCentroidIndex(tmp_path / "idx")
+    assert len(reopened) == 4
+    P, entries = reopened.window("2025-01-01", "2025-01-09")
+    # latest row per thread inside [since, until): thr-a from 01-05, thr-b replaced, thr-c excluded
+    assert [(e["thread_id"], e["date"], e["ema"]) for e in entries] == [("thr-a", "2025-01-05", 2.0), ("thr-b", "2025-01-03", 3.0)]
+    assert np.allclose(P, V[[1, 4]], atol=1e-6)
+
+    hits = reopened.search(V[4], k=2, since_iso="2025-01-01", until_iso="2025-01-10")
+    assert hits[0][0][0]["thread_id"] == "thr-b" and abs(hits[0][0][1] - 1.0) < 1e-5
+    assert len(hits[0]) == 2
+
+
+def test_lookback_links_a_story_that_skipped_a_day(tmp_path):
+    from lib.cache.thread_index import ThreadCentroidIndex
+
+    rng = np.random.default_rng(5)
+    story = _unit(rng, 1)[0]
+    index = ThreadCentroidIndex(tmp_path / "idx")
+    index.add("thr-story", "2025-01-01", story, ema=4.0)
+    index.flush()
+    clusters = [{"cluster_id": "s-0", "size": 3, "centroid": story.tolist(), "cluster_score_today": 1.0}]
+
+    shutil.copytree(tmp_path / "idx", tmp_path / "copy")
+    one_day = LinkThreadsUseCase(None, FakeThreadsRepo([]), FakeDailyRepo(), TrendsConfig(),
+                                 index=ThreadCentroidIndex(tmp_path / "copy"))
+    assert one_day.run("s", "2025-01-03", clusters).threads[0]["thread_id"] == "thr-s-0"
+
+    week = LinkThreadsUseCase(None, FakeThreadsRepo([]), FakeDailyRepo(), TrendsConfig(link_lookback_days=7),
+                              index=ThreadCentroidIndex(tmp_path / "idx"))
+    linked = week.run("s", "2025-01-04", clusters).threads[0]
+    assert linked["thread_id"] == "thr-story" and linked["ema"] == pytest.approx(0.7 * 1.0 + 0.3 * 4.0)
+    # today's docs were added to the index for tomorrow's run
+    _, entries = ThreadCentroidIndex(tmp_path / "idx").window("2025-01-04", "2025-01-05")
+    assert {e["thread_id"] for e in entries} == {"thr-story"}
+
+
+def test_dry_run_links_through_the_index_without_writing_it(tmp_path):
+    from lib.cache.thread_index import ThreadCentroidIndex
+
+    rng = np.random.default_rng(5)
+    story = _unit(rng, 1)[0]
+    index = ThreadCentroidIndex(tmp_path / "idx")
+    index.add("thr-story", "2025-01-01", story, ema=4.0)
+    index.flush()
+    clusters = [{"cluster_id": "s-0", "size": 3, "centroid": story.tolist(), "cluster_score_today": 1.0}]
+
+    dry = LinkThreadsUseCase(None, FakeThreadsRepo([]), FakeDailyRepo(), TrendsConfig(link_lookback_days=7),
+                             index=ThreadCentroidIndex(tmp_path / "idx"), persist_index=False)
+    assert dry.run("s", "2025-01-04", clusters).threads[0]["thread_id"] == "thr-story"
+    assert ThreadCentroidIndex(tmp_path / "idx").count == 1
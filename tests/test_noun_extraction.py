@@ -0,0 +1,48 @@
+# tests/test_noun_extraction.py
+import spacy
+
+import services.articles as articles_mod
+
+NOUNS = {"markets": "market", "banks": "bank", "storm": "storm", "coast": "coast", "rates": "rate"}
+
+
+def _tiny_nlp():
+    """Blank English pipeline whose attribute_ruler tags a few words as nouns (stands in for en_core_web_sm)."""
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("attribute_ruler")
+    for word, lemma in NOUNS.items():
+        ruler.add([[{"LOWER": word}]], {"POS": "NOUN", "LEMMA": lemma})
+    return nlp
+
+
+def _service(monkeypatch, loads):
+    def fake_load(name, **kwargs):
+        loads.append((name, kwargs))
+        return _tiny_nlp()
+
+    monkeypatch.setattr(articles_mod.spacy, "load", fake_load)
+    return articles_mod.ArticlesService(None, None, None, None, nlp_batch_size=2)
+
+
+def test_loads_pipeline_without_parser_and_ner(monkeypatch):
+    loads = []
+    _service(monkeypatch, loads)
+    assert loads[0][0] == "en_core_web_sm"
+    assert {"parser", "ner"} <= set(loads[0][1]["exclude"])
+
+
+def test_extract_nouns_many_matches_per_text(monkeypatch):
+    service = _service(monkeypatch, [])
+    texts = [
+        "Markets rallied as banks cut rates.",
+        "",
+        "The storm hit the coast; the storm moved on.",
+        "Nothing to see here 123.",
+        "Banks and markets.",
+    ]
+    batched = service.extract_nouns_many(texts)
+
+    assert batched == [service.extract_nouns(t) for t in texts]
+    assert batched[0] == ["market", "bank", "rate"]
+    assert batched[2] == ["storm", "coast", "storm"]
+    assert batched[1] == [] and batched[3] == []
@@ -0,0 +1,97 @@
+# tests/test_scoring.py
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from services.scoring import article_arrays, article_weight, score_cluster, score_clusters
+from services.scoring_config import ScoringConfig
+
+NOW = datetime.now(timezone.utc)
+SOURCES = ["reuters.com", "www.Reuters.com", "BBC.com", "apnews.com", "blog.example", "", None]
+CATEGORIES = ["world", "Sports", "technology", None, "", "unknown-cat"]
+TIMES = [
+    (NOW - timedelta(hours=3)).isoformat().replace("+00:00", "Z"),
+    (NOW - timedelta(hours=30)).isoformat(),
+    NOW - timedelta(hours=10),               # aware datetime
+    datetime(2025, 8, 16, 12),               # naive datetime: 72h fallback
+    "2025-08-16T12:00:00",                   # naive string: 72h fallback
+    "not a date", "", None,
+]
+
+
+def _docs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    docs = []
+    for _ in range(n):
+        src = SOURCES[rng.integers(len(SOURCES))]
+        key = "source_domain" if rng.random() < 0.7 else "source"
+        docs.append({key: src, "category": CATEGORIES[rng.integers(len(CATEGORIES))],
+                     "published_at": TIMES[rng.integers(len(TIMES))]})
+    return docs
+
+
+def test_article_weights_match_the_per_article_function():
+    cfg = ScoringConfig()
+    docs = _docs(400)
+    weights, _, _ = article_arrays(docs, cfg, as_of=NOW)
+    assert weights == pytest.approx([article_weight(d, cfg, as_of=NOW) for d in docs], rel=1e-12)
+
+
+@pytest.mark.parametrize("cfg", [ScoringConfig(), ScoringConfig(recency_tau_hours=6.0, diversity_bonus_zeta=1.5)])
+def test_cluster_scores_match_score_cluster(cfg):
+    docs = _docs(500, seed=1)
+    rng = np.random.default_rng(2)
+    members = [rng.choice(len(docs), size=int(rng.integers(0, 40)), replace=False) for _ in range(60)]
+    members.append(np.zeros(0, dtype=np.int64))
+
+    fast = score_clusters(docs, members, cfg, as_of=NOW)
+    for m, got in zip(members, fast):
+        want = score_cluster([docs[i] for i in m], cfg, as_of=NOW)
+        # distinct reputable sources are counted exactly
+        assert got["diversity_bonus"] == want["diversity_bonus"]
+        assert got["sum_article_weight"] == pytest.approx(want["sum_article_weight"], rel=1e-12)
+        assert got["cluster_score_today"] == pytest.approx(want["cluster_score_today"], rel=1e-12)
+
+
+def test_no_docs_or_clusters():
+    cfg = ScoringConfig()
+    assert score_clusters([], [], cfg) == []
+    assert score_clusters([], [[]], cfg) == [{"sum_article_weight": 0.0, "diversity_bonus": 0.0,
+                                              "cluster_score_today": 0.0}]
+
+
+def test_as_of_fixes_the_clock_and_publish_times_are_parsed_once(monkeypatch):
+    import services.scoring as scoring
+    from app.use_cases.cluster_batch import ClusterBatch
+    from app.use_cases.rank_clusters import RankClustersUseCase
+
+    docs = _docs(300, seed=3)
+    for i, d in enumerate(docs):
+        d["_id"] = i
+    batch = ClusterBatch.from_clusters("s", [f"s-{c}" for c in range(3)], np.eye(3), [docs[:100], docs[100:250], docs[250:]])
+    clusters = [{"cluster_id": f"s-{c}"} for c in range(3)]
+
+    parsed = []
+    real = scoring._published_ts
+    monkeypatch.setattr(scoring, "_published_ts", lambda v: parsed.append(v) or real(v))
+    ranker = RankClustersUseCase(None)
+    first = ranker.run("s", clusters, batch=batch, as_of=NOW)
+    assert len(parsed) == len(docs) and first.as_of == NOW
+
+    # a later re-run at the same as_of reproduces the scores exactly, without re-parsing
+    again = ranker.run("s", clusters, batch=batch, as_of=NOW)
+    assert len(parsed) == len(docs)
+    assert [c["score_components"] for c in again.clusters] == [c["score_components"] for c in first.clusters]
+
+    # new weights reuse the parsed times and match a fresh ranker
+    heavy = ScoringConfig(recency_tau_hours=6.0, diversity_bonus_zeta=2.0)
+    rerank = ranker.run("s", clusters, batch=batch, as_of=NOW, cfg=heavy)
+    fresh = RankClustersUseCase(None, heavy).run("s", clusters, batch=batch, as_of=NOW)
+    assert len(parsed) == 2 * len(docs)  # only the fresh ranker parsed
+    assert [c["score_components"] for c in rerank.clusters] == [c["score_components"] for c in fresh.clusters]
+
+    # an earlier clock makes every article fresher
+    earlier = ranker.run("s", clusters, batch=batch, as_of=NOW - timedelta(hours=6))
+    by_id = {c["cluster_id"]: c["cluster_score_today"] for c in first.clusters}
+    assert all(c["cluster_score_today"] > by_id[c["cluster_id"]] for c in earlier.clusters)
@@ -0,0 +1,74 @@
+# tests/test_sqlite_cache.py
+from lib.cache.sqlite_cache import SQLiteCache, content_key
+
+
+class Clock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    path = tmp_path / "c.sqlite"
+    cache = SQLiteCache(path, table="summaries")
+    assert cache.get("a") is None
+    cache.put_many([("a", "alpha"), ("b", b"\x00\x01")])
+    assert cache.get_many(["a", "b", "c"]) == {"a": "alpha", "b": b"\x00\x01"}
+    assert cache.stats() == {"hits": 2, "misses": 2, "writes": 2, "evictions": 0, "size": 2}
+    cache.close()
+
+    reopened = SQLiteCache(path, table="summaries")
+    assert reopened.get("a") == "alpha"
+
+
+def test_lru_evicts_least_recently_used():
+    clock = Clock()
+    cache = SQLiteCache(":memory:", max_entries=2, clock=clock)
+    cache.put("a", "1")
+    clock.t += 1
+    cache.put("b", "2")
+    clock.t += 1
+    assert cache.get("a") == "1"  # touch a; b is now oldest
+    clock.t += 1
+    cache.put("c", "3")
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": "1", "c": "3"}
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_writes_keep_the_row_count_without_rescanning():
+    cache = SQLiteCache(":memory:", max_entries=3)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+
+    cache.put_many([("a", "1"), ("b", "2")])
+    cache.put("a", "1b")  # replacing a key does not grow the table
+    full_counts = [s for s in statements if "COUNT(*)" in s and "WHERE" not in s]
+    assert full_counts == []
+    assert cache._size == len(cache) == 2
+
+    cache.put_many([("c", "3"), ("d", "4")])
+    assert cache._size == len(cache) == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_expires_entries():
+    clock = Clock()
+    cache = SQLiteCache(":memory:", ttl_seconds=60, clock=clock)
+    cache.put("a", "1")
+    clock.t += 30
+    assert cache.get("a") == "1"
+    clock.t += 31
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_content_key_normalizes_whitespace_and_tracks_params():
+    base = content_key("Hello   world.\n", "facebook/bart-large-cnn", "v1")
+    assert base == content_key(" Hello world.", "facebook/bart-large-cnn", "v1")
+    assert base != content_key("Hello world!", "facebook/bart-large-cnn", "v1")
+    assert base != content_key("Hello world.", "other/model", "v1")
+    assert base != content_key("Hello world.", "facebook/bart-large-cnn", "v2")
@@ -1,56 +1,110 @@
 # tests/test_summarizer.py
 import importlib
+import re
 import sys
 import types
 import pytest
 
 @pytest.fixture
-def summarizer_module(monkeypatch):
+def summarizer_module(monkeypatch, tmp_path):
     """
     Patch heavy HF objects BEFORE importing pipeline_sample.summarizer, and force a fresh import.
     This stops real model/tokenizer loading and ensures the module uses our fakes.
     """
-    # 1) Fake pipeline that "summarizes" by truncating text and records calls
+    # 1) Fake pipeline object: summarizer still builds one on load, but generation
+    #    now goes straight to model.generate with pre-tokenized ids.
     calls = {"inputs": []}
 
     class FakeSummarizer:
-        def __call__(self, text, max_length=None, min_length=None, do_sample=None, **kwargs):
-            calls["inputs"].append(text)
-            if isinstance(text, str):
-                return [{"summary_text": text[: (max_length or 200)]}]
-            joined = " ".join(map(str, text))
-            return [{"summary_text": joined[: (max_length or 200)]}]
+        def __call__(self, *args, **kwargs):
+            raise AssertionError("summaries should be generated from token ids, not via the pipeline")
 
     def fake_pipeline(task, model=None, tokenizer=None, device=None, **kwargs):
         return FakeSummarizer()
 
-    # 2) Fake tokenizer with a cheap encode() to exercise chunking logic
+    # 2) Fake word-level fast tokenizer (offsets + ids) to exercise chunking logic
+    BOS, PAD, EOS = 0, 1, 2
+    vocab: dict = {}
+    inv_vocab: dict = {}
+
+    def _id(word):
+        if word not in vocab:
+            vocab[word] = len(vocab) + 3
+            inv_vocab[vocab[word]] = word
+        return vocab[word]
+
     class FakeTokenizer:
+        pad_token_id = PAD
+        all_special_ids = [BOS, PAD, EOS]
+
+        def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+            words = list(re.finditer(r"\S+", text))
+            calls["tokenize"] = calls.get("tokenize", 0) + 1
+            enc = {"input_ids": [_id(m.group()) for m in words]}
+            if return_offsets_mapping:
+                enc["offset_mapping"] = [(m.start(), m.end()) for m in words]
+            return enc
+
         def encode(self, text, add_special_tokens=False):
             # Approximate token count by whitespace splitting
+            calls["encode"] = calls.get("encode", 0) + 1
             return text.split()
 
+        def build_inputs_with_special_tokens(self, ids):
+            return [BOS] + list(ids) + [EOS]
+
+        def batch_decode(self, rows, skip_special_tokens=True):
+            return [" ".join(inv_vocab[t] for t in row.tolist() if t not in (BOS, PAD, EOS)) for row in rows]
+
     class FakeBartTokenizer:
         @classmethod
         def from_pretrained(cls, *args, **kwargs):
             return FakeTokenizer()
 
+    class FakeSeq2SeqModel:
+        """'Summarizes' by keeping the first max_length tokens of each row; records calls."""
+        device = "cpu"
+
+        @classmethod
+        def from_pretrained(cls, *args, **kwargs):
+            return cls()
+
+        def generate(self, input_ids, attention_mask=None, max_length=None, min_length=None, **kwargs):
+            import torch
+            rows = []
+            for row in input_ids.tolist():
+                words = [t for t in row if t not in (BOS, PAD, EOS)]
+                calls["inputs"].append(" ".join(inv_vocab[t] for t in words))
+                rows.append([BOS] + words[: (max_length or 200) - 2] + [EOS])
+            calls.setdefault("batches", []).append(calls["inputs"][-len(rows):])
+            calls.setdefault("limits", []).append((max_length, min_length))
+            width = max(len(r) for r in rows)
+            return torch.tensor([r + [PAD] * (width - len(r)) for r in rows])
+
     # 3) Apply patches BEFORE import
     import transformers
     monkeypatch.setattr(transformers, "pipeline", fake_pipeline, raising=True)
     monkeypatch.setattr(transformers, "BartTokenizer", FakeBartTokenizer, raising=True)
+    monkeypatch.setattr(transformers, "BartTokenizerFast", FakeBartTokenizer, raising=True)
+    monkeypatch.setattr(transformers, "AutoModelForSeq2SeqLM", FakeSeq2SeqModel, raising=True)
 
     # Optional: mute MPS to avoid device noise
     import torch
     monkeypatch.setattr(torch.backends.mps, "is_available", lambda: False, raising=True)
     monkeypatch.setattr(torch.cuda, "is_available", lambda: False, raising=True)
 
+    # Cache off by default so call counts reflect real model work; cache tests opt in
+    monkeypatch.setenv("SUMMARY_CACHE", "off")
+    monkeypatch.setenv("SUMMARY_CACHE_PATH", str(tmp_path / "summaries.sqlite"))
+
     # 4) Force a fresh import of the module so it picks up our fakes
     sys.modules.pop("pipeline_sample.summarizer", None)
     mod = importlib.import_module("pipeline_sample.summarizer")
 
     # Safety: ensure the module's 'pipeline' name is our fake too
     monkeypatch.setattr(mod, "pipeline", fake_pipeline, raising=True)
+    # No local HF cache needed: the fakes above never read the snapshot
+    monkeypatch.setattr(mod, "_resolve_local_snapshot", lambda base, repo_dirname: base, raising=True)
 
     # Expose call log
     mod.__test_calls__ = calls
@@ -82,3 +136,112 @@ def test_chunking_triggers_multiple_calls_when_needed(summarizer_module):
 
     calls = summarizer_module.__test_calls__["inputs"]
     assert len(calls) >= 2, f"Expected multiple chunks, got {len(calls)}"
+
+
+def _articles():
+    return [
+        "Short article body.",
+        ("This is a fairly normal sentence used for building a long document. " * 600).strip(),
+        ("Markets moved sharply today. " * 120).strip(),
+        "",
+        ("A long policy debate continued in parliament with many speakers. " * 300).strip(),
+    ]
+
+
+def test_summarize_many_matches_per_article_path(summarizer_module):
+    texts = _articles()
+    expected = [summarizer_module.smart_summarize(t) for t in texts]
+    summarizer_module.__test_calls__["inputs"].clear()
+
+    out = summarizer_module.summarize_many(texts, batch_size=4)
+
+    assert out == expected
+    assert out[0] == "Short article body."
+    assert out[3] == ""
+
+
+def test_summarize_many_pools_chunks_into_length_sorted_batches(summarizer_module):
+    texts = _articles()
+    summarizer_module.summarize_many(texts, batch_size=4)
+
+    calls = summarizer_module.__test_calls__
+    batches = calls.get("batches", [])
+    assert batches, "expected list (batched) pipeline calls"
+    assert all(len(b) <= 4 for b in batches)
+    # chunks from several articles share a call, so there are fewer calls than chunks
+    assert len(batches) < len(calls["inputs"])
+    for b in batches:
+        lengths = [len(c.split()) for c in b]
+        assert lengths == sorted(lengths, reverse=True)
+
+
+def test_generation_lengths_cap_at_the_input_length(summarizer_module):
+    lengths = summarizer_module._generation_lengths
+    assert lengths(10) == (20, 10)
+    assert lengths(64) == (51, 10)
+    assert lengths(150) == (120, 10)
+    assert lengths(200) == lengths(512) == (200, 80)
+    bucket = summarizer_module._length_bucket
+    assert bucket(33) == bucket(64) == 64 and bucket(65) == 128
+    assert bucket(150) == 256 and bucket(200) == bucket(512)
+
+
+def test_batches_take_the_limits_of_their_shortest_chunk(summarizer_module):
+    chunks = [summarizer_module.chunk_text_ids(" ".join(f"w{i}" for i in range(n)) + ".")[0] for n in (120, 90, 70)]
+    out = summarizer_module._summarize_bucket(chunks, batch_size=2)
+
+    assert len(out) == 3
+    # (120, 90) share the 90-token limits, 70 runs alone
+    assert summarizer_module.__test_calls__["limits"] == [(72, 10), (56, 10)]
+
+
+def test_chunker_tokenizes_once_and_carries_ids(summarizer_module):
+    text = ("One two three four five. " * 300).strip()
+    summarizer_module.__test_calls__.pop("tokenize", None)
+    chunks = summarizer_module.chunk_text_ids(text, max_tokens=512)
+
+    assert summarizer_module.__test_calls__["tokenize"] == 1
+    assert all(c.length <= 512 for c in chunks)
+    assert sum(c.length for c in chunks) == 1500
+    # sentences are never split across chunks (5 tokens each)
+    assert all(c.length % 5 == 0 for c in chunks)
+    assert [c.text for c in chunks] == summarizer_module.chunk_text(text, max_tokens=512)
+
+
+def test_oversize_sentence_is_windowed(summarizer_module):
+    text = " ".join(f"w{i}" for i in range(1200)) + "."
+    chunks = summarizer_module.chunk_text_ids(text, max_tokens=512)
+    assert [c.length for c in chunks] == [512, 512, 176]
+    assert chunks[0].text.split()[0] == "w0"
+    assert chunks[1].text.split()[0] == "w512"
+
+
+def test_summarize_reuses_ids_without_reencoding(summarizer_module):
+    summarizer_module.__test_calls__.pop("encode", None)
+    summarizer_module.smart_summarize("Sentence. " * 2000)
+    summarizer_module.summarize_many(["Sentence. " * 2000, "Another line here. " * 400])
+    assert summarizer_module.__test_calls__.get("encode", 0) == 0
+
+
+def test_summary_cache_serves_repeats_across_entry_points(summarizer_module, monkeypatch):
+    monkeypatch.setenv("SUMMARY_CACHE", "on")
+    calls = summarizer_module.__test_calls__["inputs"]
+    texts = _articles()
+
+    first = summarizer_module.smart_summarize(texts[1])
+    n_calls = len(calls)
+    assert n_calls >= 1
+    # whitespace-only differences hit the same entry
+    assert summarizer_module.smart_summarize("  " + texts[1].replace(". ", ".\n")) == first
+    assert len(calls) == n_calls
+
+    out = summarizer_module.summarize_many(texts, batch_size=4)
+    assert out[1] == first
+    after_many = len(calls)
+    assert summarizer_module.summarize_many(texts, batch_size=4) == out
+    assert len(calls) == after_many
+
+    stats = summarizer_module.summary_cache_stats()
+    assert stats["hits"] == 1 + 1 + 3   # smart repeat, texts[1] in first batch, 3 long texts in second
+    assert stats["misses"] == 1 + 2
+    assert stats["size"] == 3
@@ -0,0 +1,84 @@
+# tests/test_vector_codec.py
+import sys
+
+import bson
+import numpy as np
+import pytest
+from bson.binary import Binary
+
+import lib.db.mongo_client as mongo_client
+from lib.db.vector_codec import VECTOR_ENCODINGS, decode_vector, encode_vector, is_encoded
+from tests.test_bulk_writer import CountingDB
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = CountingDB()
+    monkeypatch.setattr(mongo_client, "_db", fake)
+    return fake
+
+
+def _unit(n, dim=384, seed=0):
+    X = np.random.default_rng(seed).normal(size=(n, dim)).astype("float32")
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("encoding", VECTOR_ENCODINGS)
+def test_round_trip_through_bson(encoding):
+    v = _unit(1)[0]
+    stored = bson.decode(bson.encode({"e": encode_vector(v, encoding)}))["e"]
+    assert is_encoded(stored, encoding)
+    out = decode_vector(stored)
+    assert out.dtype == np.float32 and out.shape == v.shape
+    assert np.allclose(out, v, atol=1e-3 if encoding == "float16" else 0)
+
+
+def test_float32_is_a_standard_bson_vector_and_much_smaller():
+    v = _unit(1)[0]
+    b = encode_vector(v)
+    assert b.subtype == 9 and np.allclose(b.as_vector().data, v)
+    assert len(bson.encode({"e": v.tolist()})) > 3 * len(bson.encode({"e": b}))
+    with pytest.raises(ValueError):
+        encode_vector(v, "int8")
+
+
+def test_repository_encodes_writes_and_decodes_reads(db):
+    from lib.repositories.clean_articles_repository import CleanArticlesRepository
+
+    X = _unit(5)
+    repo = CleanArticlesRepository()
+    repo.create_articles_many([{"sample": "s", "i": i, "embedding": X[i]} for i in range(3)])
+    repo.create_articles({"sample": "s", "i": 3, "embedding": X[3].tolist()})
+    # a legacy document written before the codec
+    repo.collection.insert_one({"sample": "s", "i": 4, "embedding": X[4].tolist()})
+
+    raw = {d["i"]: d["embedding"] for d in repo.collection.find({})}
+    assert all(isinstance(raw[i], Binary) for i in range(4)) and isinstance(raw[4], list)
+
+    docs = list(repo.get_articles_broad({"sample": "s"}, {"i": 1, "embedding": 1}))
+    assert all(isinstance(d["embedding"], np.ndarray) for d in docs)
+    assert np.allclose(np.stack([d["embedding"] for d in sorted(docs, key=lambda d: d["i"])]), X)
+    assert len(list(repo.get_articles({"sample": "s"}).sort("i", -1).limit(2))) == 2
+    assert np.allclose(repo.get_one_article({"i": 4})["embedding"], X[4])
+
+    repo.update_articles({"i": 4}, {"$set": {"embedding": X[0]}})
+    assert isinstance(repo.collection.find_one({"i": 4})["embedding"], Binary)
+
+
+def test_migration_script_reencodes_legacy_docs(db, monkeypatch):
+    from scripts import migrate_embeddings
+
+    X = _unit(4)
+    coll = db["clean_articles"]
+    coll.insert_many([{"sample": "a" if i < 3 else "b", "embedding": X[i].tolist()} for i in range(4)])
+    coll.insert_one({"sample": "a", "embedding": None})
+
+    monkeypatch.setattr(sys, "argv", ["migrate_embeddings.py", "--sample-id", "a"])
+    assert migrate_embeddings.main() == 0
+    stored = {str(d["_id"]): d["embedding"] for d in coll.find({"sample": "a", "embedding": {"$ne": None}})}
+    assert len(stored) == 3 and all(is_encoded(v, "float32") for v in stored.values())
+    assert isinstance(coll.find_one({"sample": "b"})["embedding"], list)
+
+    db.trips.clear()
+    migrate_embeddings.main()  # nothing left to do for the sample
+    assert db.trips["bulk_write"] == 0
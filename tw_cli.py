@@ -158,9 +158,12 @@ def trends(
         persist: bool = typer.Option(True, "--persist/--dry-run", help="Persist to trend_threads/daily_trends"),
         date: Optional[str] = typer.Option(None, help="Override date (YYYY-MM-DD); defaults to today (UTC)"),
         print_top: int = typer.Option(5, help="How many threads to print"),
+        as_of: Optional[str] = typer.Option(None, "--as-of",
+                                            help="ISO timestamp recency is scored against (defaults to now)"),
 ):
     banner("Trends: build → rank → link")
-    TARGETS["trends"].call(sample_id=sample, limit=limit, persist=persist, date=date, print_top=print_top)
+    TARGETS["trends"].call(sample_id=sample, limit=limit, persist=persist, date=date, print_top=print_top,
+                           as_of=as_of)
 
 
 if __name__ == "__main__":